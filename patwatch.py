@@ -19,11 +19,80 @@ Extras:
   mit WCAG-orientierter Kontrastwahl (nie Schwarz auf starkem Rot/Blau).
 - Farben in der Normalansicht entsprechen den Farben der Alternativansicht:
   Die Farbauswahl basiert auf dem Alternativ-Wort (Spalte 5); fehlt dieses, auf dem Originalwort.
+- Aggregation ist inkrementell: Im kontinuierlichen (--cmd) und im STDIN-Modus werden nur neu
+  eingetroffene Zeilen ausgewertet und die Zähler wachsen weiter (mit und ohne --color identisch).
+  Im iterativen Modus ersetzt jeder Lauf die Ausgabe, die Zähler beginnen dann neu.
+- --clear zeichnet differenziell: Nur geänderte Zeilen bzw. Zeilenenden werden in einem
+  einzigen write() ausgegeben (z. B. nur der Timestamp im Header). Die Terminalgröße wird
+  gecacht und bei SIGWINCH (Fenstergröße geändert) verworfen, dann folgt ein komplettes Neuzeichnen.
+- Eine einzige selectors-Ereignisschleife (EventLoop) multiplexed Kommando-Output, STDIN,
+  Tastatur und Timer: Tasten und neue Daten werden sofort behandelt, ohne Polling; ein
+  wartendes patwatch verbraucht praktisch keine CPU.
+- --workers N verteilt das Matching auf N Prozesse: Die Eingabe wird in zeilenbündige Chunks geteilt,
+  jeder Worker liefert Teil-Aggregate (Zähler, Head/Tail-Wörter, Alts, Refs), die in Eingabereihenfolge
+  gemergt werden. Zähler, Wort-Historien, Refs und Distinct sind identisch zum Ein-Prozess-Pfad; die
+  Top-K-Sketches werden nur näherungsweise gemergt (Rangfolge und Fehlerschranken können abweichen).
+- Nach COUNT zeigt jede Zeile gleitende Raten (Treffer/s über 10s, 1m, 5m) und eine Sparkline der
+  letzten Minute. Basis ist ein Ring aus 300 Sekunden-Buckets je Pattern (array, fester Speicher),
+  gefüllt aus den Zähler-Deltas; abschalten mit --no-rates, im iterativen Modus ausgeblendet.
+- --profile misst pro Frame die Zeit je Stufe (read, match, transform, render, truncate, aux, write)
+  mit perf_counter_ns-Akkumulatoren; mit --clear als Statuszeile unter dem Header, beim Beenden als
+  Zusammenfassung auf STDERR, mit --profile-ndjson DATEI zusätzlich als NDJSON pro Frame. Warten auf
+  Eingabe (select) und im iterativen Modus Kommandolaufzeit und Zeit bis zum ersten Byte getrennt.
+- load_patterns() prüft LINE_REGEX/WORD_REGEX statisch auf Formen mit katastrophalem Backtracking
+  (verschachtelte Quantoren, überlappende Alternativen unter Quantor, direkt aufeinanderfolgende
+  überlappende Quantoren) und warnt. --pattern-cost misst Regex-Zeit und Auswertungen je Pattern und
+  zeigt die langsamsten IDs; --pattern-budget MS schaltet ein Pattern ab, das in einem Eingabeblock
+  mehr Zeit braucht, statt die Anzeige einzufrieren.
+- --json gibt headless pro Intervall einen kompakten NDJSON-Datensatz aus (ID, count, delta, häufigste
+  Wörter mit Zähler als "top", jüngste als "recent", Alt-Wörter, Refs) – ohne render_*, Farben oder Kürzung; unveränderte Patterns werden aus
+  einem Fragment-Cache ausgegeben. Im Pipe-Modus endet patwatch mit dem Ende von STDIN.
+- --follow DATEI... verfolgt mehrere Dateien wie 'tail -F' (inotify, ohne inotify Polling): Rotation
+  (neue Inode) und Truncation werden erkannt, jede Zeile trägt ihre Quelle (--follow-tag), und mit
+  --follow-checkpoint setzt ein Neustart an der gesicherten Leseposition fort.
+- --state DATEI sichert die Aggregate je Pattern (Zähler, Wort-Historien, Refs, Top-K, Distinct, Raten)
+  alle --state-interval Sekunden und beim Beenden atomar als NDJSON; kodiert werden nur geänderte Patterns,
+  in Scheiben zwischen den Ereignissen, geschrieben wird in einem Writer-Thread. --resume übernimmt den Stand beim Start (nur Patterns
+  mit unveränderter Zeile in der Pattern-Datei); beim Beenden passt er zum --follow-checkpoint.
+- --file DATEI wertet eine Datei einmalig per mmap aus: Bytes-Regex je Pattern über zeilenbündige
+  Fenster, dekodiert wird nur eine Zeile mit Treffer (Zeilen mit Nicht-ASCII laufen über die
+  Text-Regex); Speicher unabhängig von der Dateigröße, Durchsatz in GB/s auf STDERR.
+- --bytes matcht auf rohen Eingabeblöcken: LINE_REGEX wird zusätzlich als Bytes-Regex kompiliert und
+  über den ganzen Block gesucht, dekodiert werden nur Zeilen mit Treffer (Nicht-ASCII-Zeilen über die
+  Text-Regex, Ergebnis identisch); ungültiges UTF-8 wird ersetzt statt eine Ausnahme auszulösen.
+- Taste 't' (bzw. --top-view) zeigt je Pattern die häufigsten Wörter mit Zähler statt der Ankunfts-
+  reihenfolge; dahinter steht ein Space-Saving-Sketch mit TOPK_COUNTERS Zählern je Pattern, der
+  Speicher bleibt auch bei Millionen verschiedener Werte konstant.
+- --distinct zeigt nach COUNT die ungefähre Anzahl verschiedener Wörter (bzw. \\1 mit --distinct-of ref)
+  je Pattern ("≈1.2k"); dahinter steht ein HyperLogLog mit 2^p Byte-Registern, p aus --distinct-error
+  (0.406 bis 26 %, Default 2% → 4 KB je Pattern), auch bei zig Millionen verschiedener Werte. Im NDJSON als "distinct".
+- Die Pattern-Datei wird im Betrieb neu geladen, sobald sich ihre mtime ändert: unveränderte Zeilen
+  behalten PatternRec und Zähler, nur neue/geänderte werden kompiliert; der Austausch passiert
+  zwischen zwei Frames, Kompilierfehler stehen in der Status-Bar (die bisherige Fassung bleibt aktiv).
+- --hosts DATEI führt --cmd auf allen Hosts einer Liste (Format wie tmc/configs/taskf_ssh.json,
+  machine/user) gleichzeitig per ssh aus (--host-cmd, höchstens --host-concurrency zugleich): ein
+  Prozess, eine Auswertung für alle Hosts, jede Zeile mit Quelle (--host-tag). Die Status-Bar zeigt
+  aktive/wartende/fehlgeschlagene Hosts und die Fan-out-Latenz (Median/Max bis zum ersten Byte),
+  Taste 'h' die Treffer je Host; im NDJSON stehen sie unter "hosts".
+- Ohne Intervall (-t 0) werden datengetriebene Frames auf --max-fps zusammengefasst (Default 10):
+  die Auswertung liest und matcht ungebremst, gezeichnet wird höchstens N-mal pro Sekunde, Tasten
+  (Leertaste: nur neu zeichnen) sofort. Die Status-Bar zeigt ausgelassene Frames und den Rückstand
+  ungelesener Bytes in den Eingabe-Pipes (FIONREAD), z. B. "[≤10fps, 1.9k ausgelassen, Rückstand 64KB]".
+- Benchmarks (Ingest/Match, Pipelines, Rendering; JSON-Ausgabe, Vergleich zweier Läufe) liegen in
+  patwatch_bench.py, inkl. synthetischem Log-Generator und Pattern-TSVs mit 5 bis 5000 IDs.
+- --auxcmd läuft in einem Hintergrund-Thread im eigenen Takt (--aux-interval, --aux-timeout); der
+  Frame zeigt die letzte fertige Aux-Ausgabe, die Trennerzeile ihr Alter ("### [aux vor 3s]").
+- Eingabe wird in großen Blöcken per os.read() gelesen (Zeilentrennung auf Byte-Ebene, angefangene
+  Zeilen werden zurückgehalten); pro Zyklus wird alles Anliegende ausgewertet. Die Status-Bar zeigt
+  Eingangsrate und nachhaltige Rate ("[in 1.2k/s max 85.0k/s]"), beim Beenden folgt eine Summary.
 
 TASTATURBEHANDLUNG (WICHTIG):
 - Taste 'a': Wechsel zwischen Normal- und Alt-Ansicht (KOMPLETTER REFRESH)
+- Taste 't': Top-K-Ansicht ein/aus (häufigste Wörter je Pattern mit Zähler, z. B. "web07×312")
+- Taste 'h': Host-Ansicht ein/aus (nur --hosts: Zustand, Fan-out-Latenz und Treffer je Host)
 - Taste 'c': Im Color-Modus: Toggle zwischen normaler Anzeige und Farbcode-Debug (zeigt Farbcodes statt ID/Hostname)
 - Taste 'q': Programm beenden
+- Leertaste: sofort neu zeichnen (auch zwischen zwei Frames bei --max-fps)
 - Taste '+': Intervall um 5 Sekunden erhöhen
 - Taste '-': Intervall um 5 Sekunden verringern (Minimum 1s)
 - Ctrl+C: Programm beenden
@@ -32,6 +101,7 @@ COLOR-DEBUG-MODUS (TASTE 'C'):
 Im Color-Modus zeigt Taste 'c' die Farbcodes anstelle der ID/Hostname an.
 Das ist nützlich für die Fehlerbehebung von schlechten Farbkombinationen.
 Funktionsweise: Einfache Wortersetzung (server1.example.com → 16/119) mit normaler Farbgebung.
+Zusätzlich zeigt die Status-Bar Trefferquote und Füllstand des Chip-Caches ("[chips 97% 812/4096]").
 WICHTIG: Diese Funktion darf NICHT entfernt werden!
 
 Die Tastaturbehandlung funktioniert in allen Modi:
@@ -87,9 +157,11 @@ WICHTIG: Diese Lösung darf NIEMALS entfernt oder geändert werden, ohne das Pro
 Alle mit "NIEMALS ENTFERNEN ODER ÄNDERN" markierten Code-Bereiche sind kritisch!
 """
 
-import sys, re, argparse, subprocess, time, shutil, os, select, signal, threading
-from collections import deque
-from typing import List, Optional, Pattern, Tuple
+import sys, re, json, argparse, base64, shlex, subprocess, time, shutil, os, select, selectors, signal, struct, mmap, math, hashlib, threading, zlib, heapq
+from array import array
+from bisect import insort
+from collections import OrderedDict, deque
+from typing import Callable, List, Optional, Pattern, Tuple
 try:
     import psutil
     PSUTIL_AVAILABLE = True
@@ -163,6 +235,36 @@ def format_memory_usage(mb):
         gb = mb / 1024
         return f"{gb:.1f}GB"
 
+# ---------- Terminal-Geometrie ----------
+# Die Größe wird nur einmal abgefragt und erst nach SIGWINCH neu bestimmt; ohne
+# installierten Handler (z. B. Windows oder Import als Modul) wird jedes Mal abgefragt.
+_TERM_SIZE: Optional[os.terminal_size] = None
+_TERM_SIZE_CACHED = False
+
+def terminal_size() -> os.terminal_size:
+    """Terminalgröße wie shutil.get_terminal_size(fallback=(80, 24)), gecacht bis SIGWINCH."""
+    global _TERM_SIZE
+    if not _TERM_SIZE_CACHED:
+        return shutil.get_terminal_size(fallback=(80, 24))
+    if _TERM_SIZE is None:
+        _TERM_SIZE = shutil.get_terminal_size(fallback=(80, 24))
+    return _TERM_SIZE
+
+def invalidate_terminal_size(signum=None, frame=None) -> None:
+    """Verwirft die gecachte Größe (auch direkt als SIGWINCH-Handler verwendbar)."""
+    global _TERM_SIZE
+    _TERM_SIZE = None
+
+def install_winch_handler() -> bool:
+    """Aktiviert den Größen-Cache, falls die Plattform SIGWINCH kennt."""
+    global _TERM_SIZE_CACHED
+    if not hasattr(signal, "SIGWINCH"):
+        return False
+    signal.signal(signal.SIGWINCH, invalidate_terminal_size)
+    invalidate_terminal_size()
+    _TERM_SIZE_CACHED = True
+    return True
+
 # ---------- CLI ----------
 def parse_args():
     p = argparse.ArgumentParser(description="Zeilen zählen & Wörter sammeln nach Regex-Patterns (pro ID).")
@@ -177,6 +279,9 @@ def parse_args():
     # Hauptkommando / Watch
     p.add_argument("-c","--cmd", help="Shell-Kommando (Pipes erlaubt); dessen STDOUT wird ausgewertet.")
     p.add_argument("-t","--interval", type=float, default=5.0, help="Kontinuierlicher Modus: Kommando läuft dauerhaft, Display wird alle X Sekunden aktualisiert. Standard: 5s für STDIN, 0s für --cmd.")
+    p.add_argument("--max-fps", type=float, default=None, metavar="N",
+                   help="Ohne Intervall (-t 0): höchstens N datengetriebene Frames pro Sekunde (Default: 10); "
+                        "die Auswertung läuft ungebremst weiter, Tasten zeichnen sofort.")
     p.add_argument("--iterative", type=float, help="Iterativer Modus: Kommando wird alle X Sekunden neu ausgeführt (Output wird ersetzt).")
     p.add_argument("--shell", default="/bin/sh", help="Shell für -c/--cmd und --auxcmd (Default: /bin/sh)")
     p.add_argument("--timeout", type=float, default=None, help="Timeout in Sekunden fürs Hauptkommando (optional)")
@@ -186,6 +291,58 @@ def parse_args():
     p.add_argument("--color-header", action="store_true",
                    help="Farbiger Header: tmux-dunkelgrün (BG 48;5;22) + schwarzer Text (30).")
 
+    # Dateien verfolgen
+    p.add_argument("--follow", nargs="+", metavar="DATEI",
+                   help="Eine oder mehrere Dateien wie 'tail -F' verfolgen (inotify, sonst Polling); "
+                        "Rotation und Truncation werden erkannt. Statt --cmd/STDIN.")
+    p.add_argument("--follow-from", choices=("end", "start"), default="end",
+                   help="Beim Start am Dateiende (Default) oder am Anfang beginnen.")
+    p.add_argument("--follow-tag", default=None, metavar="FORMAT",
+                   help="Quelle vor jede Zeile setzen; {name} = Dateiname (bei Kollision voller Pfad), "
+                        "{path} = Pfad. Default: '{name}: ' bei mehreren Dateien, sonst keine; '' schaltet es ab.")
+    p.add_argument("--follow-checkpoint", metavar="DATEI",
+                   help="Leseposition je Datei (mit Inode) in DATEI sichern und beim Start dort fortsetzen.")
+
+    # Fleet-Modus
+    p.add_argument("--hosts", metavar="DATEI",
+                   help="--cmd auf allen Hosts einer JSON-Liste (Format wie tmc/configs/taskf_ssh.json: "
+                        "machine/user) gleichzeitig per ssh ausführen; eine gemeinsame Auswertung, Treffer je "
+                        "Host mit Taste 'h'.")
+    p.add_argument("--host-cmd", default=HOST_CMD_DEFAULT, metavar="VORLAGE",
+                   help="Kommando je Host; Platzhalter {login} (user@machine), {machine}, {user}, {cmd} und "
+                        "weitere Schlüssel des Host-Eintrags. Default: '%(default)s'.")
+    p.add_argument("--host-concurrency", type=int, default=HOST_CONCURRENCY, metavar="N",
+                   help="Höchstens N Host-Kommandos gleichzeitig (Default: %(default)s); weitere warten.")
+    p.add_argument("--host-tag", default=None, metavar="FORMAT",
+                   help="Quelle vor jede Zeile setzen, Platzhalter wie --host-cmd. Default: '{machine}: '; "
+                        "'' schaltet es ab.")
+    p.add_argument("--host-view", action="store_true",
+                   help="Startet in der Host-Ansicht (Zustand, Fan-out-Latenz und Treffer je Host, Taste 'h').")
+
+    # Zustand sichern/fortsetzen
+    p.add_argument("--state", metavar="DATEI",
+                   help="Aggregate je Pattern (Zähler, Wort-Historien, Refs, Top-K, Distinct, Raten) periodisch "
+                        "und beim Beenden atomar in DATEI sichern (NDJSON, geschrieben von einem Writer-Thread).")
+    p.add_argument("--state-interval", type=float, default=STATE_INTERVAL, metavar="SEK",
+                   help=f"Takt der Snapshots in Sekunden (Default: {STATE_INTERVAL:g}).")
+    p.add_argument("--resume", action="store_true",
+                   help="Beim Start den Snapshot aus --state übernehmen (nur unveränderte Pattern-Zeilen).")
+
+    # Datei-Scan
+    p.add_argument("--file", metavar="DATEI",
+                   help="Einmalige Auswertung einer (großen) Datei per mmap mit Bytes-Regex; gibt die "
+                        "Ansicht bzw. mit --json einen Datensatz aus und meldet den Durchsatz in GB/s.")
+
+    # Bytes-Engine
+    p.add_argument("--bytes", action="store_true",
+                   help="Matching auf rohen Bytes statt dekodiertem Text: LINE_REGEX läuft als Bytes-Regex über "
+                        "ganze Eingabeblöcke, dekodiert werden nur Zeilen mit Treffer (ungültiges UTF-8 wird ersetzt).")
+
+    # Paralleles Matching
+    p.add_argument("--workers", type=int, default=0,
+                   help="Matching auf N Prozesse verteilen (zeilenbündige Chunks; Top-K nur näherungsweise gleich). "
+                        "Lohnt für große Eingaben, z. B. ein mehrere GB großes Log per Pipe. Default: aus.")
+
     # Header-Extras
     p.add_argument("--utc", action="store_true", help="Timestamp im Header in UTC ausgeben.")
     p.add_argument("--header", default="", help="Custom-Headertext; erscheint oben rechts vor dem Timestamp.")
@@ -198,6 +355,46 @@ def parse_args():
                    help="Eigenes Timeout (Sekunden) für --auxcmd. Default: --timeout.")
     p.add_argument("--aux-before", action="store_true",
                    help="Aux-Block vor dem Hauptblock ausgeben.")
+    p.add_argument("--aux-interval", type=float, default=None,
+                   help="Eigener Takt (Sekunden) für --auxcmd, das im Hintergrund läuft. "
+                        "Default: Anzeigeintervall (-t/--iterative), sonst 5s.")
+
+    # Profiling
+    p.add_argument("--profile", action="store_true",
+                   help="Zeit je Stufe (read/match/transform/render/truncate/aux/write) pro Frame messen; "
+                        "mit --clear als zusätzliche Statuszeile, beim Beenden Zusammenfassung auf STDERR. "
+                        "Warten auf Eingabe bzw. Kommando (inkl. Zeit bis zum ersten Byte) wird getrennt ausgewiesen.")
+    p.add_argument("--profile-ndjson", metavar="DATEI",
+                   help="Stufenzeiten zusätzlich pro Frame als NDJSON an DATEI anhängen (impliziert --profile).")
+
+    # Regex-Kosten
+    p.add_argument("--pattern-cost", action="store_true",
+                   help="Regex-Zeit und Auswertungen je Pattern messen; mit --clear Statuszeile mit den "
+                        "langsamsten IDs, beim Beenden Tabelle auf STDERR.")
+    p.add_argument("--pattern-budget", type=float, metavar="MS",
+                   help="Zeitbudget je Pattern und Eingabeblock in ms; ein Pattern, das es überschreitet, wird "
+                        "abgeschaltet statt die Anzeige einzufrieren (impliziert --pattern-cost).")
+
+    # Raten
+    p.add_argument("--no-rates", action="store_true",
+                   help="Spalte mit gleitenden Raten (Treffer/s über 10s/1m/5m) und Sparkline (letzte Minute) ausblenden.")
+
+    # Distinct-Zählung
+    p.add_argument("--distinct", action="store_true",
+                   help="Spalte mit der ungefähren Anzahl verschiedener Wörter je Pattern (HyperLogLog, "
+                        "wenige KB je Pattern unabhängig von der Stromlänge).")
+    p.add_argument("--distinct-of", choices=("word", "ref"), default=None,
+                   help="Was gezählt wird: extrahiertes Wort (Default) oder \\1 (impliziert --distinct).")
+    p.add_argument("--distinct-error", type=float, default=None, metavar="PROZENT",
+                   help=f"Standardfehler der Distinct-Spalte in Prozent (Default: {HLL_DEFAULT_ERROR:g}; "
+                        f"0.406 bis 26, kleiner = mehr Speicher; impliziert --distinct).")
+
+    # Headless
+    p.add_argument("--json", action="store_true",
+                   help="Headless: statt Frames pro Intervall einen NDJSON-Datensatz auf STDOUT ausgeben "
+                        "(ID, count, delta, häufigste Wörter als \"top\", jüngste als \"recent\", Alt-Wörter, Refs). Im Pipe-Modus endet patwatch mit STDIN.")
+    p.add_argument("--json-words", type=int, default=10, metavar="N",
+                   help="Anzahl der häufigsten (top) und jüngsten Wörter/Alt-Wörter (recent/alts) je Pattern im NDJSON-Datensatz (Default: 10).")
 
     # Farben
     p.add_argument("--color", action="store_true",
@@ -206,6 +403,8 @@ def parse_args():
     # Ansicht-Modus
     p.add_argument("--alt-view", action="store_true",
                    help="Startet direkt in der Alt-Ansicht (transformierte Wörter). Standard: Normal-Ansicht (Original-Wörter).")
+    p.add_argument("--top-view", action="store_true",
+                   help="Startet in der Top-K-Ansicht (häufigste Wörter je Pattern mit Zähler, Taste 't').")
 
     args = p.parse_args()
 
@@ -229,9 +428,76 @@ def parse_args():
     if args.timeout is not None and args.timeout <= 0:
         sys.stderr.write("[ERROR] --timeout muss positiv sein.\n")
         sys.exit(2)
+    if args.max_fps is not None and args.max_fps <= 0:
+        sys.stderr.write("[ERROR] --max-fps muss positiv sein.\n")
+        sys.exit(2)
     if args.aux_timeout is not None and args.aux_timeout <= 0:
         sys.stderr.write("[ERROR] --aux-timeout muss positiv sein.\n")
         sys.exit(2)
+    if args.follow and (args.cmd or args.iterative is not None):
+        sys.stderr.write("[ERROR] --follow ist nicht mit --cmd oder --iterative kombinierbar.\n")
+        sys.exit(2)
+    if args.file and (args.cmd or args.iterative is not None or args.follow or args.clear
+                      or args.auxcmd or args.workers > 1):
+        sys.stderr.write("[ERROR] --file ist nicht mit --cmd, --iterative, --follow, --clear, "
+                         "--auxcmd oder --workers (ab 2) kombinierbar.\n")
+        sys.exit(2)
+    if args.bytes and (args.workers > 1 or args.pattern_cost or args.pattern_budget is not None):
+        sys.stderr.write("[ERROR] --bytes ist nicht mit --workers (ab 2), --pattern-cost oder --pattern-budget kombinierbar.\n")
+        sys.exit(2)
+    if args.hosts and (not args.cmd or args.iterative is not None or args.follow or args.file):
+        sys.stderr.write("[ERROR] --hosts benötigt --cmd und ist nicht mit --iterative, --follow oder --file kombinierbar.\n")
+        sys.exit(2)
+    if args.host_view and not args.hosts:
+        sys.stderr.write("[ERROR] --host-view benötigt --hosts.\n")
+        sys.exit(2)
+    if args.host_concurrency < 1:
+        sys.stderr.write("[ERROR] --host-concurrency muss mindestens 1 sein.\n")
+        sys.exit(2)
+    if args.resume and not args.state:
+        sys.stderr.write("[ERROR] --resume benötigt --state.\n")
+        sys.exit(2)
+    if args.state and args.file:
+        sys.stderr.write("[ERROR] --state ist nicht mit --file kombinierbar.\n")
+        sys.exit(2)
+    if args.state_interval <= 0:
+        sys.stderr.write("[ERROR] --state-interval muss positiv sein.\n")
+        sys.exit(2)
+    if args.follow_checkpoint and not args.follow:
+        sys.stderr.write("[ERROR] --follow-checkpoint benötigt --follow.\n")
+        sys.exit(2)
+    if args.workers < 0:
+        sys.stderr.write("[ERROR] --workers darf nicht negativ sein.\n")
+        sys.exit(2)
+    if args.aux_interval is not None and args.aux_interval <= 0:
+        sys.stderr.write("[ERROR] --aux-interval muss positiv sein.\n")
+        sys.exit(2)
+    if args.profile_ndjson:
+        args.profile = True
+    if args.json and (args.clear or args.auxcmd):
+        sys.stderr.write("[ERROR] --json ist nicht mit --clear oder --auxcmd kombinierbar.\n")
+        sys.exit(2)
+    if args.json_words < 0:
+        sys.stderr.write("[ERROR] --json-words darf nicht negativ sein.\n")
+        sys.exit(2)
+    if args.distinct_of is not None or args.distinct_error is not None:
+        args.distinct = True
+    if args.distinct_error is None:
+        args.distinct_error = HLL_DEFAULT_ERROR
+    elif not hll_error_range()[0] <= args.distinct_error <= hll_error_range()[1]:
+        lo, hi = hll_error_range()
+        sys.stderr.write(f"[ERROR] --distinct-error muss zwischen {lo:.3g} und {hi:g} Prozent liegen "
+                         f"(2^{HLL_MIN_P} bis 2^{HLL_MAX_P} Register).\n")
+        sys.exit(2)
+    if args.workers > 1 and (args.pattern_cost or args.pattern_budget is not None):
+        # Kostenmessung je Pattern (und das Budget) braucht die Auswertung im eigenen Prozess
+        sys.stderr.write("[ERROR] --workers ist nicht mit --pattern-cost oder --pattern-budget kombinierbar.\n")
+        sys.exit(2)
+    if args.pattern_budget is not None:
+        if args.pattern_budget <= 0:
+            sys.stderr.write("[ERROR] --pattern-budget muss positiv sein.\n")
+            sys.exit(2)
+        args.pattern_cost = True
 
     return args
 
@@ -348,47 +614,57 @@ def split_call(token: str):
     out = [a[1:-1] if (len(a)>=2 and a[0]==a[-1] and a[0] in "'\"") else a for a in out]
     return name.lower(), out
 
+# Transform-Funktionen ohne Match-Bezug (set/append/prepend/concat brauchen das Match und
+# werden separat behandelt). Wird von apply_pipeline() und compile_pipeline() geteilt.
+_PIPELINE_FUNCS = {
+    # String-Case
+    "upper": lambda s: s.upper(),
+    "lower": lambda s: s.lower(),
+    "title": lambda s: s.title(),
+    "swapcase": lambda s: s.swapcase(),
+    # Slicing
+    "first": lambda s,n="1": s[:int(n)],
+    "last":  lambda s,n="1": s[-int(n):] if s else s,
+    "slice": lambda s,a="",b="": s[(int(a) if a!="" else None):(int(b) if b!="" else None)],
+    "subst": lambda s,a="",b="": s[(int(a) if a!="" else None):(int(b) if b!="" else None)],  # Alias
+    # Trim/Whitespace
+    "strip": lambda s,chs="": s.strip(chs) if chs else s.strip(),
+    "lstrip": lambda s,chs="": s.lstrip(chs) if chs else s.lstrip(),
+    "rstrip": lambda s,chs="": s.rstrip(chs) if chs else s.rstrip(),
+    "collapse_ws": lambda s: " ".join(s.split()),
+    # Ersetzen
+    "replace_str": lambda s,a,b: s.replace(a,b),
+    "replace": lambda s,rx,repl,flag="": re.sub(rx, repl, s, flags=(re.I if ('i' in flag.lower()) else 0)),
+    "tr": lambda s,src,dst: s.translate(str.maketrans(src, dst)),
+    # Split/Extract
+    "split": lambda s,delim,idx="0": (s.split(delim)[int(idx)] if delim in s and len(s.split(delim))>int(idx) else ""),
+    "rsplit": lambda s,delim,idx="0": (s.rsplit(delim)[int(idx)] if delim in s and len(s.rsplit(delim))>int(idx) else ""),
+    "rextract": lambda s,rx,grp="1": (re.search(rx,s).group(int(grp)) if re.search(rx,s) else ""),
+    # Padding/Format
+    "padleft": lambda s,w,ch=" ": s.rjust(int(w), ch[:1] if ch else " "),
+    "padright": lambda s,w,ch=" ": s.ljust(int(w), ch[:1] if ch else " "),
+    "zfill": lambda s,w: s.zfill(int(w)),
+    "ensure_prefix": lambda s,p: s if s.startswith(p) else (p+s),
+    "ensure_suffix": lambda s,p: s if s.endswith(p) else (s+p),
+    # Zahlen (best effort)
+    "int": lambda s: str(int(float(s))) if s.strip() else s,
+    "float": lambda s: str(float(s)) if s.strip() else s,
+    "round": lambda s,d="0": (("{0:." + str(int(d)) + "f}").format(round(float(s), int(d)))) if s.strip() else s,
+}
+_TEMPLATE_FUNCS = ("set", "append", "prepend", "concat")
+
 def apply_pipeline(word: str, pipeline: str, m: Optional[re.Match]) -> str:
-    funcs = {
-        # String-Case
-        "upper": lambda s: s.upper(),
-        "lower": lambda s: s.lower(),
-        "title": lambda s: s.title(),
-        "swapcase": lambda s: s.swapcase(),
-        # Slicing
-        "first": lambda s,n="1": s[:int(n)],
-        "last":  lambda s,n="1": s[-int(n):] if s else s,
-        "slice": lambda s,a="",b="": s[(int(a) if a!="" else None):(int(b) if b!="" else None)],
-        "subst": lambda s,a="",b="": s[(int(a) if a!="" else None):(int(b) if b!="" else None)],  # Alias
-        # Trim/Whitespace
-        "strip": lambda s,chs="": s.strip(chs) if chs else s.strip(),
-        "lstrip": lambda s,chs="": s.lstrip(chs) if chs else s.lstrip(),
-        "rstrip": lambda s,chs="": s.rstrip(chs) if chs else s.rstrip(),
-        "collapse_ws": lambda s: " ".join(s.split()),
-        # Ersetzen
-        "replace_str": lambda s,a,b: s.replace(a,b),
-        "replace": lambda s,rx,repl,flag="": re.sub(rx, repl, s, flags=(re.I if ('i' in flag.lower()) else 0)),
-        "tr": lambda s,src,dst: s.translate(str.maketrans(src, dst)),
-        # Split/Extract
-        "split": lambda s,delim,idx="0": (s.split(delim)[int(idx)] if delim in s and len(s.split(delim))>int(idx) else ""),
-        "rsplit": lambda s,delim,idx="0": (s.rsplit(delim)[int(idx)] if delim in s and len(s.rsplit(delim))>int(idx) else ""),
-        "rextract": lambda s,rx,grp="1": (re.search(rx,s).group(int(grp)) if re.search(rx,s) else ""),
-        # Padding/Format
-        "padleft": lambda s,w,ch=" ": s.rjust(int(w), ch[:1] if ch else " "),
-        "padright": lambda s,w,ch=" ": s.ljust(int(w), ch[:1] if ch else " "),
-        "zfill": lambda s,w: s.zfill(int(w)),
-        "ensure_prefix": lambda s,p: s if s.startswith(p) else (p+s),
-        "ensure_suffix": lambda s,p: s if s.endswith(p) else (s+p),
-        # Zahlen (best effort)
-        "int": lambda s: str(int(float(s))) if s.strip() else s,
-        "float": lambda s: str(float(s)) if s.strip() else s,
-        "round": lambda s,d="0": (("{0:." + str(int(d)) + "f}").format(round(float(s), int(d)))) if s.strip() else s,
+    """Interpretiert die Pipeline bei jedem Aufruf neu (Referenz-Implementierung).
+       Im Hot-Path wird stattdessen die in PatternRec.alt_fn vorkompilierte Kette verwendet.
+    """
+    funcs = dict(_PIPELINE_FUNCS)
+    funcs.update({
         # Mit Templates im Lauf setzen/anhängen
         "set": lambda s,expr: apply_template(expr, m),
         "append": lambda s,expr: s + apply_template(expr, m),
         "prepend": lambda s,expr: apply_template(expr, m) + s,
         "concat": lambda s,expr: s + apply_template(expr, m),
-    }
+    })
 
     try:
         tokens = parse_pipeline(pipeline)
@@ -417,10 +693,487 @@ def apply_pipeline(word: str, pipeline: str, m: Optional[re.Match]) -> str:
         sys.stderr.write(f"[WARN] Unerwarteter Fehler in Transform-Pipeline: {e}. Wort unverändert gelassen.\n")
     return word
 
+# ---------- Vorkompilierte Templates & Pipelines ----------
+def compile_template(tmpl: str) -> Callable[[Optional[re.Match]], str]:
+    """Zerlegt ein Template einmalig in Literale und Gruppen-Referenzen.
+       Die zurückgegebene Funktion liefert exakt dasselbe wie apply_template(tmpl, m).
+    """
+    none_value = apply_template(tmpl, None)  # ohne Match konstant
+    parts: List[Tuple[str, object]] = []     # (Literal, None) oder ("", Gruppe)
+    lit: List[str] = []
+    i = 0; s = tmpl; L = len(s)
+
+    def ref(group):
+        if lit:
+            parts.append(("".join(lit), None)); lit.clear()
+        parts.append(("", group))
+
+    while i < L:
+        ch = s[i]
+        if ch != '\\':
+            lit.append(ch); i += 1; continue
+        i += 1
+        if i >= L: lit.append('\\'); break
+        c = s[i]
+        if c.isdigit():
+            j = i
+            while j < L and s[j].isdigit(): j += 1
+            ref(int(s[i:j]))
+            i = j; continue
+        if c == 'g' and i + 1 < L and s[i+1] == '<':
+            k = s.find('>', i+2)
+            if k != -1:
+                ref(s[i+2:k])
+                i = k + 1; continue
+            lit.append('\\g'); i += 1; continue
+        if c == 't': lit.append('\t'); i += 1; continue
+        if c == 'n': lit.append('\n'); i += 1; continue
+        if c == 'r': lit.append('\r'); i += 1; continue
+        if c == '\\': lit.append('\\'); i += 1; continue
+        lit.append(c); i += 1
+    if lit:
+        parts.append(("".join(lit), None))
+
+    if all(group is None for _, group in parts):
+        const = "".join(text for text, _ in parts)
+        return lambda m: none_value if m is None else const
+
+    def render(m: Optional[re.Match]) -> str:
+        if m is None:
+            return none_value
+        out = []
+        for text, group in parts:
+            if group is None:
+                out.append(text)
+                continue
+            try:
+                out.append(m.group(group) or "")
+            except IndexError:
+                pass
+        return "".join(out)
+    return render
+
+def _compile_step(tok: str):
+    """Übersetzt ein Pipeline-Token in eine Funktion (word, m) -> word; None = Token ignorieren."""
+    name, args = split_call(tok)
+    if name is None:
+        # Kein Funktionsaufruf → Template/Backref-Token (ersetzt das Wort)
+        render = compile_template(args)
+        return lambda w, m: render(m)
+    if name in _TEMPLATE_FUNCS:
+        if not args:
+            def missing(w, m):
+                raise TypeError(f"{name}() erwartet ein Template-Argument")
+            return missing
+        render = compile_template(args[0])
+        if name == "set":
+            return lambda w, m: render(m)
+        if name == "prepend":
+            return lambda w, m: render(m) + w
+        return lambda w, m: w + render(m)  # append/concat
+    f = _PIPELINE_FUNCS.get(name)
+    if not f:
+        return None
+    # Regex-Argumente einmalig kompilieren; bei Fehlern bleibt der generische Aufruf,
+    # damit Warnungen wie bisher zur Laufzeit erscheinen.
+    try:
+        if name == "replace" and len(args) in (2, 3):
+            crx = re.compile(args[0], re.I if (len(args) == 3 and 'i' in args[2].lower()) else 0)
+            repl = args[1]
+            return lambda w, m: crx.sub(repl, w)
+        if name == "rextract" and len(args) in (1, 2):
+            crx = re.compile(args[0]); grp = int(args[1]) if len(args) == 2 else 1
+            def rextract(w, m):
+                hit = crx.search(w)
+                return hit.group(grp) if hit else ""
+            return rextract
+    except (re.error, ValueError):
+        pass
+    args = tuple(args)
+    return lambda w, m: f(w, *args)
+
+def compile_pipeline(pipeline: str) -> Callable[[str, Optional[re.Match]], str]:
+    """Kompiliert Spalte 5 einmalig zu einer Funktionskette (Ergebnis identisch zu apply_pipeline)."""
+    steps = [st for st in (_compile_step(tok) for tok in parse_pipeline(pipeline)) if st is not None]
+
+    def run(word: str, m: Optional[re.Match]) -> str:
+        try:
+            for step in steps:
+                word = step(word, m)
+        except (ValueError, TypeError, IndexError) as e:
+            sys.stderr.write(f"[WARN] Transform-Pipeline Fehler: {e}. Wort unverändert gelassen.\n")
+        except re.error as e:
+            sys.stderr.write(f"[WARN] Regex-Fehler in Transform-Pipeline: {e}. Wort unverändert gelassen.\n")
+        except Exception as e:
+            sys.stderr.write(f"[WARN] Unerwarteter Fehler in Transform-Pipeline: {e}. Wort unverändert gelassen.\n")
+        return word
+    return run
+
 # ---------- Datenstruktur ----------
+HISTORY_WORDS = 128   # je Seite gespeicherte Wörter (Anzeige zeigt nur Anfang/Ende, die ins Terminal passen)
+MAX_REFS = 1024       # max. unterschiedliche \1-Werte für die Legende je Pattern
+TOPK_COUNTERS = 64    # Zähler je Pattern im Heavy-Hitter-Sketch (Top-K-Ansicht)
+HLL_DEFAULT_ERROR = 2.0  # Standardfehler der Distinct-Spalte in Prozent (→ 4096 Register, 4 KB)
+HLL_MIN_P, HLL_MAX_P = 4, 16  # 16 bis 65536 Register: Standardfehler 26 % bis 0.406 %
+
+class WordHistory:
+    """Wort-Historie mit konstantem Speicher: die ersten N Wörter (Liste) und die letzten N
+       (deque(maxlen=N)), dazwischen liegende werden nur gezählt. total ist immer exakt.
+    """
+    __slots__ = ("limit", "first", "last", "total", "lost_text")
+    def __init__(self, limit: int = HISTORY_WORDS):
+        self.limit = limit
+        self.first: List[str] = []
+        self.last: deque = deque(maxlen=limit)
+        self.total = 0
+        self.lost_text = False  # True, sobald ein nicht-leeres Wort aus der Mitte verworfen wurde
+
+    def append(self, word: str) -> None:
+        self.total += 1
+        if len(self.first) < self.limit:
+            self.first.append(word)
+        else:
+            last = self.last
+            if len(last) == self.limit and last[0]:
+                self.lost_text = True
+            last.append(word)
+
+    def clear(self) -> None:
+        self.first.clear()
+        self.last.clear()
+        self.total = 0
+        self.lost_text = False
+
+    @property
+    def dropped(self) -> int:
+        """Anzahl der Wörter in der Mitte, die nicht mehr gespeichert sind."""
+        return self.total - len(self.first) - len(self.last)
+
+    @property
+    def complete(self) -> bool:
+        """False, wenn die Anzeige wegen verworfener Wörter in jedem Fall gekürzt werden muss."""
+        return not self.lost_text
+
+    def words(self) -> List[str]:
+        """Gespeicherte Wörter in Ankunftsreihenfolge (ohne die ausgelassene Mitte)."""
+        return self.first + list(self.last) if self.last else list(self.first)
+
+    def merge(self, other: "WordHistory") -> None:
+        """Hängt 'other' an, als wären dessen Wörter nach den eigenen angekommen.
+           Das Ergebnis ist identisch zu einzelnen append()-Aufrufen (auch lost_text).
+        """
+        if not other.dropped:
+            for word in other.words():
+                self.append(word)
+            return
+        # other.total > 2N: erst den bekannten Anfang, danach verdrängen die ausgelassene
+        # Mitte und other.last alles, was jetzt noch im eigenen Ende steht.
+        for word in other.first:
+            self.append(word)
+        last = self.last
+        if other.lost_text or any(last):
+            self.lost_text = True
+        self.total += other.dropped + len(other.last)
+        last.clear()
+        last.extend(other.last)
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __bool__(self) -> bool:
+        return self.total > 0
+
+class SpaceSaving:
+    """Häufigste Wörter mit konstantem Speicher (Space-Saving-Sketch): höchstens 'size' Zähler.
+
+    Ein neues Wort bei vollem Sketch verdrängt das seltenste und übernimmt dessen Zählerstand
+    (+1); der übernommene Stand ist die Fehlerschranke (errors). Jedes Wort, das öfter als
+    total/size vorkommt, ist garantiert enthalten; ein Zähler überschätzt höchstens um error.
+    Die Wörter liegen zusätzlich in Buckets je Zählerstand (dict als geordnete Menge), damit
+    add() auch bei lauter verschiedenen Wörtern O(1) bleibt; verdrängt wird das älteste Wort
+    mit dem kleinsten Zähler.
+    """
+    __slots__ = ("size", "counts", "errors", "total", "buckets", "floor")
+    def __init__(self, size: int = TOPK_COUNTERS):
+        self.size = size
+        self.counts: dict = {}
+        self.errors: dict = {}
+        self.total = 0
+        self.buckets: dict = {}  # Zählerstand → {Wort: None}
+        self.floor = 0           # kleinster Zählerstand (bei vollem Sketch)
+
+    def _move(self, old_word: Optional[str], old: int, word: str, new: int) -> None:
+        """Nimmt old_word aus dem Bucket 'old' (0: keiner) und legt word mit Zähler new ab."""
+        buckets = self.buckets
+        if old:
+            bucket = buckets[old]
+            del bucket[old_word]
+            if not bucket:
+                del buckets[old]
+                if old == self.floor:
+                    self.floor = new
+        bucket = buckets.get(new)
+        if bucket is None:
+            bucket = buckets[new] = {}
+        bucket[word] = None
+        self.counts[word] = new
+
+    def add(self, word: str) -> None:
+        self.total += 1
+        c = self.counts.get(word)
+        if c is not None:
+            self._move(word, c, word, c + 1)
+        elif len(self.counts) < self.size:
+            self._move(None, 0, word, 1)
+            self.floor = 1
+        else:
+            low = self.floor
+            victim = next(iter(self.buckets[low]))
+            del self.counts[victim]
+            self.errors.pop(victim, None)
+            self._move(victim, low, word, low + 1)
+            self.errors[word] = low
+
+    def clear(self) -> None:
+        if self.total:
+            self.counts.clear()
+            self.errors.clear()
+            self.buckets.clear()
+            self.total = 0
+            self.floor = 0
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """(Wort, Zähler, Fehler) absteigend nach der garantierten Häufigkeit (Zähler - Fehler),
+           dann nach Zähler; bei Gleichstand das früher erfasste Wort zuerst."""
+        errors = self.errors
+        items = sorted(((w, c, errors.get(w, 0)) for w, c in self.counts.items()),
+                       key=lambda it: (it[2] - it[1], -it[1]))
+        return items if n is None else items[:n]
+
+    def merge(self, other: "SpaceSaving") -> None:
+        """Vereinigt zwei Sketches (z. B. aus --workers-Chunks). Fehlt ein Wort in einem vollen
+           Sketch, zählt dessen kleinster Zähler als mögliche Häufigkeit (und als Fehler)."""
+        if not other.total:
+            return
+        floor_a = self.floor if len(self.counts) >= self.size else 0
+        floor_b = other.floor if len(other.counts) >= other.size else 0
+        counts: dict = {}
+        errors: dict = {}
+        for word in list(self.counts) + [w for w in other.counts if w not in self.counts]:
+            a = self.counts.get(word)
+            b = other.counts.get(word)
+            counts[word] = (floor_a if a is None else a) + (floor_b if b is None else b)
+            errors[word] = ((floor_a if a is None else self.errors.get(word, 0))
+                            + (floor_b if b is None else other.errors.get(word, 0)))
+        total = self.total + other.total
+        self.clear()
+        self.total = total
+        for word in sorted(counts, key=counts.__getitem__, reverse=True)[:self.size]:
+            self._move(None, 0, word, counts[word])
+            if errors[word]:
+                self.errors[word] = errors[word]
+        self.floor = min(self.buckets) if self.buckets else 0
+
+_HLL_INV_POW2 = [2.0 ** -r for r in range(65)]
+
+def hll_precision(error_pct: float) -> int:
+    """Registerzahl 2^p für einen Standardfehler von error_pct Prozent (1.04/sqrt(m)), p in 4..16
+       (parse_args() weist Fehler außerhalb von hll_error_range() ab)."""
+    m = (1.04 / (error_pct / 100.0)) ** 2
+    return min(HLL_MAX_P, max(HLL_MIN_P, math.ceil(math.log2(m))))
+
+def hll_error_range() -> Tuple[float, float]:
+    """(kleinster, größter) Standardfehler in Prozent, den p in HLL_MIN_P..HLL_MAX_P erreicht."""
+    return 104.0 / math.sqrt(1 << HLL_MAX_P), 104.0 / math.sqrt(1 << HLL_MIN_P)
+
+class HyperLogLog:
+    """Ungefähre Anzahl verschiedener Werte mit festem Speicher: 2^p Register à 1 Byte.
+
+    Jeder Wert wird (prozessunabhängig, damit --workers-Teilergebnisse zusammenpassen) auf
+    64 Bit gehasht; die oberen p Bit wählen das Register, die Position der ersten 1 im Rest
+    ist dessen Kandidat. Die Summe der 2^-Register und die Zahl leerer Register werden beim
+    Einfügen mitgeführt, estimate() kostet daher nichts. by_ref: \\1 statt des Worts zählen.
+    """
+    __slots__ = ("p", "m", "shift", "mask", "registers", "zsum", "zeros", "by_ref")
+    def __init__(self, p: int = 12, by_ref: bool = False):
+        self.p = p
+        self.m = 1 << p
+        self.shift = 64 - p
+        self.mask = (1 << self.shift) - 1
+        self.by_ref = by_ref
+        self.registers = bytearray(self.m)
+        self.zsum = float(self.m)
+        self.zeros = self.m
+
+    def add(self, value: str) -> None:
+        x = int.from_bytes(hashlib.blake2b(value.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little")
+        idx = x >> self.shift
+        rank = self.shift - (x & self.mask).bit_length() + 1
+        old = self.registers[idx]
+        if rank > old:
+            self.registers[idx] = rank
+            self.zsum += _HLL_INV_POW2[rank] - _HLL_INV_POW2[old]
+            if not old:
+                self.zeros -= 1
+
+    def estimate(self) -> float:
+        m = self.m
+        if self.zeros == m:
+            return 0.0
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        est = alpha * m * m / self.zsum
+        if est <= 2.5 * m and self.zeros:
+            est = m * math.log(m / self.zeros)  # kleine Mengen: Linear Counting
+        return est
+
+    def clear(self) -> None:
+        if self.zeros != self.m:
+            self.registers = bytearray(self.m)
+            self.zsum = float(self.m)
+            self.zeros = self.m
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Vereinigung (registerweises Maximum), z. B. für --workers-Teilergebnisse."""
+        if other.zeros == other.m:
+            return
+        regs = bytearray(map(max, self.registers, other.registers))
+        self.registers = regs
+        self.zsum = sum(_HLL_INV_POW2[r] for r in regs)
+        self.zeros = regs.count(0)
+
+def enable_distinct(patterns: List["PatternRec"], p: int, by_ref: bool) -> None:
+    """Gibt jedem Pattern ein HyperLogLog für die Distinct-Spalte (--distinct)."""
+    for pat in patterns:
+        pat.distinct = HyperLogLog(p, by_ref)
+
+def distinct_column(pat: "PatternRec") -> str:
+    """Spalte "≈1.2k" (ungefähre Anzahl verschiedener Wörter bzw. \\1-Werte), feste Breite."""
+    return f"{'≈' + format_rate(pat.distinct.estimate()):>7}"
+
+# ---------- Gleitende Raten & Sparklines ----------
+RATE_BUCKET_SECONDS = 1.0  # Breite eines Zähl-Buckets
+RATE_BUCKETS = 300         # Ringgröße: 5 Minuten Historie je Pattern (1.2 KB, unabhängig von der Laufzeit)
+RATE_WINDOWS = (10, 60, 300)
+SPARK_WIDTH = 12           # Sparkline-Zeichen (jeweils SPARK_SPAN/SPARK_WIDTH Sekunden)
+SPARK_SPAN = 60
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+def format_pattern_rate(per_sec: float) -> str:
+    """Rate pro Pattern: kleine Raten mit einer Nachkommastelle (0.3), sonst wie format_rate()."""
+    return f"{per_sec:.1f}" if per_sec < 10 else format_rate(per_sec)
+
+class RateRing:
+    """Treffer pro Zeitintervall in einem Ring fester Größe (array, konstanter Speicher).
+
+    Bucket i zählt die Treffer des Intervalls i (absolut: monotonic // Breite), abgelegt an
+    Position i % Größe; beim Weiterdrehen werden übersprungene Buckets genullt. record()
+    übernimmt das Delta eines Zählers, daher kostet die Ratenmessung im Matching-Pfad nichts.
+    """
+    __slots__ = ("buckets", "width", "head", "origin", "seen", "_cache_key", "_cache", "_text", "_text_for")
+    def __init__(self, size: int = RATE_BUCKETS, width: float = RATE_BUCKET_SECONDS):
+        self.buckets = array("I", bytes(4 * size))
+        self.width = width
+        self.head: Optional[int] = None  # absoluter Index des jüngsten Buckets
+        self.origin = time.monotonic()   # Messbeginn (kürzere Fenster beim Anlauf)
+        self.seen = 0                    # Zählerstand bei der letzten Aufzeichnung
+        self._cache_key = None
+        self._cache = None
+        self._text = ""        # formatierte Spalte zu _text_for (rate_column)
+        self._text_for = None
+
+    def clear(self) -> None:
+        self.origin = time.monotonic()
+        self.seen = 0
+        if self.head is not None:
+            self.buckets = array("I", bytes(4 * len(self.buckets)))
+            self.head = None
+            self._cache_key = None
+
+    def _advance(self, now: float) -> int:
+        idx = int(now // self.width)
+        head = self.head
+        if head is None:
+            self.head = idx
+        elif idx > head:
+            buckets = self.buckets
+            size = len(buckets)
+            for i in range(head + 1, min(idx, head + size) + 1):
+                buckets[i % size] = 0
+            self.head = idx
+        return self.head
+
+    def record(self, count: int, now: float) -> None:
+        """Übernimmt die seit dem letzten Aufruf hinzugekommenen Treffer (count ist der Gesamtzähler)."""
+        delta = count - self.seen
+        self.seen = count
+        if delta <= 0:
+            return
+        idx = self._advance(now)
+        self.buckets[idx % len(self.buckets)] += delta
+
+    def window(self, n: int) -> array:
+        """Die letzten n Buckets (ältester zuerst, jüngster = laufendes Intervall)."""
+        buckets = self.buckets
+        size = len(buckets)
+        end = self.head % size + 1
+        if n <= end:
+            return buckets[end - n:end]
+        return buckets[size - (n - end):] + buckets[:end]
+
+    def snapshot(self, now: float) -> Tuple[Tuple[float, ...], List[int]]:
+        """(Raten je RATE_WINDOWS in Treffer/s, Sparkline-Werte über SPARK_SPAN Sekunden).
+           Neu berechnet wird nur, wenn ein Bucket weitergedreht hat oder neue Treffer kamen."""
+        if self.head is None:
+            return _IDLE_SNAPSHOT
+        idx = self._advance(now)
+        key = (idx, self.seen)
+        if key == self._cache_key:
+            return self._cache
+        size = len(self.buckets)
+        width = self.width
+        recent = self.window(min(max(RATE_WINDOWS), size))
+        elapsed = max(now - self.origin, width)
+        rates = []
+        for w in RATE_WINDOWS:
+            n = min(int(w / width), size)
+            rates.append(sum(recent[-n:]) / min(w, elapsed))
+        per = max(1, int(SPARK_SPAN / width) // SPARK_WIDTH)
+        spark_src = recent[-per * SPARK_WIDTH:]
+        spark = [sum(spark_src[i:i + per]) for i in range(0, len(spark_src), per)]
+        self._cache_key = key
+        self._cache = (tuple(rates), spark)
+        return self._cache
+
+_IDLE_SNAPSHOT = ((0.0,) * len(RATE_WINDOWS), [0] * SPARK_WIDTH)
+
+def sparkline(values: List[int]) -> str:
+    """Balken relativ zum Maximum der Zeile; Intervalle ohne Treffer als niedrigster Balken."""
+    top = max(values) if values else 0
+    if top <= 0:
+        return SPARK_CHARS[0] * len(values)
+    steps = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[1 + v * (steps - 1) // top] if v else SPARK_CHARS[0] for v in values)
+
+def record_rates(patterns: List["PatternRec"], now: float) -> None:
+    """Überträgt die Zähler-Deltas seit dem letzten Aufruf in die Rate-Ringe (O(Patterns))."""
+    for pat in patterns:
+        if pat.count != pat.rate.seen:
+            pat.rate.record(pat.count, now)
+
+def rate_column(pat: "PatternRec", now: float) -> str:
+    """Spalte "10s 1m 5m Sparkline" (Treffer/s), feste Breite."""
+    ring = pat.rate
+    snap = ring.snapshot(now)
+    if ring._text_for is not snap:
+        rates, spark = snap
+        ring._text = " ".join(f"{format_pattern_rate(r):>5}" for r in rates) + " " + sparkline(spark)
+        ring._text_for = snap
+    return ring._text
+
 class PatternRec:
-    __slots__ = ("pid","line_re","word_re","tmpl","transforms","orig_ref","found_refs",
-                 "count","head","head_keys","head_count","alts","orig_words","tail_max","tail","tail_keys")
+    __slots__ = ("pid","line_re","word_re","tmpl","transforms","tmpl_fn","alt_fn","orig_ref","found_refs",
+                 "refs_sorted","refs_version","count","head","head_keys","head_count","alts","orig_words",
+                 "rate","cost_ns","evals","disabled","line_brx","top","distinct","spec")
     def __init__(self, pid: str, line_re: Pattern, word_re: Optional[Pattern],
                  tmpl: str, transforms: str):
         self.pid = pid
@@ -428,9 +1181,14 @@ class PatternRec:
         self.word_re = word_re
         self.tmpl = tmpl
         self.transforms = transforms  # 5. Spalte (Pipeline)
+        # Spalte 4 und 5 einmalig vorkompilieren (statt pro Treffer neu zu parsen)
+        self.tmpl_fn = compile_template(tmpl) if tmpl else None
+        self.alt_fn = compile_pipeline(transforms) if transforms else None
         # Extrahiere Backreference aus Spalte 5 (z.B. \1, \2, etc.)
         self.orig_ref = ""
-        self.found_refs = set()  # Sammle alle gefundenen Backreferences
+        self.found_refs = {}  # Gefundene Backreferences in Ankunftsreihenfolge (max. MAX_REFS verschiedene)
+        self.refs_sorted: List[str] = []  # found_refs sortiert, inkrementell gepflegt (Legende)
+        self.refs_version = 0             # steigt bei jeder Änderung von found_refs (Legenden-Cache)
         if transforms:
             # Suche nach Backreferences wie \1, \2, etc.
             import re
@@ -438,14 +1196,21 @@ class PatternRec:
             if backref_match:
                 self.orig_ref = backref_match.group(0)  # z.B. "\1"
         self.count = 0
-        self.head: List[str] = []
-        self.head_keys: List[str] = []   # Farb-Key je Head-Wort (Altwort dominiert)
+        # Wort-Historien mit fester Größe (Anfang + Ende); Speicher bleibt unabhängig von der Streamlänge
+        self.head = WordHistory()
+        self.head_keys = WordHistory()   # Farb-Key je Head-Wort (Altwort dominiert)
         self.head_count = 0
-        self.tail_max = 0  # Keine Tail-Begrenzung mehr
-        self.tail = deque()  # Unbegrenzt
-        self.tail_keys = deque()  # Unbegrenzt
-        self.alts: List[str] = []  # Historie alternativer Wörter (für Alt-Ansicht)
-        self.orig_words: List[str] = []  # Ursprüngliche Wörter vor Transformation (für Legende)
+        self.alts = WordHistory()        # Historie alternativer Wörter (für Alt-Ansicht)
+        self.orig_words = WordHistory()  # Ursprüngliche Wörter vor Transformation
+        self.rate = RateRing()           # Treffer pro Sekunde der letzten 5 Minuten (Raten, Sparkline)
+        self.top = SpaceSaving()         # häufigste Wörter (Top-K-Ansicht, Taste 't')
+        self.distinct: Optional[HyperLogLog] = None  # verschiedene Werte (--distinct, sonst aus)
+        self.spec: tuple = ()            # Rohfelder aus der Pattern-Datei (Vergleich beim Hot Reload)
+        # Regex-Kosten (--pattern-cost): kumulierte Zeit und Anzahl Auswertungen, bleiben bei Reset erhalten
+        self.cost_ns = 0
+        self.evals = 0
+        self.disabled = False            # vom Zeitbudget (--pattern-budget) abgeschaltet
+        self.line_brx: Optional[Pattern] = None  # Bytes-Variante der LINE_REGEX (--bytes, --file)
 
 def compile_rx(rx: str, flags: int) -> Pattern:
     return re.compile(rx, flags)
@@ -456,8 +1221,8 @@ def extract_word_and_match(line: str, pat: PatternRec, cg_sep: str) -> Tuple[str
         m = pat.word_re.search(line)
         if not m:
             return "", None
-        if pat.tmpl:
-            return apply_template(pat.tmpl, m), m
+        if pat.tmpl_fn is not None:
+            return pat.tmpl_fn(m), m
         if m.lastindex:
             parts = [g for g in m.groups() if g]
             return (cg_sep.join(parts) if parts else m.group(0)), m
@@ -465,7 +1230,357 @@ def extract_word_and_match(line: str, pat: PatternRec, cg_sep: str) -> Tuple[str
     # ohne WORD_REGEX
     return last_word(line), None
 
-def load_patterns(path: str, fs: str, flags: int) -> List[PatternRec]:
+# ---------- Literal-Vorfilter ----------
+try:
+    import re._parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+PREFILTER_MIN_PATTERNS = 40   # darunter ist die direkte Regex-Schleife schneller
+_MAX_LITERAL_LEN = 64         # längere Literale werden gekürzt (Präfix bleibt Pflicht-Literal)
+_REPEATS = tuple(getattr(_sre_parse, n) for n in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+                 if hasattr(_sre_parse, n))
+
+def _literal_options(items, icase: bool) -> List[List[str]]:
+    """Sammelt Literal-Alternativen, von denen jede Zeile mit Treffer mind. eine enthalten muss.
+       Ergebnis: Liste von "Any-Sets" (je eine Liste von Literalen). Leere Liste = nichts extrahierbar.
+    """
+    options: List[List[str]] = []
+    cur: List[str] = []
+
+    def flush():
+        if cur:
+            options.append(["".join(cur)]); cur.clear()
+
+    def walk(seq):
+        for op, av in seq:
+            if op is _sre_parse.LITERAL:
+                ch = chr(av)
+                # Bei IGNORECASE nur ASCII ohne i/k/s (diese haben Sonder-Äquivalente wie 'ſ', 'ı', Kelvin-K)
+                if icase and (not ch.isascii() or ch.lower() in "iks"):
+                    flush(); continue
+                cur.append(ch.lower() if icase else ch)
+            elif op is _sre_parse.SUBPATTERN and not av[1] and not av[2]:
+                walk(av[3])  # Gruppe ohne Flag-Änderung: Inhalt ist Pflicht
+            elif op is getattr(_sre_parse, "ATOMIC_GROUP", None):
+                walk(av)
+            elif op in _REPEATS and av[0] >= 1:
+                flush(); walk(av[2]); flush()
+            elif op is _sre_parse.BRANCH:
+                flush()
+                best_per_branch = []
+                for branch in av[1]:
+                    sub = _literal_options(branch, icase)
+                    if not sub:
+                        break
+                    best_per_branch.append(_best_option(sub))
+                else:
+                    options.append([lit for opt in best_per_branch for lit in opt])
+            else:
+                flush()
+    walk(items)
+    flush()
+    return options
+
+def _best_option(options: List[List[str]]) -> List[str]:
+    """Wählt das selektivste Any-Set: längstes kürzestes Literal, bei Gleichstand weniger Alternativen."""
+    return max(options, key=lambda opt: (min(len(x) for x in opt), -len(opt)))
+
+def required_literals(rx: str, flags: int) -> List[str]:
+    """Liefert Literale, von denen jede passende Zeile mindestens eines enthält ([] = keine)."""
+    try:
+        parsed = _sre_parse.parse(rx, flags)
+    except Exception:
+        return []
+    icase = bool((flags | parsed.state.flags) & re.IGNORECASE)
+    options = _literal_options(list(parsed), icase)
+    if not options:
+        return []
+    return sorted({lit[:_MAX_LITERAL_LEN] for lit in _best_option(options)})
+
+def _trie_regex(literals: List[str]) -> str:
+    """Baut aus den Literalen einen Trie und serialisiert ihn als Regex (längster Treffer zuerst)."""
+    trie: dict = {}
+    for lit in literals:
+        node = trie
+        for ch in lit:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node) -> str:
+        alts = [re.escape(ch) + emit(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+    return emit(trie)
+
+class LiteralPrefilter:
+    """Multi-String-Automat über die Pflicht-Literale aller LINE_REGEX.
+
+    Alle Literale einer Flag-Gruppe werden zu einem Trie zusammengefasst, der als eine Regex
+    (Lookahead mit einer Capture-Gruppe) in C abgearbeitet wird. Pro Position liefert er das
+    längste Literal; kürzere Literale, die dessen Präfix sind, werden über eine vorberechnete
+    Tabelle mitgenommen. Eine Zeile wird danach nur noch gegen die Patterns geprüft, deren
+    Literal vorkommt, plus die Patterns ohne extrahierbares Literal.
+    """
+    def __init__(self, patterns: List[PatternRec]):
+        self.patterns = list(patterns)
+        by_flags: dict = {}   # icase -> {literal: set(pattern-index)}
+        fallback: List[int] = []
+        for idx, pat in enumerate(self.patterns):
+            flags = pat.line_re.flags
+            lits = required_literals(pat.line_re.pattern, flags)
+            if not lits:
+                fallback.append(idx)
+                continue
+            table = by_flags.setdefault(bool(flags & re.IGNORECASE), {})
+            for lit in lits:
+                table.setdefault(lit, set()).add(idx)
+        self.fallback = fallback
+        self.fallback_pats = [self.patterns[i] for i in fallback]
+        self.automata = []  # (regex, icase, {literal: tuple(pattern-index)})
+        for icase, table in by_flags.items():
+            targets = {}
+            for lit in table:
+                hit = set()
+                for k in range(1, len(lit) + 1):
+                    hit |= table.get(lit[:k], set())
+                targets[lit] = tuple(sorted(hit))
+            rx = re.compile("(?=(" + _trie_regex(list(table)) + "))", re.IGNORECASE if icase else 0)
+            self.automata.append((rx, icase, targets))
+
+    def candidates(self, line: str) -> List[PatternRec]:
+        """Patterns (in Original-Reihenfolge), deren LINE_REGEX für diese Zeile getestet werden muss."""
+        hits = None
+        for rx, icase, targets in self.automata:
+            for m in rx.finditer(line):
+                found = m.group(1)
+                idxs = targets.get(found.lower() if icase else found)
+                if idxs:
+                    if hits is None:
+                        hits = set(self.fallback)
+                    hits.update(idxs)
+        if hits is None:
+            return self.fallback_pats
+        pats = self.patterns
+        return [pats[i] for i in sorted(hits)]
+
+# ---------- Backtracking-Check ----------
+# Statische Prüfung auf Regex-Formen, bei denen re (Backtracking-Engine) exponentiell bzw.
+# polynomiell viele Wege probiert. Zeichenmengen werden über ein Probe-Alphabet angenähert.
+_PROBE_CHARS = frozenset(chr(c) for c in range(32, 127)) | frozenset("\t\näöüß")
+_CATEGORY_TESTS = {}
+for _name, _rx in (("CATEGORY_DIGIT", r"\d"), ("CATEGORY_NOT_DIGIT", r"\D"), ("CATEGORY_SPACE", r"\s"),
+                   ("CATEGORY_NOT_SPACE", r"\S"), ("CATEGORY_WORD", r"\w"), ("CATEGORY_NOT_WORD", r"\W")):
+    if hasattr(_sre_parse, _name):
+        _CATEGORY_TESTS[getattr(_sre_parse, _name)] = frozenset(c for c in _PROBE_CHARS if re.match(_rx, c))
+_NO_BACKTRACK = tuple(getattr(_sre_parse, n) for n in ("POSSESSIVE_REPEAT", "ATOMIC_GROUP")
+                      if hasattr(_sre_parse, n))
+
+def _class_chars(items) -> frozenset:
+    """Zeichen (aus dem Probe-Alphabet), die eine Klasse [...] akzeptiert."""
+    chars = set()
+    negate = False
+    for op, av in items:
+        if op is _sre_parse.NEGATE:
+            negate = True
+        elif op is _sre_parse.LITERAL:
+            chars.add(chr(av))
+        elif op is _sre_parse.RANGE:
+            chars.update(c for c in _PROBE_CHARS if av[0] <= ord(c) <= av[1])
+        elif op is _sre_parse.CATEGORY:
+            chars |= _CATEGORY_TESTS.get(av, _PROBE_CHARS)
+        else:
+            chars |= _PROBE_CHARS
+    return frozenset(_PROBE_CHARS - chars) if negate else frozenset(chars)
+
+def _item_chars(op, av) -> Optional[frozenset]:
+    """Zeichenmenge eines Ein-Zeichen-Elements, sonst None."""
+    if op is _sre_parse.LITERAL:
+        return frozenset((chr(av),))
+    if op is _sre_parse.NOT_LITERAL:
+        return _PROBE_CHARS - {chr(av)}
+    if op is _sre_parse.ANY:
+        return _PROBE_CHARS - {"\n"}
+    if op is _sre_parse.IN:
+        return _class_chars(av)
+    return None
+
+def _nullable(op, av) -> bool:
+    """True, wenn das Element das leere Wort matchen kann."""
+    if op in _REPEATS:
+        return av[0] == 0 or _seq_nullable(av[2])
+    if op is _sre_parse.SUBPATTERN:
+        return _seq_nullable(av[3])
+    if op is _sre_parse.BRANCH:
+        return any(_seq_nullable(b) for b in av[1])
+    if op is getattr(_sre_parse, "ATOMIC_GROUP", None):
+        return _seq_nullable(av)
+    if op in (_sre_parse.AT, _sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+        return True
+    return False
+
+def _seq_nullable(seq) -> bool:
+    return all(_nullable(op, av) for op, av in seq)
+
+def _all_chars(seq) -> frozenset:
+    """Alle Zeichen, die irgendwo in einem Treffer von seq vorkommen können (Näherung)."""
+    chars = set()
+    for op, av in seq:
+        single = _item_chars(op, av)
+        if single is not None:
+            chars |= single
+        elif op in _REPEATS:
+            chars |= _all_chars(av[2])
+        elif op is _sre_parse.SUBPATTERN:
+            chars |= _all_chars(av[3])
+        elif op is _sre_parse.BRANCH:
+            for b in av[1]:
+                chars |= _all_chars(b)
+        elif op is getattr(_sre_parse, "ATOMIC_GROUP", None):
+            chars |= _all_chars(av)
+        elif op is _sre_parse.GROUPREF:
+            chars |= _PROBE_CHARS
+    return frozenset(chars)
+
+def _first_chars(seq, last: bool = False) -> frozenset:
+    """Zeichen, mit denen ein Treffer von seq beginnen (last=True: enden) kann (Näherung)."""
+    chars = set()
+    for op, av in (reversed(list(seq)) if last else seq):
+        single = _item_chars(op, av)
+        if single is not None:
+            chars |= single
+        elif op in _REPEATS:
+            chars |= _first_chars(av[2], last)
+        elif op is _sre_parse.SUBPATTERN:
+            chars |= _first_chars(av[3], last)
+        elif op is _sre_parse.BRANCH:
+            for b in av[1]:
+                chars |= _first_chars(b, last)
+        elif op is getattr(_sre_parse, "ATOMIC_GROUP", None):
+            chars |= _first_chars(av, last)
+        elif op is _sre_parse.GROUPREF:
+            chars |= _PROBE_CHARS
+        if not _nullable(op, av):
+            break
+    return frozenset(chars)
+
+def _unbounded(op, av) -> bool:
+    return op in _REPEATS and op not in _NO_BACKTRACK and av[1] == _sre_parse.MAXREPEAT
+
+def _inner_repeats(seq):
+    """Unbegrenzte Wiederholungen direkt im Rumpf (durch Gruppen hindurch, nicht durch atomare)."""
+    for op, av in seq:
+        if _unbounded(op, av):
+            yield op, av
+        elif op is _sre_parse.SUBPATTERN:
+            yield from _inner_repeats(av[3])
+        elif op is _sre_parse.BRANCH:
+            for b in av[1]:
+                yield from _inner_repeats(b)
+
+def _flatten(seq) -> list:
+    """Sequenz ohne Gruppenklammern (Inhalt von SUBPATTERN eingebettet)."""
+    out = []
+    for op, av in seq:
+        if op is _sre_parse.SUBPATTERN:
+            out.extend(_flatten(av[3]))
+        else:
+            out.append((op, av))
+    return out
+
+def backtracking_risks(rx: str, flags: int = 0) -> List[str]:
+    """Statischer Check einer Regex auf katastrophales Backtracking. Erkennt:
+       - verschachtelte Quantoren ohne trennendes Zeichen, z. B. (a+)+, (\w+\s?)*  → exponentiell
+       - Alternativen mit überlappendem Anfang unter einem Quantor, z. B. (a|ab)*  → exponentiell
+       - direkt aufeinanderfolgende, überlappende Quantoren, z. B. \d+\d+, .*.*  → polynomiell
+       Liefert Beschreibungen (leer = unauffällig). Possessive Quantoren und atomare Gruppen gelten
+       als sicher.
+    """
+    try:
+        parsed = _sre_parse.parse(rx, flags)
+    except Exception:
+        return []
+    risks: List[str] = []
+
+    def note(text: str) -> None:
+        if text not in risks:
+            risks.append(text)
+
+    def walk(seq) -> None:
+        flat = _flatten(seq)
+        # Aufeinanderfolgende unbegrenzte Quantoren, dazwischen nur Optionales
+        prev = None
+        for op, av in flat:
+            if _unbounded(op, av):
+                cur = _first_chars(av[2], last=True)
+                if prev is not None and prev & _first_chars(av[2]):
+                    note("aufeinanderfolgende Quantoren über überlappende Zeichen (polynomiell)")
+                # Über optionale Quantoren hinweg bleibt der Vorgänger im Spiel (\d+\s*\d+)
+                prev = (prev | cur) if (prev is not None and av[0] == 0) else cur
+            elif not _nullable(op, av):
+                prev = None
+        for op, av in seq:
+            if op in _NO_BACKTRACK:
+                continue  # atomar/possessiv: kein Zurückgehen in den Rumpf
+            if _unbounded(op, av) or (op in _REPEATS and av[1] > 1):
+                body = av[2]
+                if _unbounded(op, av):
+                    body_flat = _flatten(body)
+                    for inner_op, inner_av in _inner_repeats(body):
+                        inner_chars = _all_chars(inner_av[2])
+                        # sicher nur, wenn ein Pflicht-Element des Rumpfs disjunkt zum inneren Quantor ist
+                        separated = any(
+                            not _nullable(o, a) and (o, a) != (inner_op, inner_av)
+                            and not (_first_chars([(o, a)]) & inner_chars)
+                            for o, a in body_flat)
+                        if not separated:
+                            note("verschachtelte Quantoren, z. B. (a+)+ (exponentiell)")
+                            break
+                    for o, a in body_flat:
+                        if o is _sre_parse.BRANCH:
+                            firsts = [_first_chars(b) for b in a[1]]
+                            if any(firsts[i] & firsts[j] for i in range(len(firsts))
+                                   for j in range(i + 1, len(firsts))):
+                                note("Alternativen mit überlappendem Anfang unter Quantor, z. B. (a|ab)* (exponentiell)")
+                walk(body)
+            elif op is _sre_parse.SUBPATTERN:
+                walk(av[3])
+            elif op is _sre_parse.BRANCH:
+                for b in av[1]:
+                    walk(b)
+            elif op in (_sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+                walk(av[1])
+
+    walk(parsed)
+    return risks
+
+class PatternSet(list):
+    """Liste der PatternRecs mit optionalem Literal-Vorfilter (siehe load_patterns)."""
+    __slots__ = ("prefilter",)
+    def __init__(self, pats=()):
+        super().__init__(pats)
+        prefilter = LiteralPrefilter(self)
+        with_literal = len(self) - len(prefilter.fallback)
+        self.prefilter = prefilter if with_literal >= PREFILTER_MIN_PATTERNS else None
+
+def load_patterns(path: str, fs: str, flags: int, check: bool = True, bytes_rx: bool = False,
+                  reuse: Optional[List[PatternRec]] = None,
+                  warn: Optional[Callable[[str], None]] = None) -> PatternSet:
+    """Lädt die Pattern-TSV. Mit check warnt es vor Regex-Formen mit katastrophalem Backtracking,
+       mit bytes_rx wird zusätzlich je LINE_REGEX die Bytes-Variante kompiliert (ingest_buffer()).
+
+    reuse (Hot Reload): bisherige PatternRecs. Eine Zeile, deren ID und Felder unverändert sind,
+    übernimmt den alten PatternRec samt Aggregaten, ohne neu zu kompilieren; ist eine geänderte
+    LINE_REGEX ungültig, bleibt die bisherige Fassung dieser ID aktiv. warn: Ziel der Meldungen
+    (Default: STDERR).
+    """
+    if warn is None:
+        warn = sys.stderr.write
+    previous = {}
+    for old in reuse or ():
+        previous.setdefault(old.pid, old)
     pats: List[PatternRec] = []
     try:
         with open(path, "r", encoding="utf-8") as f:
@@ -477,7 +1592,7 @@ def load_patterns(path: str, fs: str, flags: int) -> List[PatternRec]:
                     continue
                 parts = line.split(fs, 4)  # bis zu 5 Felder
                 if len(parts) < 2:
-                    sys.stderr.write(f"[WARN] Zeile {ln}: erwarte mind. 2 Felder (ID{fs}LINE_REGEX[ {fs}WORD_REGEX[ {fs}TEMPLATE[ {fs}TRANSFORMS ]]]). Übersprungen.\n")
+                    warn(f"[WARN] Zeile {ln}: erwarte mind. 2 Felder (ID{fs}LINE_REGEX[ {fs}WORD_REGEX[ {fs}TEMPLATE[ {fs}TRANSFORMS ]]]). Übersprungen.\n")
                     continue
                 pid = parts[0].strip()
                 line_rx = posix_to_py(parts[1])
@@ -485,47 +1600,156 @@ def load_patterns(path: str, fs: str, flags: int) -> List[PatternRec]:
                 tmpl = parts[3] if len(parts) >= 4 else ""
                 transforms = parts[4] if len(parts) >= 5 else ""
                 if not pid or not line_rx:
-                    sys.stderr.write(f"[WARN] Zeile {ln}: leere ID oder LINE_REGEX. Übersprungen.\n")
+                    warn(f"[WARN] Zeile {ln}: leere ID oder LINE_REGEX. Übersprungen.\n")
+                    continue
+                spec = (line_rx, word_rx, tmpl, transforms)
+                old = previous.pop(pid, None)
+                if old is not None and old.spec == spec:
+                    pats.append(old)  # unverändert: Aggregate behalten, nichts kompilieren
                     continue
                 try:
                     lre = compile_rx(line_rx, flags)
                 except re.error as e:
-                    sys.stderr.write(f"[WARN] Zeile {ln}: ungültige LINE_REGEX '{parts[1]}': {e}. Übersprungen.\n")
+                    if old is not None:
+                        warn(f"[WARN] Zeile {ln}: ungültige LINE_REGEX '{parts[1]}': {e}. "
+                             f"Bisherige Fassung von '{pid}' bleibt aktiv.\n")
+                        pats.append(old)
+                        continue
+                    warn(f"[WARN] Zeile {ln}: ungültige LINE_REGEX '{parts[1]}': {e}. Übersprungen.\n")
                     continue
                 wre = None
                 if word_rx is not None:
                     try: wre = compile_rx(word_rx, flags)
                     except re.error as e:
-                        sys.stderr.write(f"[WARN] Zeile {ln}: ungültige WORD_REGEX '{parts[2]}': {e}. WORD_REGEX ignoriert.\n")
-                pats.append(PatternRec(pid, lre, wre, tmpl, transforms))
+                        warn(f"[WARN] Zeile {ln}: ungültige WORD_REGEX '{parts[2]}': {e}. WORD_REGEX ignoriert.\n")
+                if check:
+                    for col, rx in (("LINE_REGEX", line_rx), ("WORD_REGEX", word_rx if wre is not None else None)):
+                        for risk in (backtracking_risks(rx, flags) if rx else ()):
+                            warn(f"[WARN] Zeile {ln}: {col} von '{pid}': {risk} – Gefahr "
+                                 f"katastrophalen Backtrackings.\n")
+                rec = PatternRec(pid, lre, wre, tmpl, transforms)
+                rec.spec = spec
+                if bytes_rx:
+                    rec.line_brx = bytes_line_rx(lre)
+                pats.append(rec)
     except FileNotFoundError:
-        sys.stderr.write(f"[ERROR] Pattern-Datei '{path}' nicht gefunden.\n")
+        warn(f"[ERROR] Pattern-Datei '{path}' nicht gefunden.\n")
         return []
     except PermissionError:
-        sys.stderr.write(f"[ERROR] Keine Berechtigung zum Lesen der Pattern-Datei '{path}'.\n")
+        warn(f"[ERROR] Keine Berechtigung zum Lesen der Pattern-Datei '{path}'.\n")
         return []
     except UnicodeDecodeError as e:
-        sys.stderr.write(f"[ERROR] Unicode-Fehler beim Lesen der Pattern-Datei '{path}': {e}\n")
+        warn(f"[ERROR] Unicode-Fehler beim Lesen der Pattern-Datei '{path}': {e}\n")
         return []
     except Exception as e:
-        sys.stderr.write(f"[ERROR] Unerwarteter Fehler beim Lesen der Pattern-Datei '{path}': {e}\n")
+        warn(f"[ERROR] Unerwarteter Fehler beim Lesen der Pattern-Datei '{path}': {e}\n")
         return []
-    return pats
+    return PatternSet(pats)
 
 # ---------- Kernverarbeitung ----------
-def process_text(input_text: str, patterns: List[PatternRec], sep: str,
-                 strip_p: bool, cg_sep: str) -> str:
+def record_hit(line: str, pat: PatternRec, strip_p: bool, cg_sep: str) -> None:
+    """Verbucht eine Zeile, deren LINE_REGEX auf 'pat' passt (Wort, Refs, Alt-Wort, Historien)."""
+    pat.count += 1
+    w, m = extract_word_and_match(line, pat, cg_sep)
+    if strip_p and w: w = strip_punct(w)
+    # Speichere ursprüngliches Wort für Legende
+    pat.orig_words.append(w)
+
+    # Speichere die evaluierte \1 Backreference für die Legende (sortiert einfügen)
+    if m and m.groups() and len(m.groups()) >= 1:
+        ref = m.group(1)  # \1 Backreference
+        if ref is not None and ref not in pat.found_refs and len(pat.found_refs) < MAX_REFS:
+            pat.found_refs[ref] = None
+            insort(pat.refs_sorted, ref)
+            pat.refs_version += 1
+
+    hll = pat.distinct
+    if hll is not None:
+        value = (m.group(1) if m and m.re.groups else None) if hll.by_ref else w
+        if value:
+            hll.add(value)
+
+    # Transformiertes Alternativwort (Spalte 5; darf Backrefs als Quelle nutzen)
+    alt = pat.alt_fn(w, m) if pat.alt_fn is not None else w
+    pat.alts.append(alt)
+    # Normal-Head
+    if w:
+        pat.head.append(w)
+        pat.head_keys.append(alt if alt else w)  # Farb-Key: Altwort dominiert
+        pat.head_count += 1
+        pat.top.add(w)
+
+def ingest_lines(lines, patterns: List[PatternRec], strip_p: bool, cg_sep: str) -> None:
+    """Wertet Zeilen gegen alle Patterns aus und hängt die Treffer an die PatternRecs an.
+       Mit Literal-Vorfilter (PatternSet.prefilter) wird jede Zeile nur gegen Kandidaten geprüft.
     """
-    KERNVERARBEITUNG: Verarbeitet Input-Text und erstellt truncated Ausgabe.
+    prefilter = getattr(patterns, "prefilter", None)
+    for line in lines:
+        for pat in (patterns if prefilter is None else prefilter.candidates(line)):
+            if pat.line_re.search(line):
+                record_hit(line, pat, strip_p, cg_sep)
 
-    CODE-PFAD: Wird verwendet für:
-    - NOCOLOR-Modus (ohne --color Flag)
-    - STDIN-Modus (ohne --cmd)
-    - Einmalige Ausführung (ohne -t/--interval)
+def ingest_lines_costed(lines, patterns: List[PatternRec], strip_p: bool, cg_sep: str,
+                        budget_ns: int = 0) -> List[PatternRec]:
+    """Wie ingest_lines(), misst aber je Pattern Zeit (perf_counter_ns) und Anzahl der Auswertungen
+       (LINE_REGEX, bei Treffer inkl. WORD_REGEX und Pipeline) für --pattern-cost.
 
-    TRUNCATION: Implementiert in dieser Funktion für nocolor-Kompatibilität.
+    Mit budget_ns > 0 wird ein Pattern abgeschaltet (disabled), sobald es in diesem Aufruf
+    (ein Eingabeblock) mehr Zeit verbraucht hat. Liefert die dabei abgeschalteten Patterns.
     """
-    # reset
+    clock = time.perf_counter_ns
+    prefilter = getattr(patterns, "prefilter", None)
+    spent = {}
+    disabled = []
+    for line in lines:
+        for pat in (patterns if prefilter is None else prefilter.candidates(line)):
+            if pat.disabled:
+                continue
+            t0 = clock()
+            if pat.line_re.search(line):
+                record_hit(line, pat, strip_p, cg_sep)
+            dt = clock() - t0
+            pat.cost_ns += dt
+            pat.evals += 1
+            if budget_ns:
+                used = spent.get(pat, 0) + dt
+                spent[pat] = used
+                if used > budget_ns:
+                    pat.disabled = True
+                    disabled.append(pat)
+    return disabled
+
+def slowest_patterns(patterns: List[PatternRec], n: int = 3) -> List[PatternRec]:
+    """Die n Patterns mit der höchsten kumulierten Regex-Zeit (nur mit Messung, cost_ns > 0)."""
+    return sorted((p for p in patterns if p.cost_ns), key=lambda p: p.cost_ns, reverse=True)[:n]
+
+def format_cost_status(patterns: List[PatternRec], n: int = 3) -> str:
+    """Statuszeile: langsamste Patterns mit Anteil und Zeit pro Auswertung, abgeschaltete IDs."""
+    total = sum(p.cost_ns for p in patterns) or 1
+    parts = []
+    for p in slowest_patterns(patterns, n):
+        per_eval = p.cost_ns / p.evals
+        per = f"{per_eval / 1e6:.1f}ms" if per_eval >= 1e6 else f"{per_eval / 1e3:.1f}µs"
+        parts.append(f"{p.pid} {100.0 * p.cost_ns / total:.0f}% {per}")
+    line = "regex: " + (" · ".join(parts) if parts else "-")
+    off = [p.pid for p in patterns if p.disabled]
+    if off:
+        line += " | aus: " + " ".join(off)
+    return line
+
+def format_cost_summary(patterns: List[PatternRec], n: int = 10) -> str:
+    """Tabelle der teuersten Patterns für STDERR beim Beenden."""
+    total = sum(p.cost_ns for p in patterns) or 1
+    lines = [f"[REGEX] Kosten je Pattern (gesamt {total / 1e6:.1f}ms)",
+             f"  {'ID':<12} {'Auswertungen':>12} {'Treffer':>9} {'gesamt ms':>10} {'µs/Ausw.':>9} {'Anteil':>7}"]
+    for p in slowest_patterns(patterns, n):
+        lines.append(f"  {p.pid:<12} {p.evals:>12} {p.count:>9} {p.cost_ns / 1e6:>10.1f} "
+                     f"{p.cost_ns / p.evals / 1e3:>9.2f} {100.0 * p.cost_ns / total:>6.1f}%"
+                     + ("  (abgeschaltet)" if p.disabled else ""))
+    return "\n".join(lines)
+
+def reset_patterns(patterns: List[PatternRec]) -> None:
+    """Setzt die Aggregate aller Patterns zurück (z. B. wenn ein iterativer Lauf die Ausgabe ersetzt)."""
     for pat in patterns:
         pat.count = 0
         pat.head.clear()
@@ -534,61 +1758,374 @@ def process_text(input_text: str, patterns: List[PatternRec], sep: str,
         pat.alts.clear()
         pat.orig_words.clear()  # Reset ursprüngliche Wörter
         pat.found_refs.clear()  # Reset gefundene Backreferences
-        # tail_max wurde entfernt, da es nicht mehr benötigt wird
+        pat.refs_sorted.clear()
+        pat.refs_version += 1
+        pat.rate.clear()
+        pat.top.clear()
+        if pat.distinct is not None:
+            pat.distinct.clear()
 
-    for line in input_text.splitlines():
-        for pat in patterns:
-            if pat.line_re.search(line):
-                pat.count += 1
-                w, m = extract_word_and_match(line, pat, cg_sep)
-                if strip_p and w: w = strip_punct(w)
-                # Speichere ursprüngliches Wort für Legende
-                pat.orig_words.append(w)
-
-                # Speichere die evaluierte \1 Backreference für die Legende
-                if m and m.groups() and len(m.groups()) >= 1:
-                    pat.found_refs.add(m.group(1))  # \1 Backreference
-
-                # Transformiertes Alternativwort (Spalte 5; darf Backrefs als Quelle nutzen)
-                alt = apply_pipeline(w, pat.transforms, m) if pat.transforms else w
-                pat.alts.append(alt)
-                # Normal-Head
-                if w:
-                    pat.head.append(w)
-                    pat.head_keys.append(alt if alt else w)  # Farb-Key: Altwort dominiert
-                    pat.head_count += 1
+def process_text(input_text: str, patterns: List[PatternRec], sep: str,
+                 strip_p: bool, cg_sep: str, matcher: Optional["ShardedMatcher"] = None) -> str:
+    """
+    KERNVERARBEITUNG: Verarbeitet Input-Text und erstellt truncated Ausgabe.
+
+    CODE-PFAD: Wird verwendet für:
+    - Einmalige Auswertung eines kompletten Textes (Reset + Aggregation + Plain-Ansicht)
+
+    Der Watch-Loop verwendet stattdessen ingest_lines() inkrementell und render_plain_view().
+    Mit matcher (--workers) wird auf mehrere Prozesse verteilt; bis auf die Top-K-Wörter (Sketch-Merge,
+    näherungsweise) ist das Ergebnis identisch.
+    """
+    reset_patterns(patterns)
+    if matcher is not None:
+        matcher.ingest(input_text, patterns)
+    else:
+        ingest_lines(input_text.splitlines(), patterns, strip_p, cg_sep)
+    return render_plain_view(patterns, sep)
+
+def render_plain_view(patterns: List[PatternRec], sep: str, rates_now: Optional[float] = None,
+                      profiler: Optional["StageProfiler"] = None) -> str:
+    """
+    PLAIN VIEW RENDERING: Normalansicht ohne Farben im Spaltenformat "ID  COUNT  WÖRTER".
+
+    CODE-PFAD: Wird verwendet für:
+    - NOCOLOR-Modus (ohne --color Flag), Normal-Ansicht
 
+    TRUNCATION: Implementiert in dieser Funktion für nocolor-Kompatibilität.
+    Mit rates_now (monotonic) folgt auf COUNT die Spalte "10s 1m 5m Sparkline", mit --distinct
+    davor die ungefähre Anzahl verschiedener Werte ("≈1.2k"). Mit profiler (--profile) wird das
+    Kürzen der Wortlisten auf die Stufe 'truncate' gebucht.
+    """
     # Normalansicht mit Truncation (wird für nocolor-Modus verwendet)
-    cols = shutil.get_terminal_size(fallback=(80, 24)).columns
+    cols = terminal_size().columns
+    truncate = build_truncated_content if profiler is None else profiler.timed("truncate", build_truncated_content)
     out_lines = []
     for pat in patterns:
         total = pat.count
-        prefix = f"{pat.pid:<8} {total:<8} "
-        prefix_len = len(prefix)
+        rates = (rate_column(pat, rates_now) + " ") if rates_now is not None else ""
+        if pat.distinct is not None:
+            rates = distinct_column(pat) + " " + rates
+        prefix = f"{pat.pid:<8} {total:<8} {rates}"
+        prefix_len = len(prefix.expandtabs())  # Bildschirmspalten wie in render_normal_view()
 
         # Sichere Berechnung der verfügbaren Breite - auch für sehr kleine Terminals
         max_total_width = max(cols - 1, 20)  # Mindestens 20 Zeichen, auch bei winzigen Terminals
         available_for_content = max_total_width - prefix_len
 
-        if available_for_content <= 0 or not pat.head:
+        if available_for_content <= 0:
+            # Distinct- und Raten-Spalte passen nicht mehr: Prefix selbst auf die Zeilenbreite kürzen
+            out_lines.append(prefix.expandtabs()[:max_total_width].rstrip())
+            continue
+        if not pat.head:
             words = ""
         else:
             # Verwende robuste Truncation für die Wörter (funktioniert auch bei kleinen Breiten)
-            words = build_truncated_content(pat.head, available_for_content, sep, False)
+            words = truncate(pat.head.words(), available_for_content, sep, False,
+                             complete=pat.head.complete)
 
-        # Finale Sicherheitsprüfung: Kürze nur den Wort-Teil, nicht die Pattern-ID
-        final_line = f"{pat.pid}\t{total}\t{words}"
-        if len(final_line) > max_total_width:
+        # Finale Sicherheitsprüfung an der ausgegebenen Zeile: Kürze nur den Wort-Teil, nicht die Pattern-ID
+        excess = prefix_len + len(words) - max_total_width
+        if words and excess > 0:
             # Kürze nur den Wort-Teil weiter
-            excess = len(final_line) - max_total_width
             if len(words) > excess + 3:
                 words = words[:-(excess + 3)] + "..."
             else:
-                words = "..."
+                words = "..."[:max(max_total_width - prefix_len, 0)]
 
-        out_lines.append(f"{pat.pid:<8} {total:<8} {words}")
+        out_lines.append(prefix + words)
     return "\n".join(out_lines) + ("\n" if out_lines else "")
 
+def render_top_view(patterns: List[PatternRec], sep: str, use_color: bool,
+                    rates_now: Optional[float] = None) -> str:
+    """
+    TOP-K-ANSICHT (Taste 't'): je Pattern die häufigsten Wörter mit Zähler, z. B. "web07×312".
+
+    Quelle ist der Space-Saving-Sketch je Pattern (PatternRec.top), nicht die Wort-Historie;
+    die Wörter stehen absteigend nach Häufigkeit, so viele, wie in die Terminalbreite passen.
+    Ein Zähler mit Fehlerschranke (Wort kam erst nach einer Verdrängung hinzu) ist eine
+    Obergrenze und wird als "×~N" markiert. Mit --color als Chips (Farbe nach dem Wort).
+    """
+    cols = terminal_size().columns
+    max_total_width = max(cols - 1, 20)
+    gap = "" if use_color else sep
+    out_lines = []
+    for pat in patterns:
+        rates = (rate_column(pat, rates_now) + " ") if rates_now is not None else ""
+        if pat.distinct is not None:
+            rates = distinct_column(pat) + " " + rates
+        prefix = f"{pat.pid:<8} {pat.count:<8} {rates}"
+        room = max_total_width - len(prefix)
+        if room <= 0:
+            # wie render_plain_view(): zu breiten Prefix auf die Zeilenbreite kürzen
+            out_lines.append(prefix[:max_total_width].rstrip())
+            continue
+        items = []
+        used = 0
+        for word, n, err in pat.top.top():
+            item = f"{word}×~{n}" if err else f"{word}×{n}"
+            width = len(item) + (len(gap) if items else 0)
+            if used + width > room:
+                break
+            items.append(_color_chip_key(item, word) if use_color else item)
+            used += width
+        out_lines.append(prefix + gap.join(items))
+    return "\n".join(out_lines) + ("\n" if out_lines else "")
+
+# ---------- Bytes-Matching (--bytes, --file) ----------
+FILE_SCAN_WINDOW = 16 << 20  # zeilenbündiges Fenster; begrenzt Speicher für Sonderzeilen und Seiten
+# Zeilen, für die Bytes- und Text-Regex verschieden urteilen können: Nicht-ASCII (\w, '.', IGNORECASE
+# arbeiten auf Zeichen statt Bytes) und Zeichen, an denen str.splitlines() zusätzlich trennt
+_SPECIAL_LINE_RX = re.compile(rb"[\x80-\xff\r\x0b\x0c\x1c-\x1e]")
+_SPECIAL_ASCII = (b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e")
+
+def bytes_line_rx(line_re: Pattern) -> Optional[Pattern]:
+    """Bytes-Variante einer LINE_REGEX, mit MULTILINE (^/$ an Zeilengrenzen, damit eine Suche
+       über einen ganzen Block jede passende Zeile findet). None, wenn sie sich nicht 1:1
+       übertragen lässt (Nicht-ASCII im Pattern, \\A/\\Z); dann gilt die Text-Regex."""
+    rx = line_re.pattern
+    if not rx.isascii() or "\\A" in rx or "\\Z" in rx:
+        return None
+    try:
+        return re.compile(rx.encode("ascii"), (line_re.flags & ~re.UNICODE) | re.MULTILINE)
+    except re.error:
+        return None
+
+def ingest_buffer(buf, start: int, end: int, patterns: List[PatternRec], strip_p: bool,
+                  cg_sep: str) -> int:
+    """Wie ingest_lines(), aber auf rohen Bytes (bytes oder mmap) zwischen start und end, die an
+       einer Zeilengrenze beginnen. Liefert die Anzahl der Zeilen.
+
+    Je Pattern sucht die Bytes-Regex (PatternRec.line_brx, siehe load_patterns(bytes_rx=True))
+    über den ganzen Bereich; dekodiert wird nur eine Zeile mit Treffer (für WORD_REGEX, Template,
+    Pipeline in record_hit()), ungültiges UTF-8 wird dabei ersetzt. Zeilen mit Nicht-ASCII bzw.
+    Sondertrennern laufen wie im Text-Pfad über die Text-Regex und werden in Zeilenreihenfolge
+    eingereiht, Patterns ohne Bytes-Variante über den dekodierten Bereich. Das Ergebnis ist damit
+    identisch zu ingest_lines(buf.decode("utf-8", "replace").splitlines(), ...).
+    """
+    if start >= end:
+        return 0
+    # Zeilen zählen und Sonderzeilen sammeln: (Zeilenanfang, Teilzeilen als Text). In 1-MiB-
+    # Stücken, damit reine ASCII-Stücke (der Normalfall) die Zeichenklassen-Suche überspringen
+    lines = 0 if buf[end - 1:end] == b"\n" else 1
+    specials = []
+    pos = start
+    for i in range(start, end, 1 << 20):
+        j = min(i + (1 << 20), end)
+        piece = buf[i:j]
+        lines += piece.count(b"\n")
+        if piece.isascii() and not any(c in piece for c in _SPECIAL_ASCII):
+            continue
+        pos = max(pos, i)
+        while pos < j:
+            m = _SPECIAL_LINE_RX.search(buf, pos, j)
+            if m is None:
+                break
+            ls = buf.rfind(b"\n", start, m.start()) + 1 or start
+            le = buf.find(b"\n", m.start(), end)
+            if le < 0:
+                le = end
+            # inkl. Newline: ein Trenner direkt davor ergibt wie im Text-Pfad eine Leerzeile
+            subs = buf[ls:le + 1].decode("utf-8", "replace").splitlines()
+            specials.append((ls, subs))
+            lines += len(subs) - 1  # Zeilen wie str.splitlines() zählen
+            pos = le + 1
+    slow = []
+    for pat in patterns:
+        brx = pat.line_brx
+        if brx is None:
+            slow.append(pat)
+            continue
+        if pat.disabled:
+            continue
+        line_re = pat.line_re
+        search = brx.search
+        k = 0  # nächste noch nicht geprüfte Sonderzeile
+        pos = start
+        while pos < end:
+            m = search(buf, pos, end)
+            if m is None:
+                break
+            s = m.start()
+            ls = buf.rfind(b"\n", start, s) + 1 or start
+            if ls >= end:
+                break  # leere Fundstelle hinter dem letzten Newline
+            le = buf.find(b"\n", s, end)
+            if le < 0:
+                le = end
+            while k < len(specials) and specials[k][0] <= ls:
+                for sub in specials[k][1]:
+                    if line_re.search(sub):
+                        record_hit(sub, pat, strip_p, cg_sep)
+                k += 1
+            if not (k and specials[k - 1][0] == ls):
+                # Treffer über ein Newline hinweg: nur zählen, wenn die Zeile selbst passt
+                if m.end() <= le or search(buf, ls, le) is not None:
+                    record_hit(buf[ls:le].decode("utf-8", "replace"), pat, strip_p, cg_sep)
+            pos = le + 1
+        for _, subs in specials[k:]:
+            for sub in subs:
+                if line_re.search(sub):
+                    record_hit(sub, pat, strip_p, cg_sep)
+    if slow:
+        ingest_lines(buf[start:end].decode("utf-8", "replace").splitlines(), slow, strip_p, cg_sep)
+    return lines
+
+def scan_file(path: str, patterns: List[PatternRec], strip_p: bool, cg_sep: str,
+              window: int = FILE_SCAN_WINDOW) -> Tuple[int, int]:
+    """--file: wertet eine Datei per mmap mit ingest_buffer() aus, ohne sie als Ganzes zu
+       dekodieren; das Ergebnis ist identisch zu 'cat DATEI | patwatch'. Gelesen wird in
+       zeilenbündigen Fenstern, deren Seiten danach freigegeben werden – der Speicher bleibt
+       unabhängig von der Dateigröße. Liefert (Zeilen, Bytes)."""
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size == 0:
+            return 0, 0
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    can_release = hasattr(mm, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+    released = 0
+    lines = 0
+    start = 0
+    try:
+        while start < size:
+            if start + window >= size:
+                end = size
+            else:
+                end = mm.rfind(b"\n", start, start + window) + 1
+                if end <= start:  # Zeile länger als das Fenster
+                    end = mm.find(b"\n", start + window) + 1 or size
+            lines += ingest_buffer(mm, start, end, patterns, strip_p, cg_sep)
+            if can_release:
+                upto = end - end % mmap.PAGESIZE
+                if upto > released:
+                    mm.madvise(mmap.MADV_DONTNEED, released, upto - released)
+                    released = upto
+            start = end
+    finally:
+        mm.close()
+    return lines, size
+
+# ---------- Paralleles Matching (--workers) ----------
+SHARD_CHUNK_CHARS = 1 << 20  # Zielgröße eines zeilenbündigen Chunks pro Worker-Auftrag
+
+_SHARD_STATE = {}
+
+def patterns_from_specs(specs: List[Tuple[str, tuple]], flags: int) -> PatternSet:
+    """Baut PatternRecs aus (ID, spec)-Paaren, die load_patterns() schon geprüft hat – in derselben
+       Reihenfolge. Eine ungültige WORD_REGEX entfällt wie dort; gewarnt hat bereits der Aufrufer."""
+    pats: List[PatternRec] = []
+    for pid, spec in specs:
+        line_rx, word_rx, tmpl, transforms = spec
+        wre = None
+        if word_rx is not None:
+            try: wre = compile_rx(word_rx, flags)
+            except re.error: pass
+        rec = PatternRec(pid, compile_rx(line_rx, flags), wre, tmpl, transforms)
+        rec.spec = spec
+        pats.append(rec)
+    return PatternSet(pats)
+
+def _shard_init(specs: List[Tuple[str, tuple]], flags: int, strip_p: bool, cg_sep: str,
+                distinct: Optional[Tuple[int, bool]] = None) -> None:
+    """Initializer im Worker-Prozess: PatternRecs aus den Specs des Elternprozesses bauen
+       (PatternRecs sind nicht picklebar). Die Pattern-Datei liest nur der Elternprozess: gleiche
+       Fassung, gleiche Reihenfolge, und Warnungen entstehen nur dort (nicht quer über --clear)."""
+    global MAX_REFS
+    # Ctrl+C und SIGWINCH gehen an die ganze Prozessgruppe; beenden/aufräumen macht der Elternprozess
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGWINCH"):
+        signal.signal(signal.SIGWINCH, signal.SIG_DFL)
+    signal.set_wakeup_fd(-1)  # per fork geerbte Self-Pipe der Ereignisschleife nicht beschreiben
+    # Der Worker sammelt alle Refs seines Chunks in Ankunftsreihenfolge; die Obergrenze
+    # wendet erst der Elternprozess beim Mergen an (sonst fehlten dort ggf. spätere Refs).
+    MAX_REFS = sys.maxsize
+    _SHARD_STATE["patterns"] = patterns_from_specs(specs, flags)
+    if distinct is not None:
+        enable_distinct(_SHARD_STATE["patterns"], *distinct)
+    _SHARD_STATE["args"] = (strip_p, cg_sep)
+
+def _shard_match(text: str) -> list:
+    """Wertet einen Chunk aus und liefert kompakte Teil-Aggregate der Patterns mit Treffern:
+       (Index, ID, count, head_count, head, head_keys, alts, orig_words, refs, top, distinct)."""
+    patterns = _SHARD_STATE["patterns"]
+    strip_p, cg_sep = _SHARD_STATE["args"]
+    reset_patterns(patterns)
+    ingest_lines(text.splitlines(), patterns, strip_p, cg_sep)
+    return [(i, pat.pid, pat.count, pat.head_count, pat.head, pat.head_keys, pat.alts, pat.orig_words,
+             list(pat.found_refs), pat.top, pat.distinct)
+            for i, pat in enumerate(patterns) if pat.count]
+
+def split_chunks(text: str, size: int = SHARD_CHUNK_CHARS) -> List[str]:
+    """Teilt Text in zeilenbündige Chunks von ca. 'size' Zeichen (Schnitt nur nach '\\n')."""
+    chunks = []
+    start = 0
+    n = len(text)
+    while n - start > size:
+        cut = text.find("\n", start + size)
+        if cut < 0:
+            break
+        chunks.append(text[start:cut + 1])
+        start = cut + 1
+    if start < n:
+        chunks.append(text[start:])
+    return chunks
+
+def merge_shard_result(patterns: List[PatternRec], result: list) -> None:
+    """Mergt die Teil-Aggregate eines Chunks in Eingabereihenfolge in die PatternRecs.
+       Ein Index, dessen ID nicht (mehr) passt, wird verworfen statt einem Nachbarn zugeschlagen."""
+    for i, pid, count, head_count, head, head_keys, alts, orig_words, refs, top, distinct in result:
+        if i >= len(patterns) or patterns[i].pid != pid:
+            continue
+        pat = patterns[i]
+        pat.count += count
+        pat.head_count += head_count
+        pat.head.merge(head)
+        pat.head_keys.merge(head_keys)
+        pat.alts.merge(alts)
+        pat.orig_words.merge(orig_words)
+        pat.top.merge(top)
+        if distinct is not None and pat.distinct is not None:
+            pat.distinct.merge(distinct)
+        found = pat.found_refs
+        for ref in refs:
+            if len(found) >= MAX_REFS:
+                break
+            if ref not in found:
+                found[ref] = None
+                insort(pat.refs_sorted, ref)
+                pat.refs_version += 1
+
+class ShardedMatcher:
+    """--workers N: Matching in einem Prozess-Pool über zeilenbündige Chunks.
+
+    Jeder Worker baut die Patterns aus den (ID, spec)-Paaren des Elternprozesses (nach einem Hot
+    Reload: neuer Pool mit der neuen Liste) und liefert pro Chunk Teil-Aggregate; der
+    Elternprozess mergt sie strikt in Eingabereihenfolge. Zähler, Wort-Historien, Refs und
+    Distinct-Register sind identisch zum Ein-Prozess-Pfad (ingest_lines); die Top-K-Sketches
+    werden per SpaceSaving.merge zusammengeführt und sind nur näherungsweise gleich.
+    """
+    def __init__(self, workers: int, patterns: List[PatternRec], flags: int, strip_p: bool, cg_sep: str,
+                 distinct: Optional[Tuple[int, bool]] = None):
+        from concurrent.futures import ProcessPoolExecutor
+        self.workers = workers
+        self.args = (strip_p, cg_sep)
+        specs = [(pat.pid, pat.spec) for pat in patterns]
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_shard_init,
+                                        initargs=(specs, flags, strip_p, cg_sep, distinct))
+
+    def ingest(self, text: str, patterns: List[PatternRec]) -> None:
+        chunks = split_chunks(text)
+        if len(chunks) == 1 and len(text) < SHARD_CHUNK_CHARS // 4:
+            # Kleine Happen (z. B. ein paar neue Zeilen) lohnen den Umweg nicht
+            strip_p, cg_sep = self.args
+            ingest_lines(text.splitlines(), patterns, strip_p, cg_sep)
+            return
+        for result in self.pool.map(_shard_match, chunks):
+            merge_shard_result(patterns, result)
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
 # ---------- Farben (ANSI 256) mit Kontrast-Heuristik ----------
 def _xterm_rgb(code: int):
     if 16 <= code <= 231:  # 6x6x6 farbwürfel
@@ -692,41 +2229,61 @@ class _ColorAllocator:
     """Hash-basierter Allokator: Verwendet deterministische Hash-Funktion für konsistente Farben."""
     def __init__(self, palette):
         self.palette = list(palette)
-        self.map = {}       # key -> palette index
 
     def _deterministic_hash(self, key: str) -> int:
-        """Deterministische Hash-Funktion für konsistente Farben bei jedem Programmstart."""
-        # Verwende einen einfachen aber effektiven Hash-Algorithmus
-        # der deterministisch ist und gut verteilt
-        hash_value = 0
-        for i, char in enumerate(key):
-            # Kombiniere Zeichen-Code mit Position für bessere Verteilung
-            hash_value = ((hash_value << 5) + hash_value + ord(char) * (i + 1)) & 0xFFFFFFFF
-
-        # Füge Länge hinzu für bessere Verteilung bei kurzen Strings
-        hash_value = (hash_value + len(key) * 31) & 0xFFFFFFFF
-
-        return hash_value
+        """Deterministische Hash-Funktion für konsistente Farben bei jedem Programmstart.
+           CRC32 läuft in C und ist (anders als hash()) unabhängig von PYTHONHASHSEED.
+        """
+        return zlib.crc32(key.encode("utf-8", "surrogatepass"))
 
     def pair_for(self, key: str):
         """Gibt (fg,bg) für den Key zurück; deterministische Hash-basierte Farbauswahl."""
-        if key not in self.map:
-            # Verwende deterministische Hash-Funktion
-            hash_value = self._deterministic_hash(key)
+        return self.palette[self._deterministic_hash(key) % len(self.palette)]
 
-            # Verwende modulo für Palette-Index
-            self.map[key] = hash_value % len(self.palette)
+_COLOR_ALLOC = _ColorAllocator(_PALETTE)
 
-        return self.palette[self.map[key]]
+CHIP_CACHE_SIZE = 4096  # max. gecachte Chips (Wort, Key)
 
-_COLOR_ALLOC = _ColorAllocator(_PALETTE)
+class _ChipCache:
+    """Begrenzter LRU-Cache fertig gerenderter Chips, Schlüssel (Wort, Farb-Key).
+       Hält den Speicher bei Wörtern mit hoher Kardinalität (z. B. Request-IDs) konstant.
+    """
+    def __init__(self, alloc: _ColorAllocator, maxsize: int = CHIP_CACHE_SIZE):
+        self.alloc = alloc
+        self.maxsize = maxsize
+        self.chips: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def chip(self, word: str, key: str) -> str:
+        cache_key = (word, key)
+        chips = self.chips
+        chip = chips.get(cache_key)
+        if chip is not None:
+            self.hits += 1
+            chips.move_to_end(cache_key)
+            return chip
+        self.misses += 1
+        fg, bg = self.alloc.pair_for(key)
+        chip = f"\x1b[38;5;{fg};48;5;{bg}m{word}\x1b[0m"
+        chips[cache_key] = chip
+        if len(chips) > self.maxsize:
+            chips.popitem(last=False)
+        return chip
+
+    def stats(self) -> str:
+        """Kurzform für die Status-Bar, z. B. "chips 97% 4096/4096"."""
+        lookups = self.hits + self.misses
+        rate = (100 * self.hits // lookups) if lookups else 0
+        return f"chips {rate}% {len(self.chips)}/{self.maxsize}"
+
+_CHIP_CACHE = _ChipCache(_COLOR_ALLOC)
 
 def _color_chip_key(word: str, key: Optional[str] = None) -> str:
     """Farbiges Chip-Rendering; Farbe anhand 'key' (z. B. Altwort) wählen."""
     if not word:
         return ""
-    fg, bg = _COLOR_ALLOC.pair_for(key if key is not None else word)
-    return f"\x1b[38;5;{fg};48;5;{bg}m{word}\x1b[0m"
+    return _CHIP_CACHE.chip(word, key if key is not None else word)
 
 def get_color_pair(key: str) -> Tuple[int, int]:
     """Gibt das Farbpaar (fg, bg) für einen gegebenen Key zurück."""
@@ -738,8 +2295,7 @@ def _color_chip(word: str) -> str:
     if not word:
         return ""
     # Standard: Farbe aus dem Wort selbst ableiten (Alt-Ansicht nutzt Altwörter direkt)
-    fg, bg = _COLOR_ALLOC.pair_for(word)
-    return f"\x1b[38;5;{fg};48;5;{bg}m{word}\x1b[0m"
+    return _CHIP_CACHE.chip(word, word)
 
 def colorize_join(words: list[str]) -> str:
     chips = [_color_chip(w) for w in words if w]
@@ -772,135 +2328,137 @@ def colorize_join_with_keys(words: list[str], keys: list[str]) -> str:
         chips.append(_color_chip_key(w, key))
     return " ".join(chips)
 
-def build_truncated_content(words: list[str], max_width: int, sep: str, use_color: bool) -> str:
-    """
-    Baut truncated Inhalt mit garantierter Längen-Begrenzung.
-    Implementiert die Spezifikations-Anforderungen:
-    - Keine Zeilenüberläufe (höchste Priorität)
-    - Optimale Zeilennutzung
-    - Konsistente "..."-Positionierung
-    - Robuste Behandlung sehr kleiner Terminalbreiten
+def _joined_width(words: List[str], gap: int, skip_empty: bool, limit: int) -> int:
+    """Sichtbare Breite der verbundenen Wörter; bricht ab, sobald limit überschritten ist."""
+    width = 0
+    n = 0
+    for w in words:
+        if skip_empty and not w:
+            continue
+        width += len(w) + (gap if n else 0)
+        n += 1
+        if width > limit:
+            break
+    return width
+
+def _truncate_words(words: List[str], keys: Optional[List[str]], max_width: int, sep: str,
+                    mode: str, complete: bool) -> str:
     """
+    Truncation-Engine für build_truncated_content*(): arbeitet nur auf den Klartext-Breiten
+    (len(wort); Chips ändern die sichtbare Breite nicht) und erzeugt Escape-Codes erst für die
+    Wörter, die das Links/Rechts-Budget überleben. Aufwand ist durch die Terminalbreite begrenzt.
 
-    if not words:
-        return ""
+    mode: "plain" (sep.join), "chips" (Chips ohne Trenner), "chips_keys" (Chips mit ' ', Farbe aus keys)
+    """
+    if mode == "plain":
+        gap, skip_empty = len(sep), False
+    elif mode == "chips":
+        gap, skip_empty = 0, True
+    else:
+        gap, skip_empty = 1, True
 
-    # Für sehr kleine Breiten: Versuche mindestens ein Wort + Ellipsis zu zeigen
-    if max_width <= 3:
-        return "..."
-    elif max_width <= 8:
-        # Bei sehr kleiner Breite: Zeige nur erstes Wort gekürzt + "..."
-        first_word = words[0]
-        if len(first_word) + 3 <= max_width:
-            return first_word + "..."
-        elif max_width > 3:
-            return first_word[:max_width-3] + "..."
-        else:
-            return "..."
+    def key_at(i: int) -> str:
+        return keys[i] if keys is not None and i < len(keys) and keys[i] else words[i]
 
-    def get_visual_length(text: str) -> int:
-        if use_color:
-            return len(strip_ansi_codes(text))
-        else:
-            return len(text)
+    def emit(lo: int, hi: int) -> str:
+        if mode == "plain":
+            return sep.join(words[lo:hi])
+        if mode == "chips":
+            return "".join(_color_chip(words[i]) for i in range(lo, hi) if words[i])
+        return " ".join(_color_chip_key(words[i], key_at(i)) for i in range(lo, hi) if words[i])
 
-    def join_words(word_list: list[str]) -> str:
-        if use_color:
-            return colorize_join(word_list)
-        else:
-            return sep.join(word_list) if word_list else ""
+    def plain(lo: int, hi: int) -> str:
+        if mode == "plain":
+            return sep.join(words[lo:hi])
+        return ("" if mode == "chips" else " ").join(w for w in words[lo:hi] if w)
 
-    # Teste ob alle Wörter passen
-    full_content = join_words(words)
-    if get_visual_length(full_content) <= max_width:
-        return full_content
+    n = len(words)
+    # Teste ob alle Wörter passen (nur wenn die Historie vollständig ist)
+    if complete and _joined_width(words, gap, skip_empty, max_width) <= max_width:
+        return emit(0, n)
 
     # Truncation nötig - berechne optimale Aufteilung
     ellipsis = "..."
     ellipsis_len = 3
-
     if max_width <= ellipsis_len:
         return ellipsis
 
     available_for_words = max_width - ellipsis_len
-
     # Verteile Platz: 50% links, 50% rechts
     left_budget = available_for_words // 2
     right_budget = available_for_words - left_budget
-
-    # Sammle linke Wörter
-    left_words = []
-    left_length = 0
     sep_len = len(sep) if sep else 0
 
-    for word in words:
-        if use_color:
-            # Für farbige Wörter: Berechne visuelle Länge des farbigen Chips
-            colored_word = _color_chip(word)
-            word_visual_len = len(strip_ansi_codes(colored_word))
-        else:
-            word_visual_len = len(word)
-
-        needed_space = word_visual_len + (sep_len if left_words else 0)
-
-        if left_length + needed_space <= left_budget:
-            left_words.append(word)
-            left_length += needed_space
-        else:
+    # Sammle linke Wörter
+    left_n = 0
+    used = 0
+    for w in words:
+        needed_space = len(w) + (sep_len if left_n else 0)
+        if used + needed_space > left_budget:
             break
+        used += needed_space
+        left_n += 1
 
     # Sammle rechte Wörter (rückwärts)
-    right_words = []
-    right_length = 0
-
-    for word in reversed(words[len(left_words):]):
-        if use_color:
-            # Für farbige Wörter: Berechne visuelle Länge des farbigen Chips
-            colored_word = _color_chip(word)
-            word_visual_len = len(strip_ansi_codes(colored_word))
-        else:
-            word_visual_len = len(word)
-
-        needed_space = word_visual_len + (sep_len if right_words else 0)
-
-        if right_length + needed_space <= right_budget:
-            right_words.insert(0, word)
-            right_length += needed_space
-        else:
+    right_n = 0
+    used = 0
+    for i in range(n - 1, left_n - 1, -1):
+        needed_space = len(words[i]) + (sep_len if right_n else 0)
+        if used + needed_space > right_budget:
             break
-
-    # Baue finalen Inhalt
-    left_content = join_words(left_words)
-    right_content = join_words(right_words)
-
-    if left_words and right_words:
-        result = left_content + ellipsis + right_content
-    elif left_words:
-        result = left_content + ellipsis
-    elif right_words:
-        result = ellipsis + right_content
-    else:
-        result = ellipsis
-
-    # Finale Sicherheitsprüfung - falls immer noch zu lang
-    if get_visual_length(result) > max_width:
+        used += needed_space
+        right_n += 1
+    right_start = n - right_n
+
+    # Finale Sicherheitsprüfung auf Basis der Breiten (Trenner der Ausgabe kann von sep abweichen)
+    width = (_joined_width(words[:left_n], gap, skip_empty, max_width) + ellipsis_len +
+             _joined_width(words[right_start:], gap, skip_empty, max_width))
+    if width > max_width:
         # Drastische Kürzung
         safe_content_len = max_width - ellipsis_len
-        if safe_content_len > 0:
-            if use_color:
-                plain_result = strip_ansi_codes(result)
-                result = plain_result[:safe_content_len] + ellipsis
-            else:
-                result = result[:safe_content_len] + ellipsis
-        else:
-            result = ellipsis
+        if safe_content_len <= 0:
+            return ellipsis
+        plain_result = (plain(0, left_n) if left_n else "") + ellipsis + (plain(right_start, n) if right_n else "")
+        return plain_result[:safe_content_len] + ellipsis
+
+    # Baue finalen Inhalt (Escape-Codes nur für sichtbare Wörter)
+    left_content = emit(0, left_n) if left_n else ""
+    right_content = emit(right_start, n) if right_n else ""
+    return left_content + ellipsis + right_content
+
+def build_truncated_content(words: list[str], max_width: int, sep: str, use_color: bool,
+                            complete: bool = True) -> str:
+    """
+    Baut truncated Inhalt mit garantierter Längen-Begrenzung.
+    Implementiert die Spezifikations-Anforderungen:
+    - Keine Zeilenüberläufe (höchste Priorität)
+    - Optimale Zeilennutzung
+    - Konsistente "..."-Positionierung
+    - Robuste Behandlung sehr kleiner Terminalbreiten
+    complete=False: words ist nur Anfang+Ende einer längeren Historie → immer mit "..." kürzen.
+    """
+
+    if not words:
+        return ""
+
+    # Für sehr kleine Breiten: Versuche mindestens ein Wort + Ellipsis zu zeigen
+    if max_width <= 3:
+        return "..."
+    elif max_width <= 8:
+        # Bei sehr kleiner Breite: Zeige nur erstes Wort gekürzt + "..."
+        first_word = words[0]
+        if len(first_word) + 3 <= max_width:
+            return first_word + "..."
+        return first_word[:max_width-3] + "..."
 
-    return result
+    return _truncate_words(words, None, max_width, sep, "chips" if use_color else "plain", complete)
 
-def build_truncated_content_with_keys(words: list[str], keys: list[str], max_width: int, sep: str, use_color: bool) -> str:
+def build_truncated_content_with_keys(words: list[str], keys: list[str], max_width: int, sep: str, use_color: bool,
+                                      complete: bool = True) -> str:
     """
     Baut truncated Inhalt mit garantierter Längen-Begrenzung und Farb-Keys.
     Version für Normal-Ansicht: Wörter werden mit Farben aus keys gerendert.
+    complete=False: words ist nur Anfang+Ende einer längeren Historie → immer mit "..." kürzen.
     """
 
     if not words:
@@ -914,125 +2472,13 @@ def build_truncated_content_with_keys(words: list[str], keys: list[str], max_wid
         first_word = words[0]
         if len(first_word) + 3 <= max_width:
             return _color_chip_key(first_word, keys[0] if keys else None) + "..."
-        elif max_width > 3:
-            return _color_chip_key(first_word[:max_width-3], keys[0] if keys else None) + "..."
-        else:
-            return "..."
-
-    def get_visual_length(text: str) -> int:
-        if use_color:
-            return len(strip_ansi_codes(text))
-        else:
-            return len(text)
-
-    def join_words_with_keys(word_list: list[str], key_list: list[str]) -> str:
-        if use_color:
-            chips = []
-            for i, w in enumerate(word_list):
-                if not w:
-                    continue
-                key = key_list[i] if i < len(key_list) and key_list[i] else w
-                chips.append(_color_chip_key(w, key))
-            return " ".join(chips)
-        else:
-            return sep.join(word_list) if word_list else ""
-
-    # Teste ob alle Wörter passen
-    full_content = join_words_with_keys(words, keys)
-    if get_visual_length(full_content) <= max_width:
-        return full_content
-
-    # Truncation nötig - berechne optimale Aufteilung
-    ellipsis = "..."
-    ellipsis_len = 3
-
-    if max_width <= ellipsis_len:
-        return ellipsis
-
-    available_for_words = max_width - ellipsis_len
-
-    # Verteile Platz: 50% links, 50% rechts
-    left_budget = available_for_words // 2
-    right_budget = available_for_words - left_budget
-
-    # Sammle linke Wörter
-    left_words = []
-    left_keys = []
-    left_length = 0
-    sep_len = len(sep) if sep else 0
-
-    for i, word in enumerate(words):
-        if use_color:
-            # Für farbige Wörter: Berechne visuelle Länge des farbigen Chips
-            key = keys[i] if i < len(keys) and keys[i] else word
-            colored_word = _color_chip_key(word, key)
-            word_visual_len = len(strip_ansi_codes(colored_word))
-        else:
-            word_visual_len = len(word)
-
-        needed_space = word_visual_len + (sep_len if left_words else 0)
-
-        if left_length + needed_space <= left_budget:
-            left_words.append(word)
-            left_keys.append(keys[i] if i < len(keys) else word)
-            left_length += needed_space
-        else:
-            break
-
-    # Sammle rechte Wörter (rückwärts)
-    right_words = []
-    right_keys = []
-    right_length = 0
-
-    for i in range(len(words) - 1, len(left_words) - 1, -1):
-        word = words[i]
-        if use_color:
-            # Für farbige Wörter: Berechne visuelle Länge des farbigen Chips
-            key = keys[i] if i < len(keys) and keys[i] else word
-            colored_word = _color_chip_key(word, key)
-            word_visual_len = len(strip_ansi_codes(colored_word))
-        else:
-            word_visual_len = len(word)
-
-        needed_space = word_visual_len + (sep_len if right_words else 0)
-
-        if right_length + needed_space <= right_budget:
-            right_words.insert(0, word)
-            right_keys.insert(0, keys[i] if i < len(keys) else word)
-            right_length += needed_space
-        else:
-            break
+        return _color_chip_key(first_word[:max_width-3], keys[0] if keys else None) + "..."
 
-    # Baue finalen Inhalt
-    left_content = join_words_with_keys(left_words, left_keys)
-    right_content = join_words_with_keys(right_words, right_keys)
-
-    if left_words and right_words:
-        result = left_content + ellipsis + right_content
-    elif left_words:
-        result = left_content + ellipsis
-    elif right_words:
-        result = ellipsis + right_content
-    else:
-        result = ellipsis
-
-    # Finale Sicherheitsprüfung - falls immer noch zu lang
-    if get_visual_length(result) > max_width:
-        # Drastische Kürzung
-        safe_content_len = max_width - ellipsis_len
-        if safe_content_len > 0:
-            if use_color:
-                plain_result = strip_ansi_codes(result)
-                result = plain_result[:safe_content_len] + ellipsis
-            else:
-                result = result[:safe_content_len] + ellipsis
-        else:
-            result = ellipsis
-
-    return result
+    return _truncate_words(words, keys, max_width, sep, "chips_keys" if use_color else "plain", complete)
 
 # ---------- Rendering (Normal & Alt) ----------
-def render_normal_view(patterns: List[PatternRec], sep: str, use_color: bool, color_debug_mode: bool = False, content_start_line: int = 1) -> str:
+def render_normal_view(patterns: List[PatternRec], sep: str, use_color: bool, color_debug_mode: bool = False, content_start_line: int = 1,
+                       rates_now: Optional[float] = None, profiler: Optional["StageProfiler"] = None) -> str:
     """
     NORMAL VIEW RENDERING: Rendert die normale Ansicht mit robuster Truncation.
 
@@ -1042,26 +2488,37 @@ def render_normal_view(patterns: List[PatternRec], sep: str, use_color: bool, co
     - Normal-Ansicht (nicht Alt-View)
 
     TRUNCATION: Verwendet build_truncated_content() für optimale Darstellung.
+    Mit rates_now (monotonic) folgt auf COUNT die Spalte "10s 1m 5m Sparkline".
+    Mit profiler (--profile) wird das Kürzen auf die Stufe 'truncate' gebucht.
     """
-    cols = shutil.get_terminal_size(fallback=(80, 24)).columns
+    cols = terminal_size().columns
+    truncate = build_truncated_content
+    truncate_keys = build_truncated_content_with_keys
+    if profiler is not None:
+        truncate = profiler.timed("truncate", truncate)
+        truncate_keys = profiler.timed("truncate", truncate_keys)
 
 
     lines = []
     for pat in patterns:
         prefix = f"{pat.pid}\t{pat.count}\t"
-        prefix_len = len(prefix)
+        if pat.distinct is not None:
+            prefix += distinct_column(pat) + "\t"
+        if rates_now is not None:
+            prefix += rate_column(pat, rates_now) + "\t"
+        prefix_len = len(prefix.expandtabs())  # Bildschirmspalten: Tabs springen auf 8er-Stopps
 
         # Sichere Berechnung der verfügbaren Breite - auch für sehr kleine Terminals
         max_total_width = max(cols - 1, 20)  # Mindestens 20 Zeichen, auch bei winzigen Terminals
         available_for_content = max_total_width - prefix_len
 
         if available_for_content <= 0:
-            lines.append(prefix + "\n")
+            # Distinct- und Raten-Spalte passen nicht mehr: Prefix selbst auf die Zeilenbreite kürzen
+            lines.append(prefix.expandtabs()[:max_total_width].rstrip() + "\n")
             continue
 
         # NORMAL VIEW: Verwende die ursprünglichen Wörter (pat.head) statt transformierte (pat.alts)
-        words = pat.head
-        if not words:
+        if not pat.head:
             lines.append(prefix + "\n")
             continue
 
@@ -1071,7 +2528,10 @@ def render_normal_view(patterns: List[PatternRec], sep: str, use_color: bool, co
         # WICHTIG: Im Color-Debug-Modus werden Farbcodes anstelle der ID/Hostname angezeigt.
         # Das ist nützlich für die Fehlerbehebung von schlechten Farbkombinationen.
         # ========================================================================
-        if color_debug_mode and use_color and pat.head_keys:
+        words = pat.head.words()
+        keys = pat.head_keys.words()
+        complete = pat.head.complete
+        if color_debug_mode and use_color and keys:
             # ========================================================================
             # COLOR-DEBUG-MODUS IMPLEMENTIERUNG (TASTE 'C')
             # ========================================================================
@@ -1087,7 +2547,7 @@ def render_normal_view(patterns: List[PatternRec], sep: str, use_color: bool, co
             # ========================================================================
             # COLOR-DEBUG-MODUS: Ersetze einfach die Wörter durch Farbcodes
             debug_words = []
-            for word, key in zip(words, pat.head_keys):
+            for word, key in zip(words, keys):
                 if key:
                     # Ersetze das Wort durch den Farbcode (z.B. server1.example.com → 16/119)
                     debug_words.append(f"{get_color_pair(key)[0]}/{get_color_pair(key)[1]}")
@@ -1096,18 +2556,18 @@ def render_normal_view(patterns: List[PatternRec], sep: str, use_color: bool, co
 
             # Verwende die normale Farbgebung für die Farbcodes
             if use_color and debug_words:
-                content = build_truncated_content_with_keys(debug_words, pat.head_keys, available_for_content, sep, use_color)
+                content = truncate_keys(debug_words, keys, available_for_content, sep, use_color, complete=complete)
             else:
-                content = build_truncated_content(debug_words, available_for_content, sep, use_color)
+                content = truncate(debug_words, available_for_content, sep, use_color, complete=complete)
         else:
             # NORMAL-MODUS: Verwende die ursprünglichen Wörter
         # Erstelle Inhalt mit garantierter Längen-Begrenzung
             # In der Normal-Ansicht: Verwende pat.head_keys für die Farben (Alt-Wörter als Key)
-            if use_color and pat.head_keys:
+            if use_color and keys:
                 # Verwende colorize_join_with_keys für korrekte Farbgebung
-                content = build_truncated_content_with_keys(words, pat.head_keys, available_for_content, sep, use_color)
+                content = truncate_keys(words, keys, available_for_content, sep, use_color, complete=complete)
             else:
-                content = build_truncated_content(words, available_for_content, sep, use_color)
+                content = truncate(words, available_for_content, sep, use_color, complete=complete)
 
         # Finale Sicherheitsprüfung
         total_len = prefix_len + len(strip_ansi_codes(content) if use_color else content)
@@ -1126,7 +2586,8 @@ def render_normal_view(patterns: List[PatternRec], sep: str, use_color: bool, co
 
     return "".join(lines)
 
-def render_alt_view(patterns: List[PatternRec], sep: str, use_color: bool, no_warn: bool = False, content_start_line: int = 1) -> str:
+def render_alt_view(patterns: List[PatternRec], sep: str, use_color: bool, no_warn: bool = False, content_start_line: int = 1,
+                    rates_now: Optional[float] = None, profiler: Optional["StageProfiler"] = None) -> str:
     """
     ALTERNATIVE VIEW RENDERING: Rendert die alternative Ansicht mit robuster Truncation.
 
@@ -1136,35 +2597,37 @@ def render_alt_view(patterns: List[PatternRec], sep: str, use_color: bool, no_wa
     - Kontinuierlicher CMD-Modus (mit --cmd und -t)
 
     TRUNCATION: Verwendet build_truncated_content() für optimale Darstellung.
+    Mit rates_now (monotonic) folgt auf COUNT die Spalte "10s 1m 5m Sparkline".
+    Mit profiler (--profile) wird das Kürzen auf die Stufe 'truncate' gebucht.
     """
-    cols = shutil.get_terminal_size(fallback=(80, 24)).columns
+    cols = terminal_size().columns
+    truncate = build_truncated_content if profiler is None else profiler.timed("truncate", build_truncated_content)
 
     lines = []
     for pat in patterns:
         prefix = f"{pat.pid}\t{pat.count}\t"
-        prefix_len = len(prefix)
+        if pat.distinct is not None:
+            prefix += distinct_column(pat) + "\t"
+        if rates_now is not None:
+            prefix += rate_column(pat, rates_now) + "\t"
+        prefix_len = len(prefix.expandtabs())  # Bildschirmspalten: Tabs springen auf 8er-Stopps
 
         # Sichere Berechnung der verfügbaren Breite - auch für sehr kleine Terminals
         max_total_width = max(cols - 1, 20)  # Mindestens 20 Zeichen, auch bei winzigen Terminals
         available_for_content = max_total_width - prefix_len
 
         if available_for_content <= 0:
-            lines.append(prefix + "\n")
+            # Distinct- und Raten-Spalte passen nicht mehr: Prefix selbst auf die Zeilenbreite kürzen
+            lines.append(prefix.expandtabs()[:max_total_width].rstrip() + "\n")
             continue
 
-        words = pat.alts
-        if not words:
+        if not pat.alts:
             lines.append(prefix + "\n")
             continue
 
-        # Sicherheitsprüfung für sehr große Wortlisten
-        if len(words) > 1000:
-            words = words[:1000]
-            if not no_warn:
-                sys.stderr.write(f"[WARN] Wortliste für Pattern '{pat.pid}' auf 1000 Wörter begrenzt.\n")
-
-        # Erstelle Inhalt mit garantierter Längen-Begrenzung
-        content = build_truncated_content(words, available_for_content, sep, use_color)
+        # Erstelle Inhalt mit garantierter Längen-Begrenzung (Historie ist bereits begrenzt)
+        content = truncate(pat.alts.words(), available_for_content, sep, use_color,
+                           complete=pat.alts.complete)
 
         # Finale Sicherheitsprüfung
         total_len = prefix_len + len(strip_ansi_codes(content) if use_color else content)
@@ -1183,8 +2646,156 @@ def render_alt_view(patterns: List[PatternRec], sep: str, use_color: bool, no_wa
 
     return "".join(lines)
 
+# ---------- NDJSON-Ausgabe (--json) ----------
+_JSON_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+class JsonEmitter:
+    """--json: ein kompakter NDJSON-Datensatz pro Intervall statt eines Frames, z. B.
+       {"ts":..,"seq":3,"lines":1200,"patterns":{"ERR":{"count":5,"delta":2,"top":[["web07",3],..],"recent":[..],"alts":[..],"refs":[..]}}}
+
+    Kein render_*-Aufruf, keine Farben, keine Kürzung auf Terminalbreite. Die Pattern-IDs sind
+    vorab kodiert; der Teil mit top/recent/alts/refs wird je Pattern gecacht und nur neu kodiert,
+    wenn sich count oder refs_version geändert hat (unveränderte Patterns kosten fast nichts).
+    top sind die N häufigsten Wörter mit Zähler aus dem Top-K-Sketch (PatternRec.top, Reihenfolge
+    wie in der Top-K-Ansicht), recent/alts die letzten N Wörter bzw. Alt-Wörter in
+    Ankunftsreihenfolge, refs die gefundenen \1-Werte sortiert.
+    """
+    def __init__(self, patterns: List[PatternRec], words: int = 10, out=None):
+        self.patterns = patterns
+        self.words = words
+        self.out = out if out is not None else sys.stdout
+        self.seq = 0
+        self.keys = [_JSON_ENCODE(p.pid) + ":" for p in patterns]
+        self.last_count = [0] * len(patterns)
+        self.tails: List[Optional[Tuple[Tuple[int, int], str]]] = [None] * len(patterns)
+        self.parts: List[str] = []  # wiederverwendeter Puffer für die Fragmente
+        self.extra: Optional[Callable[[], dict]] = None  # Zusatzfelder je Datensatz (z. B. "hosts")
+
+    def _tail(self, i: int, pat: PatternRec) -> str:
+        key = (pat.count, pat.refs_version)
+        cached = self.tails[i]
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        n = self.words
+        top = [[word, count] for word, count, _ in pat.top.top(n)] if n else []
+        recent = pat.head.words()[-n:] if n else []
+        alts = pat.alts.words()[-n:] if n else []
+        tail = (',"top":' + _JSON_ENCODE(top) + ',"recent":' + _JSON_ENCODE(recent)
+                + ',"alts":' + _JSON_ENCODE(alts)
+                + ',"refs":' + _JSON_ENCODE(pat.refs_sorted)
+                + (f',"distinct":{round(pat.distinct.estimate())}' if pat.distinct is not None else "") + "}")
+        self.tails[i] = (key, tail)
+        return tail
+
+    def record(self, lines: int) -> str:
+        """Baut den Datensatz für den aktuellen Stand (eine Zeile inkl. '\n')."""
+        self.seq += 1
+        parts = self.parts
+        parts.clear()
+        last_count = self.last_count
+        keys = self.keys
+        for i, pat in enumerate(self.patterns):
+            count = pat.count
+            parts.append(f'{keys[i]}{{"count":{count},"delta":{count - last_count[i]}{self._tail(i, pat)}')
+            last_count[i] = count
+        extra = "".join(f",{_JSON_ENCODE(k)}:{_JSON_ENCODE(v)}" for k, v in self.extra().items()) if self.extra else ""
+        return f'{{"ts":{time.time():.3f},"seq":{self.seq},"lines":{lines},"patterns":{{{",".join(parts)}}}{extra}}}\n'
+
+    def set_patterns(self, patterns: List[PatternRec]) -> None:
+        """Nach einem Hot Reload: neue Pattern-Liste; übernommene PatternRecs behalten Delta-Basis
+           und Fragment-Cache, neue beginnen bei 0."""
+        old = {id(p): (self.last_count[i], self.tails[i]) for i, p in enumerate(self.patterns)}
+        self.patterns = patterns
+        self.keys = [_JSON_ENCODE(p.pid) + ":" for p in patterns]
+        kept = [old.get(id(p), (0, None)) for p in patterns]
+        self.last_count = [k[0] for k in kept]
+        self.tails = [k[1] for k in kept]
+
+    def emit(self, lines: int) -> None:
+        self.out.write(self.record(lines))
+        self.out.flush()
+
 # ---------- Kommando & Header/Watch ----------
-def run_cmd(cmd: str, shell_path: str, timeout: Optional[float], no_warn: bool) -> tuple[str, float]:
+class CommandRun:
+    """Ein gestartetes Shell-Kommando, dessen stdout/stderr nicht-blockierend gelesen werden –
+       entweder von der EventLoop (Deskriptoren aus fds()) oder synchron in run_cmd().
+
+    Der Output wird wie bisher auf die letzten Zeilen begrenzt (> MAX_LINES → KEEP_LINES),
+    stderr wird nur abgeräumt, damit das Kommando nicht an einer vollen Pipe hängt.
+    """
+    MAX_LINES = 1000
+    KEEP_LINES = 500
+
+    def __init__(self, cmd: str, shell_path: str, no_warn: bool):
+        self.no_warn = no_warn
+        self.start = time.perf_counter()
+        self.process = subprocess.Popen(
+            [shell_path, "-c", cmd],
+            stdout=subprocess.PIPE,
+            stderr=(subprocess.DEVNULL if no_warn else subprocess.PIPE),
+        )
+        self.streams = {}
+        for stream in (self.process.stdout, self.process.stderr):
+            if stream is not None:
+                os.set_blocking(stream.fileno(), False)
+                self.streams[stream.fileno()] = stream
+        self.stdout_fd = self.process.stdout.fileno()
+        self.chunks: List[bytes] = []
+        self.newlines = 0
+        self.first_byte: Optional[float] = None  # perf_counter beim ersten stdout-Byte (--profile)
+
+    def fds(self) -> List[int]:
+        return list(self.streams)
+
+    @property
+    def done(self) -> bool:
+        return not self.streams
+
+    def read(self, fd: int) -> bool:
+        """Liest, was an fd anliegt. False, sobald fd am EOF geschlossen wurde."""
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            return True
+        except OSError:
+            data = b""
+        if not data:
+            self.streams.pop(fd).close()
+            return False
+        if fd == self.stdout_fd:
+            if self.first_byte is None:
+                self.first_byte = time.perf_counter()
+            self.chunks.append(data)
+            self.newlines += data.count(b"\n")
+            # Begrenze die Anzahl der Zeilen um Speicher zu sparen
+            if self.newlines > self.MAX_LINES:
+                parts = b"".join(self.chunks).split(b"\n")[-(self.KEEP_LINES + 1):]
+                self.chunks = [b"\n".join(parts)]
+                self.newlines = self.KEEP_LINES
+        return True
+
+    def terminate(self) -> None:
+        if self.process.poll() is None:
+            self.process.terminate()
+
+    def finish(self, decode: bool = True) -> Tuple[str, float]:
+        """Schließt offene Pipes, wartet auf das Prozessende; liefert (Output, Laufzeit).
+           Ohne decode bleibt der Output bytes (--bytes)."""
+        cmd_time = time.perf_counter() - self.start
+        for stream in self.streams.values():
+            stream.close()
+        self.streams.clear()
+        try:
+            self.process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        if (not self.no_warn) and self.process.returncode != 0 and self.process.returncode is not None:
+            sys.stderr.write(f"[WARN] Kommando Exit {self.process.returncode}\n")
+        out = b"".join(self.chunks)
+        return (out.decode("utf-8", "replace") if decode else out), cmd_time
+
+def run_cmd(cmd: str, shell_path: str, timeout: Optional[float], no_warn: bool,
+            started: Optional[Callable[[CommandRun], None]] = None) -> tuple[str, float]:
     if not cmd or not cmd.strip():
         return "", 0.0
 
@@ -1194,65 +2805,30 @@ def run_cmd(cmd: str, shell_path: str, timeout: Optional[float], no_warn: bool)
             sys.stderr.write(f"[ERROR] Shell '{shell_path}' nicht gefunden.\n")
             return "", 0.0
 
-        # Zeitmessung starten
-        cmd_start = time.perf_counter()
-
-        # Für kontinuierliche Ausgabe: Verwende Popen mit select
-        process = subprocess.Popen(
-            [shell_path, "-c", cmd],
-            stdout=subprocess.PIPE,
-            stderr=(subprocess.DEVNULL if no_warn else subprocess.PIPE),
-            text=True,
-            bufsize=1,  # Line-buffered
-        )
+        run = CommandRun(cmd, shell_path, no_warn)
+        if started is not None:
+            started(run)  # z. B. AuxWorker: Prozess beim Beenden abbrechen können
+        deadline = run.start + timeout if timeout else None
 
-        # Lese Output kontinuierlich mit select
-        output_lines = []
+        # Blockierendes select() bis Daten, EOF oder Timeout – kein Polling
         try:
-            while True:
-                # Prüfe ob Prozess noch läuft
-                if process.poll() is not None:
-                    break
-
-                # Prüfe auf verfügbare Daten mit select (nicht-blockierend)
-                if select.select([process.stdout], [], [], 0.1)[0]:
-                    line = process.stdout.readline()
-                    if line:
-                        output_lines.append(line)
-                        # Begrenze die Anzahl der Zeilen um Speicher zu sparen
-                        if len(output_lines) > 1000:
-                            output_lines = output_lines[-500:]  # Behalte nur die letzten 500 Zeilen
-                else:
-                    # Keine Daten verfügbar, kurze Pause
-                    time.sleep(0.01)
-
-                # Timeout prüfen
-                if timeout and (time.perf_counter() - cmd_start) > timeout:
-                    process.terminate()
-                    break
-
+            with selectors.DefaultSelector() as sel:
+                for fd in run.fds():
+                    sel.register(fd, selectors.EVENT_READ)
+                while not run.done:
+                    wait = None if deadline is None else deadline - time.perf_counter()
+                    if wait is not None and wait <= 0:
+                        run.terminate()
+                        break
+                    for key, _ in sel.select(wait):
+                        if not run.read(key.fd):
+                            sel.unregister(key.fd)
         except KeyboardInterrupt:
-            process.terminate()
+            run.terminate()
             raise
 
-        # Zeitmessung beenden
-        cmd_time = time.perf_counter() - cmd_start
-
-        # Warte auf Prozess-Ende
-        try:
-            process.wait(timeout=1.0)
-        except subprocess.TimeoutExpired:
-            process.kill()
-
-        if (not no_warn) and process.returncode != 0 and process.returncode is not None:
-            sys.stderr.write(f"[WARN] Kommando Exit {process.returncode}\n")
-
-        return "".join(output_lines), cmd_time
+        return run.finish()
 
-    except subprocess.TimeoutExpired:
-        if not no_warn:
-            sys.stderr.write(f"[WARN] Kommando Timeout nach {timeout}s: {cmd}\n")
-        return "", 0.0
     except FileNotFoundError:
         if not no_warn:
             sys.stderr.write(f"[ERROR] Shell '{shell_path}' nicht gefunden.\n")
@@ -1266,12 +2842,66 @@ def run_cmd(cmd: str, shell_path: str, timeout: Optional[float], no_warn: bool)
             sys.stderr.write(f"[ERROR] Unerwarteter Fehler beim Ausführen des Kommandos: {e}\n")
         return "", 0.0
 
+class AuxWorker:
+    """Führt --auxcmd in einem Hintergrund-Thread im eigenen Takt aus.
+
+    Ein langsames Aux-Kommando bremst so das Rendern der Hauptzähler nicht mehr; der
+    Frame zeigt jeweils die letzte vollständige Ausgabe samt Alter (snapshot()).
+    on_update wird im Worker-Thread nach jedem Lauf aufgerufen.
+    """
+    def __init__(self, cmd: str, shell_path: str, interval: float, timeout: Optional[float],
+                 no_warn: bool, on_update: Optional[Callable[[], None]] = None):
+        self.cmd = cmd
+        self.shell_path = shell_path
+        self.interval = interval
+        self.timeout = timeout
+        self.no_warn = no_warn
+        self.on_update = on_update
+        self.lock = threading.Lock()
+        self.output: Optional[str] = None
+        self.finished_at = 0.0
+        self.current: Optional[CommandRun] = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="patwatch-aux", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def _track(self, run: CommandRun) -> None:
+        self.current = run
+
+    def _run(self) -> None:
+        while not self.stopped.is_set():
+            out, _ = run_cmd(self.cmd, self.shell_path, self.timeout, self.no_warn, started=self._track)
+            self.current = None
+            if self.stopped.is_set():
+                break
+            with self.lock:
+                self.output = out
+                self.finished_at = time.monotonic()
+            if self.on_update is not None:
+                self.on_update()
+            self.stopped.wait(self.interval)
+
+    def snapshot(self) -> Tuple[Optional[str], float]:
+        """(letzte vollständige Ausgabe oder None, Alter in Sekunden)."""
+        with self.lock:
+            if self.output is None:
+                return None, 0.0
+            return self.output, time.monotonic() - self.finished_at
+
+    def stop(self) -> None:
+        self.stopped.set()
+        run = self.current
+        if run is not None:
+            run.terminate()
+
 def now_str(use_utc: bool) -> str:
     fmt = "%a %b %d %H:%M:%S %Z %Y"
     return time.strftime(fmt, time.gmtime() if use_utc else time.localtime())
 
 def build_header_line(left: str, right: str, color: bool) -> str:
-    cols = shutil.get_terminal_size(fallback=(80, 24)).columns
+    cols = terminal_size().columns
     if len(left) + 1 + len(right) <= cols:
         spaces = cols - len(left) - len(right)
         line = left + (" " * spaces) + right
@@ -1287,6 +2917,155 @@ def build_header_line(left: str, right: str, color: bool) -> str:
         return f"\x1b[30;48;5;22m{line.ljust(cols)}\x1b[0m"
     return line
 
+# ---------- Differenz-Renderer (--clear) ----------
+_ANSI_TOKEN_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+def _fit_row(row: str, cols: int) -> Tuple[str, int, bool]:
+    """Normalisiert eine Bildschirmzeile: Tabs (ANSI-bewusst) expandieren, auf 'cols'
+       sichtbare Zeichen kürzen. Liefert (Zeile, Breite, SGR-Zustand am Ende noch aktiv).
+    """
+    if "\x1b" not in row:
+        if "\t" in row:
+            row = row.expandtabs(8)
+        row = row[:cols]
+        return row, len(row), False
+    out = []
+    col = 0
+    pos = 0
+    active = False
+    for m in _ANSI_TOKEN_RE.finditer(row):
+        text = row[pos:m.start()]
+        pos = m.end()
+        if text and col < cols:
+            if "\t" in text:
+                text = (" " * (col % 8) + text).expandtabs(8)[col % 8:]
+            text = text[:cols - col]
+            col += len(text)
+            out.append(text)
+        tok = m.group()
+        if tok[-1] == "m":
+            active = tok not in ("\x1b[0m", "\x1b[m")
+        out.append(tok)
+    text = row[pos:]
+    if text and col < cols:
+        if "\t" in text:
+            text = (" " * (col % 8) + text).expandtabs(8)[col % 8:]
+        text = text[:cols - col]
+        col += len(text)
+        out.append(text)
+    return "".join(out), col, active
+
+class ScreenRenderer:
+    """Merkt sich den zuletzt gezeichneten Bildschirm und gibt pro Frame nur geänderte
+       Zeilen bzw. deren geänderten Rest aus – alles in einem einzigen write().
+
+    Zeilen werden auf die (gecachte) Terminalgröße geclippt, damit kein Umbruch oder
+    Scrollen die absolute Positionierung verschiebt. Nach jeder Zeile ist der
+    SGR-Zustand zurückgesetzt; beim Fortsetzen mitten in einer Zeile werden die bis
+    dahin aktiven SGR-Sequenzen neu gesetzt. Größenänderung oder invalidate() führen
+    zu einem kompletten Neuzeichnen mit Screen-Clear.
+    """
+    def __init__(self, out=None):
+        self.out = out
+        self.rows: List[Optional[str]] = []
+        self.size: Optional[Tuple[int, int]] = None
+        self.full = True
+        self.bytes_written = 0
+
+    def invalidate(self) -> None:
+        """Nächster Frame zeichnet alles neu (z. B. nachdem jemand anders geschrieben hat)."""
+        self.full = True
+
+    def invalidate_rows(self, *indexes: int) -> None:
+        """Einzelne Zeilen (0-basiert) gelten als unbekannt und werden neu geschrieben."""
+        for i in indexes:
+            if 0 <= i < len(self.rows):
+                self.rows[i] = None
+
+    @staticmethod
+    def _resume_point(old: str, new: str) -> Tuple[int, int, str]:
+        """Gemeinsamer Präfix von old/new als (Index, Spalte, aktive SGR-Sequenzen).
+           Zerteilt keine Escape-Sequenz; bei Nicht-ASCII im Präfix ab Spalte 0.
+        """
+        n = min(len(old), len(new))
+        p = 0
+        while p < n and old[p] == new[p]:
+            p += 1
+        if p == 0 or (not new.isascii() and not new[:p].isascii()):
+            return 0, 0, ""
+        col = 0
+        pos = 0
+        sgr: List[str] = []
+        for m in _ANSI_TOKEN_RE.finditer(new):
+            if m.start() >= p:
+                break
+            if m.end() > p:
+                p = m.start()
+                break
+            col += m.start() - pos
+            tok = m.group()
+            if tok[-1] == "m":
+                if tok in ("\x1b[0m", "\x1b[m"):
+                    sgr = []
+                else:
+                    sgr.append(tok)
+            pos = m.end()
+        col += p - pos
+        return p, col, "".join(sgr)
+
+    def render(self, rows: List[str]) -> str:
+        """Baut die Escape-Sequenz für den Übergang vom alten zum neuen Bildschirm."""
+        size = terminal_size()
+        cols, lines = max(size.columns, 1), max(size.lines, 1)
+        if (cols, lines) != self.size:
+            self.size = (cols, lines)
+            self.full = True
+        fitted = [_fit_row(r, cols) for r in rows[:lines]]
+
+        parts: List[str] = []
+        if self.full:
+            parts.append("\x1b[0m\x1b[H\x1b[2J")
+            old_rows: List[Optional[str]] = [""] * len(fitted)
+            self.full = False
+        else:
+            old_rows = self.rows
+
+        for i, (new, width, active) in enumerate(fitted):
+            old = old_rows[i] if i < len(old_rows) else ""
+            if new == old:
+                continue
+            if old is None:
+                p, col, sgr = 0, 0, ""
+            else:
+                p, col, sgr = self._resume_point(old, new)
+            parts.append(f"\x1b[{i + 1};{col + 1}H")
+            if sgr:
+                parts.append(sgr)
+            parts.append(new[p:])
+            if active:
+                parts.append("\x1b[0m")
+            # In der letzten Spalte steht der Cursor im "pending wrap" – dort würde
+            # EL das letzte Zeichen löschen; volle Zeilen brauchen ohnehin kein EL.
+            if old != "" and width < cols:
+                parts.append("\x1b[K")
+        for i in range(len(fitted), len(old_rows)):
+            if old_rows[i] != "":
+                parts.append(f"\x1b[{i + 1};1H\x1b[K")
+
+        self.rows = [r for r, _, _ in fitted]
+        if not parts:
+            return ""
+        parts.append(f"\x1b[{min(len(fitted) + 1, lines)};1H")
+        return "".join(parts)
+
+    def draw(self, rows: List[str]) -> None:
+        frame = self.render(rows)
+        if frame:
+            out = self.out or sys.stdout
+            out.write(frame)
+            out.flush()
+            self.bytes_written += len(frame)
+
 # ---------- Tastatur-Poll (für 'a' Toggle) ----------
 class KeyPoller:
     def __init__(self):
@@ -1326,6 +3105,1048 @@ class KeyPoller:
             except Exception:
                 return ""
 
+# ---------- Eingabe: Chunk-Reader ----------
+class LineReader:
+    """Nicht-blockierender Chunk-Leser für STDIN bzw. Kommando-Output.
+
+    Liest mit os.read() in großen Blöcken, trennt Zeilen auf Byte-Ebene (b"\\n") und
+    hält eine angefangene letzte Zeile bis zum nächsten Block zurück. read_block()
+    leert pro Aufruf alles, was gerade anliegt (bis MAX_DRAIN, damit Tasten und Timer
+    bei einem endlosen Strom nicht verhungern – die Schleife ruft sofort wieder auf).
+    """
+    CHUNK = 1 << 16
+    MAX_DRAIN = 1 << 23
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.was_blocking = os.get_blocking(fd)
+        os.set_blocking(fd, False)
+        self.partial = b""
+        self.eof = False
+
+    def read_block(self) -> bytes:
+        """Alle vollständigen Zeilen, die jetzt anliegen; am EOF inkl. Rest ohne Newline."""
+        chunks = [self.partial]
+        n = 0
+        while n < self.MAX_DRAIN:
+            try:
+                data = os.read(self.fd, self.CHUNK)
+            except BlockingIOError:
+                break
+            if not data:
+                self.eof = True
+                break
+            chunks.append(data)
+            n += len(data)
+        buf = b"".join(chunks)
+        if self.eof:
+            self.partial = b""
+            return buf
+        cut = buf.rfind(b"\n") + 1
+        self.partial = buf[cut:]
+        return buf[:cut]
+
+    def close(self) -> None:
+        """Stellt den Blocking-Modus wieder her (STDIN gehört nicht uns allein)."""
+        try:
+            os.set_blocking(self.fd, self.was_blocking)
+        except OSError:
+            pass
+
+def pending_bytes(fd: int) -> int:
+    """Ungelesene Bytes in einer Pipe bzw. einem Socket (FIONREAD); 0, wenn nicht ermittelbar."""
+    try:
+        import fcntl, termios
+        buf = fcntl.ioctl(fd, termios.FIONREAD, b"\0\0\0\0")
+    except (ImportError, OSError):
+        return 0
+    return struct.unpack("i", buf)[0]
+
+def format_bytes(n: int) -> str:
+    """Kompakte Größe für die Status-Bar: 512B, 64KB, 1.5MB."""
+    if n >= 1 << 20:
+        return f"{n / (1 << 20):.1f}MB"
+    if n >= 1 << 10:
+        return f"{n >> 10}KB"
+    return f"{n}B"
+
+def format_rate(per_sec: float) -> str:
+    """Kompakte Rate für die Status-Bar: 850, 12.3k, 1.2M."""
+    if per_sec >= 1e6:
+        return f"{per_sec / 1e6:.1f}M"
+    if per_sec >= 1e3:
+        return f"{per_sec / 1e3:.1f}k"
+    return f"{per_sec:.0f}"
+
+class IngestMeter:
+    """Zählt eingelesene Zeilen/Bytes und die dafür benötigte Arbeitszeit (Lesen + Auswerten).
+
+    rate():     aktuelle Eingangsrate in Zeilen/s über ein gleitendes Fenster
+    capacity(): nachhaltige Rate = Zeilen pro Sekunde Arbeitszeit, d. h. was patwatch
+                dauerhaft schaffen würde, bevor es hinter den Strom zurückfällt
+    """
+    WINDOW = 10.0
+
+    def __init__(self):
+        self.lines = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.samples: deque = deque([(time.monotonic(), 0)])
+
+    def add(self, lines: int = 0, nbytes: int = 0, seconds: float = 0.0) -> None:
+        self.lines += lines
+        self.bytes += nbytes
+        self.busy += seconds
+
+    def rate(self) -> float:
+        now = time.monotonic()
+        samples = self.samples
+        samples.append((now, self.lines))
+        while len(samples) > 2 and now - samples[1][0] >= self.WINDOW:
+            samples.popleft()
+        t0, l0 = samples[0]
+        return (self.lines - l0) / (now - t0) if now > t0 else 0.0
+
+    def capacity(self) -> float:
+        return self.lines / self.busy if self.busy > 0 else 0.0
+
+    def status(self) -> str:
+        """Kurzform für die Status-Bar, z. B. "in 1.2k/s max 85.0k/s"."""
+        return f"in {format_rate(self.rate())}/s max {format_rate(self.capacity())}/s"
+
+    def summary(self) -> str:
+        return (f"{self.lines} Zeilen, {self.bytes / 1048576:.1f}MB eingelesen; "
+                f"nachhaltiger Durchsatz {format_rate(self.capacity())} Zeilen/s")
+
+# ---------- Dateien verfolgen (--follow) ----------
+class Inotify:
+    """Minimaler inotify-Zugriff über ctypes (Linux). available=False, wenn es fehlt (z. B. macOS);
+       dann bleibt nur das Polling von FileFollower."""
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    DIR_MASK = IN_MODIFY | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (danach name[len])
+
+    def __init__(self):
+        self.fd = -1
+        self.libc = None
+        try:
+            import ctypes, ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd >= 0:
+            self.fd = fd
+            self.libc = libc
+
+    @property
+    def available(self) -> bool:
+        return self.fd >= 0
+
+    def add_watch(self, path: str, mask: int) -> int:
+        return self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """Alle anliegenden Ereignisse als (wd, mask, name)."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                break
+            pos = 0
+            size = self._EVENT.size
+            while pos + size <= len(data):
+                wd, mask, _cookie, length = self._EVENT.unpack_from(data, pos)
+                name = data[pos + size:pos + size + length].split(b"\0", 1)[0]
+                events.append((wd, mask, os.fsdecode(name)))
+                pos += size + length
+        return events
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class FollowedFile:
+    """Zustand einer verfolgten Datei: offener Deskriptor, Inode, gelesene Bytes, angefangene Zeile."""
+    __slots__ = ("path", "tag", "fd", "dev", "ino", "offset", "partial")
+    def __init__(self, path: str, tag: str):
+        self.path = path
+        self.tag = tag
+        self.fd: Optional[int] = None
+        self.dev = 0
+        self.ino = 0
+        self.offset = 0          # Position nach der letzten vollständigen Zeile (Checkpoint)
+        self.partial = b""
+
+class FileFollower:
+    """--follow FILE...: verfolgt mehrere Dateien wie 'tail -F', ohne Zusatzprozess.
+
+    Beobachtet werden die Verzeichnisse per inotify (ein Watch je Verzeichnis, Ereignisse tragen
+    den Dateinamen); ein seltener Poll fängt alles ab, was inotify nicht meldet (NFS, Überlauf),
+    ohne inotify wird nur gepollt. Rotation (neue Datei unter dem Namen, neue Inode) wird erkannt:
+    die alte Datei wird zu Ende gelesen, dann geht es mit der neuen ab Offset 0 weiter.
+    Truncation (Größe < Offset, z. B. copytruncate) setzt auf 0 zurück. Bei mehreren Dateien bekommt
+    jede Zeile ihre Quelle vorangestellt (tag_format, Default "{name}: "). Mit checkpoint_path werden die Offsets
+    (mit Gerät/Inode) gespeichert; ein Neustart setzt dort fort, statt alles erneut zu lesen.
+    """
+    MAX_READ = 8 << 20        # Bytes pro Datei und Aufruf; der Rest folgt im nächsten Durchgang
+    CHECKPOINT_EVERY = 5.0    # Sekunden zwischen Checkpoint-Schreibvorgängen
+
+    def __init__(self, paths: List[str], tag_format: Optional[str] = None, from_start: bool = False,
+                 checkpoint_path: Optional[str] = None, no_warn: bool = False):
+        self.no_warn = no_warn
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_at = 0.0
+        self.dirty = False
+        if tag_format is None:
+            tag_format = "{name}: " if len(paths) > 1 else ""
+        names = [os.path.basename(p) for p in paths]
+        self.files: List[FollowedFile] = []
+        for path, name in zip(paths, names):
+            # Gleiche Dateinamen in verschiedenen Verzeichnissen: vollen Pfad als Quelle nehmen
+            label = name if names.count(name) == 1 else path
+            tag = tag_format.format(name=label, path=path) if tag_format else ""
+            self.files.append(FollowedFile(path, tag))
+        saved = self._load_checkpoint()
+        for f in self.files:
+            self._open(f, saved.get(os.path.abspath(f.path)), from_start)
+        self.inotify = Inotify()
+        self.watches = {}  # wd → Verzeichnis
+        if self.inotify.available:
+            for d in sorted({os.path.dirname(os.path.abspath(f.path)) for f in self.files}):
+                wd = self.inotify.add_watch(d, Inotify.DIR_MASK)
+                if wd >= 0:
+                    self.watches[wd] = d
+                elif not no_warn:
+                    sys.stderr.write(f"[WARN] --follow: inotify für '{d}' nicht möglich, nur Polling.\n")
+        self.pending = False  # True, wenn eine Datei mehr als MAX_READ anstehen hat
+
+    @property
+    def fd(self) -> int:
+        """inotify-Deskriptor für die Ereignisschleife (-1 ohne inotify)."""
+        return self.inotify.fd
+
+    @property
+    def poll_interval(self) -> float:
+        return 2.0 if self.inotify.available else 0.25
+
+    def _load_checkpoint(self) -> dict:
+        if not self.checkpoint_path:
+            return {}
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            if not self.no_warn:
+                sys.stderr.write(f"[WARN] --follow-checkpoint '{self.checkpoint_path}' unlesbar: {e}\n")
+            return {}
+
+    def _open(self, f: FollowedFile, saved: Optional[dict] = None, from_start: bool = True) -> bool:
+        """Öffnet f.path. Offset: Checkpoint (gleiche Inode, nicht größer als die Datei), sonst
+           Anfang (from_start, neu aufgetauchte/rotierte Datei) bzw. Ende (Start wie tail -F)."""
+        try:
+            fd = os.open(f.path, os.O_RDONLY | os.O_NONBLOCK)
+        except OSError:
+            return False
+        st = os.fstat(fd)
+        offset = 0 if from_start else st.st_size
+        if saved and saved.get("dev") == st.st_dev and saved.get("ino") == st.st_ino \
+                and 0 <= saved.get("offset", -1) <= st.st_size:
+            offset = saved["offset"]
+        os.lseek(fd, offset, os.SEEK_SET)
+        f.fd, f.dev, f.ino, f.offset, f.partial = fd, st.st_dev, st.st_ino, offset, b""
+        self.dirty = True
+        return True
+
+    def _close(self, f: FollowedFile) -> None:
+        if f.fd is not None:
+            os.close(f.fd)
+            f.fd = None
+
+    def _drain(self, f: FollowedFile, out: List[str], final: bool = False) -> None:
+        """Liest bis EOF (höchstens MAX_READ) und hängt vollständige Zeilen mit Quelle an out an."""
+        budget = self.MAX_READ
+        chunks = [f.partial] if f.partial else []
+        got = 0
+        while got < budget:
+            try:
+                data = os.read(f.fd, min(1 << 20, budget - got))
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                break
+            chunks.append(data)
+            got += len(data)
+        if got >= budget:
+            self.pending = True
+        if not got and not (final and f.partial):
+            return
+        buf = b"".join(chunks)
+        cut = buf.rfind(b"\n") + 1
+        if final and cut < len(buf):
+            buf += b"\n"  # angefangene letzte Zeile der rotierten Datei nicht verlieren
+            cut = len(buf)
+        f.partial = buf[cut:]
+        if cut:
+            complete = buf[:cut]
+            f.offset = os.lseek(f.fd, 0, os.SEEK_CUR) - len(f.partial)
+            text = complete.decode("utf-8", "replace")
+            tag = f.tag
+            if tag:
+                out.append("".join(tag + line + "\n" for line in text.splitlines()))
+            else:
+                out.append(text)
+            self.dirty = True
+
+    def _check(self, f: FollowedFile, out: List[str]) -> None:
+        if f.fd is None:
+            if self._open(f):  # Datei ist (wieder) da: von vorn lesen
+                self._drain(f, out)
+            return
+        self._drain(f, out)
+        try:
+            st = os.stat(f.path)
+        except OSError:
+            return  # umbenannt/gelöscht: alten Deskriptor behalten, bis die neue Datei auftaucht
+        if (st.st_dev, st.st_ino) != (f.dev, f.ino):
+            # Rotation: Rest der alten Datei lesen, dann die neue ab Anfang
+            self._drain(f, out, final=True)
+            self._close(f)
+            if self._open(f):
+                self._drain(f, out)
+        elif st.st_size < f.offset:
+            # Truncation (copytruncate o. ä.)
+            os.lseek(f.fd, 0, os.SEEK_SET)
+            f.offset, f.partial = 0, b""
+            self._drain(f, out)
+
+    def read_events(self) -> str:
+        """Nach inotify-Ereignissen: nur die betroffenen Dateien prüfen."""
+        names = set()
+        check_all = False
+        for wd, mask, name in self.inotify.read_events():
+            if mask & Inotify.IN_Q_OVERFLOW:
+                check_all = True
+            elif wd in self.watches:
+                names.add(os.path.join(self.watches[wd], name))
+        out: List[str] = []
+        self.pending = False
+        for f in self.files:
+            if check_all or os.path.abspath(f.path) in names:
+                self._check(f, out)
+        return "".join(out)
+
+    def poll(self) -> str:
+        """Alle Dateien prüfen (Sicherheitsnetz bzw. einziger Weg ohne inotify)."""
+        out: List[str] = []
+        self.pending = False
+        for f in self.files:
+            self._check(f, out)
+        return "".join(out)
+
+    def save_checkpoint(self, force: bool = False) -> None:
+        """Offsets atomar schreiben (tmp + rename), höchstens alle CHECKPOINT_EVERY Sekunden."""
+        if not self.checkpoint_path or not self.dirty:
+            return
+        now = time.monotonic()
+        if not force and now - self.checkpoint_at < self.CHECKPOINT_EVERY:
+            return
+        data = {os.path.abspath(f.path): {"dev": f.dev, "ino": f.ino, "offset": f.offset}
+                for f in self.files if f.ino}
+        tmp = self.checkpoint_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, self.checkpoint_path)
+        except OSError as e:
+            if not self.no_warn:
+                sys.stderr.write(f"[WARN] --follow-checkpoint nicht schreibbar: {e}\n")
+        self.checkpoint_at = now
+        self.dirty = False
+
+    def close(self) -> None:
+        self.save_checkpoint(force=True)
+        for f in self.files:
+            self._close(f)
+        self.inotify.close()
+
+# ---------- Fleet-Modus (--hosts) ----------
+HOST_CMD_DEFAULT = "ssh -o BatchMode=yes -o ConnectTimeout=10 {login} {cmd}"
+HOST_CONCURRENCY = 32  # gleichzeitig laufende Host-Kommandos (Default für --host-concurrency)
+
+def load_hosts(path: str) -> List[dict]:
+    """Host-Liste im Format von tmc/configs/taskf_ssh.json: [{"machine": ..., "user": ...}, ...].
+       Weitere Schlüssel (z. B. "extra") stehen im --host-cmd/--host-tag als Platzhalter bereit."""
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    if not isinstance(data, list):
+        raise ValueError("erwartet wird eine JSON-Liste von Hosts")
+    hosts = []
+    for i, entry in enumerate(data):
+        if not isinstance(entry, dict) or not entry.get("machine"):
+            raise ValueError(f"Eintrag {i + 1} ohne 'machine'")
+        hosts.append({k: str(v) for k, v in entry.items()})
+    return hosts
+
+class FleetHost:
+    __slots__ = ("name", "argv", "tag", "proc", "reader", "state", "started", "first_byte", "rc",
+                 "last_rc", "last_ttfb", "lines", "counts")
+    def __init__(self, name: str, argv: List[str], tag: str):
+        self.name = name
+        self.argv = argv
+        self.tag = tag
+        self.proc: Optional[subprocess.Popen] = None
+        self.reader: Optional[LineReader] = None
+        self.state = "wartet"          # wartet → läuft → fertig | Fehler
+        self.started = 0.0             # monotonic beim Start
+        self.first_byte: Optional[float] = None
+        self.rc: Optional[int] = None
+        # Ergebnis des letzten abgeschlossenen Laufs; gilt, bis der neue Lauf eigene Werte hat
+        self.last_rc: Optional[int] = None
+        self.last_ttfb: Optional[float] = None
+        self.lines = 0
+        self.counts: dict = {}         # Pattern-ID → Treffer dieses Hosts
+
+    @property
+    def exit_code(self) -> Optional[int]:
+        return self.rc if self.rc is not None else self.last_rc
+
+    @property
+    def failed(self) -> bool:
+        return self.exit_code not in (None, 0)
+
+    @property
+    def ttfb(self) -> Optional[float]:
+        """Zeit bis zum ersten Byte (laufender Lauf, sonst der letzte abgeschlossene)."""
+        if self.first_byte is not None:
+            return self.first_byte - self.started
+        return self.last_ttfb
+
+class FleetRunner:
+    """--hosts DATEI: führt --cmd auf allen Hosts einer Liste gleichzeitig aus (je ein ssh-Prozess,
+       höchstens 'limit' zugleich) und liefert deren Ausgaben an eine gemeinsame Pattern-Auswertung.
+
+    Die Prozesse hängen als Deskriptoren an der Ereignisschleife (kein Thread je Host); jede Zeile
+    bekommt ihre Quelle vorangestellt (tag_format, Default "{machine}: "). Je Host werden Zeit bis
+    zum ersten Byte, Zeilen, Exit-Code und (vom Aufrufer gepflegt) Treffer je Pattern gehalten.
+    Ein Exit-Code ≠ 0 bzw. ein nicht startbares Kommando markiert den Host als fehlgeschlagen; mit
+    Intervall gelten Exit-Code und Fan-out-Latenz des letzten Laufs, bis der Neustart eigene liefert.
+    """
+    def __init__(self, hosts: List[dict], cmd: str, host_cmd: str = HOST_CMD_DEFAULT,
+                 limit: int = HOST_CONCURRENCY, tag_format: Optional[str] = None, no_warn: bool = False):
+        self.limit = max(1, limit)
+        self.no_warn = no_warn
+        if tag_format is None:
+            tag_format = "{machine}: "
+        template = shlex.split(host_cmd)
+        machines = [h["machine"] for h in hosts]
+        self.hosts: List[FleetHost] = []
+        for entry in hosts:
+            values = dict(entry)
+            user = values.setdefault("user", "")
+            values["login"] = f"{user}@{entry['machine']}" if user else entry["machine"]
+            values["cmd"] = cmd
+            # Gleicher Rechner mit verschiedenen Benutzern: Login als Name
+            values["name"] = name = entry["machine"] if machines.count(entry["machine"]) == 1 else values["login"]
+            argv = [tok.format_map(values) for tok in template]
+            self.hosts.append(FleetHost(name, argv, tag_format.format_map(values) if tag_format else ""))
+        self.queue: deque = deque(self.hosts)
+        self.by_fd = {}  # fd → FleetHost
+
+    @property
+    def running(self) -> int:
+        return len(self.by_fd)
+
+    @property
+    def done(self) -> bool:
+        return not self.queue and not self.by_fd
+
+    def start_ready(self) -> List[FleetHost]:
+        """Startet wartende Hosts bis zum Limit; liefert die gestarteten (Deskriptor: host.reader.fd)."""
+        started = []
+        while self.queue and len(self.by_fd) < self.limit:
+            host = self.queue.popleft()
+            host.started = time.monotonic()
+            host.first_byte = None
+            host.rc = None
+            try:
+                host.proc = subprocess.Popen(host.argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                             stderr=subprocess.DEVNULL)
+            except OSError as e:
+                host.state = "Fehler"
+                host.rc = host.last_rc = 127
+                host.last_ttfb = None
+                if not self.no_warn:
+                    sys.stderr.write(f"[WARN] --hosts: '{host.name}' nicht startbar: {e}\n")
+                continue
+            host.state = "läuft"
+            host.reader = LineReader(host.proc.stdout.fileno())
+            self.by_fd[host.reader.fd] = host
+            started.append(host)
+        return started
+
+    def read(self, host: FleetHost, decode: bool = True):
+        """Alle anliegenden vollständigen Zeilen von 'host' mit Quelle; (Text bzw. bytes, EOF)."""
+        block = host.reader.read_block()
+        if block and host.first_byte is None:
+            host.first_byte = time.monotonic()
+        if block and not block.endswith(b"\n"):
+            block += b"\n"  # letzte Zeile ohne Newline am EOF
+        host.lines += block.count(b"\n")
+        text = block.decode("utf-8", "replace") if decode else block
+        if host.tag and text:
+            tag = host.tag if decode else host.tag.encode("utf-8")
+            text = text[:0].join(tag + line for line in text.splitlines(True))
+        return text, host.reader.eof
+
+    def finish(self, host: FleetHost) -> None:
+        """Nach EOF: Prozess abräumen, Exit-Code übernehmen, Platz für den nächsten Host."""
+        self.by_fd.pop(host.reader.fd, None)
+        host.reader.close()
+        host.proc.stdout.close()
+        host.rc = host.last_rc = host.proc.wait()
+        host.last_ttfb = host.ttfb
+        host.proc = None
+        host.state = "fertig" if host.rc == 0 else "Fehler"
+
+    def requeue(self) -> None:
+        """Beendete Hosts erneut einreihen (mit Intervall: wie der Neustart von --cmd)."""
+        for host in self.hosts:
+            if host.proc is None and host.state != "wartet":
+                host.state = "wartet"
+                self.queue.append(host)
+
+    def fanout(self) -> Tuple[int, Optional[float], Optional[float]]:
+        """(Hosts mit Antwort, Median und Maximum der Zeit bis zum ersten Byte in Sekunden)."""
+        ttfb = sorted(h.ttfb for h in self.hosts if h.ttfb is not None)
+        if not ttfb:
+            return 0, None, None
+        return len(ttfb), ttfb[len(ttfb) // 2], ttfb[-1]
+
+    def status(self) -> str:
+        """Kurzstatus für die Status-Bar, z. B. "Hosts 14/16 aktiv, 1 Fehler (db3) | Fan-out 120ms/840ms"."""
+        failed = [h.name for h in self.hosts if h.failed]
+        parts = [f"Hosts {self.running}/{len(self.hosts)} aktiv"]
+        if self.queue:
+            parts.append(f"{len(self.queue)} wartend")
+        if failed:
+            names = ",".join(failed[:3]) + ("…" if len(failed) > 3 else "")
+            parts.append(f"{len(failed)} Fehler ({names})")
+        answered, p50, worst = self.fanout()
+        if answered:
+            parts[-1] += f" | Fan-out {p50 * 1000:.0f}ms/{worst * 1000:.0f}ms"
+        return ", ".join(parts)
+
+    def summary(self) -> dict:
+        """Je Host Zustand, Exit-Code, Zeit bis zum ersten Byte, Zeilen und Treffer (NDJSON "hosts")."""
+        return {h.name: {"state": h.state, "rc": h.exit_code, "lines": h.lines,
+                         "ttfb": None if h.ttfb is None else round(h.ttfb, 3),
+                         "counts": h.counts}
+                for h in self.hosts}
+
+    def close(self) -> None:
+        for host in list(self.by_fd.values()):
+            if host.proc.poll() is None:
+                host.proc.terminate()
+            self.finish(host)
+
+def render_host_view(runner: FleetRunner, patterns: List[PatternRec]) -> str:
+    """
+    HOST-ANSICHT (Taste 'h', --hosts): je Host Zustand, Zeit bis zum ersten Byte, Zeilen und
+    die Treffer je Pattern ("ERR=12 WARN=3"); die Summe über alle Hosts zeigt die normale Ansicht.
+    """
+    cols = terminal_size().columns
+    width = max([len(h.name) for h in runner.hosts] + [8])
+    out_lines = []
+    for host in runner.hosts:
+        ttfb = f"{host.ttfb * 1000:.0f}ms" if host.ttfb is not None else "-"
+        state = f"{host.state}({host.exit_code})" if host.failed else host.state
+        line = f"{host.name:<{width}} {state:<11} {ttfb:>7} {host.lines:<8}"
+        counts = host.counts
+        hits = " ".join(f"{pat.pid}={counts[pat.pid]}" for pat in patterns if counts.get(pat.pid))
+        out_lines.append((line + " " + hits)[:max(cols - 1, 20)].rstrip())
+    return "\n".join(out_lines) + ("\n" if out_lines else "")
+
+# ---------- Zustands-Snapshots (--state, --resume) ----------
+STATE_VERSION = 1
+STATE_INTERVAL = 30.0  # Default-Takt der Snapshots in Sekunden
+STATE_SLICE = 0.002    # Kodierarbeit je Tick in Sekunden: ein Snapshot verteilt sich über mehrere Ticks
+
+def _history_state(h: WordHistory) -> list:
+    return [list(h.first), list(h.last), h.total, h.lost_text]
+
+def _restore_history(h: WordHistory, data: list) -> None:
+    first, last, total, lost = data
+    h.clear()
+    h.first.extend(first[:h.limit])
+    h.last.extend(last)
+    h.total = max(total, len(h.first) + len(h.last))
+    h.lost_text = bool(lost)
+
+class StateStore:
+    """--state: periodische Snapshots der Pattern-Aggregate, mit --resume beim Start übernommen.
+
+    Format ist NDJSON: eine Kopfzeile (Version, Zeitpunkt), dann eine Zeile je Pattern mit Treffern
+    (count, Wort-Historien, Refs, Top-K, Distinct-Register, Raten-Ring). Kodiert wird im Hauptthread,
+    verteilt über mehrere Ticks der Ereignisschleife (step(), je höchstens STATE_SLICE), und nur für
+    Patterns mit neuen Treffern seit dem letzten Snapshot; die übrigen Zeilen werden wiederverwendet.
+    Gehalten werden fertige JSON-Strings, keine Container – der GC muss sie nie durchsuchen. Jede
+    Zeile ist in sich konsistent, die Zeilen eines Snapshots liegen wenige Ticks auseinander. Der
+    Writer-Thread ergänzt nur die zeitabhängigen Raten-Felder und schreibt (tmp + rename, atomar).
+    Wiederhergestellt wird ein Pattern nur bei gleicher ID und unveränderter Zeile der Pattern-Datei.
+    """
+    def __init__(self, path: str, no_warn: bool):
+        self.path = path
+        self.no_warn = no_warn
+        self.thread: Optional[threading.Thread] = None
+        # Zeilen des letzten Snapshots: id(PatternRec) → ((count, refs_version), Zeile) und → PatternRec
+        self.rows: dict = {}
+        self.owners: dict = {}
+        self.pending: Optional[list] = None  # laufender Snapshot: [Pattern-Liste, Position, Zeilen, rows, owners]
+
+    @staticmethod
+    def _encode(pat: PatternRec, cached: Optional[tuple], now: float) -> tuple:
+        """(Schlüssel, Zeile) für ein Pattern mit Treffern; Zeile ist (JSON ohne schließende Klammer,
+           Raten-Ring als (Base64, absoluter Kopf, Breite) oder None, Messbeginn). Ohne neue Treffer
+           ändert sich nichts außer der Zeit, die erst _write() einsetzt: die alte Zeile bleibt."""
+        key = (pat.count, pat.refs_version)
+        if cached is not None and cached[0] == key:
+            return cached
+        ring = pat.rate
+        if pat.count != ring.seen:
+            ring.record(pat.count, now)  # Zähler-Delta gehört in den Ring dieser Zeile
+        top = pat.top
+        words = list(top.counts)
+        hll = pat.distinct
+        body = json.dumps({
+            "id": pat.pid, "spec": pat.spec, "count": pat.count, "head_count": pat.head_count,
+            "head": _history_state(pat.head), "head_keys": _history_state(pat.head_keys),
+            "alts": _history_state(pat.alts), "orig_words": _history_state(pat.orig_words),
+            "refs": list(pat.found_refs),
+            "top": [top.total, words, [top.counts[w] for w in words], [top.errors.get(w, 0) for w in words]],
+            "distinct": None if hll is None else [hll.p, hll.by_ref,
+                                                  base64.b64encode(hll.registers).decode("ascii")],
+        }, ensure_ascii=False, separators=(",", ":"))[:-1]
+        rate = None
+        if ring.head is not None:
+            rate = (base64.b64encode(ring.window(len(ring.buckets)).tobytes()).decode("ascii"),
+                    ring.head, ring.width)
+        return key, (body, rate, ring.origin)
+
+    def _encode_some(self, patterns: List[PatternRec], budget: float) -> bool:
+        """Setzt den laufenden Snapshot fort, bis budget Sekunden verbraucht sind; True, wenn alle
+           Patterns kodiert sind. Wurde die Liste getauscht (Hot Reload), beginnt sie von vorn."""
+        pending = self.pending
+        if pending is None or pending[0] is not patterns:
+            pending = self.pending = [patterns, 0, [], {}, {}]
+        _, pos, rows, current, owners = pending
+        previous = self.rows
+        previous_owner = self.owners.get
+        now = time.monotonic()
+        clock = time.perf_counter
+        deadline = clock() + budget
+        n = len(patterns)
+        while pos < n:
+            pat = patterns[pos]
+            pos += 1
+            if pat.count:
+                key = id(pat)
+                # pop: eine ersetzte alte Zeile wird gleich hier freigegeben, nicht gesammelt in _finish()
+                cached = previous.pop(key, None)
+                entry = self._encode(pat, cached if previous_owner(key) is pat else None, now)
+                current[key] = entry
+                owners[key] = pat
+                rows.append(entry[1])
+                if clock() >= deadline:
+                    break
+        pending[1] = pos
+        return pos >= n
+
+    def _finish(self) -> Tuple[float, float, list]:
+        """(Zeitpunkt, monotonic, Zeilen) des abgeschlossenen Snapshots; dessen Einträge werden zur
+           Basis für die nächste."""
+        _, _, rows, current, owners = self.pending
+        self.pending = None
+        self.rows = current
+        self.owners = owners
+        return time.time(), time.monotonic(), rows
+
+    def capture(self, patterns: List[PatternRec]) -> Tuple[float, float, list]:
+        """Alle Patterns mit Treffern in einem Zug kodiert (save() beim Beenden, patwatch_bench)."""
+        self.pending = None
+        self._encode_some(patterns, float("inf"))
+        return self._finish()
+
+    def _write(self, saved_at: float, now: float, rows: list) -> None:
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(json.dumps({"patwatch_state": STATE_VERSION, "saved": saved_at}) + "\n")
+                for body, rate, origin in rows:
+                    # Raten-Lag und -Alter hängen an der Zeit, nicht an den Treffern: erst hier eingesetzt
+                    lag = "null" if rate is None else f'["{rate[0]}",{int(now // rate[2]) - rate[1]}]'
+                    fh.write(f'{body},"rate":{lag},"rate_age":{json.dumps(now - origin)}}}\n')
+            os.replace(tmp, self.path)
+        except OSError as e:
+            if not self.no_warn:
+                sys.stderr.write(f"[WARN] --state '{self.path}' nicht schreibbar: {e}\n")
+
+    def save_async(self, patterns: List[PatternRec]) -> bool:
+        """Beginnt einen periodischen Snapshot, fortgesetzt mit step(); False, solange der vorige
+           noch kodiert oder geschrieben wird (dann ausgelassen)."""
+        if self.pending is not None or (self.thread is not None and self.thread.is_alive()):
+            return False
+        self.pending = [patterns, 0, [], {}, {}]
+        return True
+
+    def step(self, patterns: List[PatternRec], budget: float = STATE_SLICE) -> bool:
+        """Ein Tick Kodierarbeit (höchstens etwa budget Sekunden); True, sobald alle Zeilen fertig
+           und an den Writer-Thread übergeben ist."""
+        if self.pending is None:
+            return True
+        if not self._encode_some(patterns, budget):
+            return False
+        self.thread = threading.Thread(target=self._write, args=self._finish(),
+                                       name="patwatch-state", daemon=True)
+        self.thread.start()
+        return True
+
+    def save(self, patterns: List[PatternRec]) -> None:
+        """Abschließender Snapshot beim Beenden (synchron, in einem Zug, nach einem noch laufenden
+           Writer; ein halber periodischer Snapshot wird verworfen)."""
+        if self.thread is not None:
+            self.thread.join()
+        self._write(*self.capture(patterns))
+
+    def load(self, patterns: List[PatternRec]) -> Tuple[int, int, float]:
+        """Übernimmt einen Snapshot in die PatternRecs: (übernommen, verworfen, Alter in Sekunden).
+           Fehlt die Datei, ist das kein Fehler (erster Start mit --resume)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                head = json.loads(fh.readline() or "{}")
+                if head.get("patwatch_state") != STATE_VERSION:
+                    raise ValueError(f"unbekanntes Format (Version {head.get('patwatch_state')!r})")
+                rows = [json.loads(line) for line in fh if line.strip()]
+        except FileNotFoundError:
+            return 0, 0, 0.0
+        except (OSError, ValueError, AttributeError) as e:
+            if not self.no_warn:
+                sys.stderr.write(f"[WARN] --state '{self.path}' unlesbar: {e}\n")
+            return 0, 0, 0.0
+        age = max(0.0, time.time() - head.get("saved", time.time()))
+        by_id = {pat.pid: pat for pat in patterns}
+        restored = 0
+        for row in rows:
+            pat = by_id.get(row.get("id"))
+            if pat is None or row.get("spec") != list(pat.spec):
+                continue  # Pattern entfernt oder geändert: alte Zähler passen nicht mehr
+            try:
+                self._restore(pat, row, age)
+            except (KeyError, TypeError, ValueError) as e:
+                if not self.no_warn:
+                    sys.stderr.write(f"[WARN] --state: Zustand von '{pat.pid}' unbrauchbar: {e}\n")
+                reset_patterns([pat])
+                continue
+            restored += 1
+        return restored, len(rows) - restored, age
+
+    @staticmethod
+    def _restore(pat: PatternRec, row: dict, age: float) -> None:
+        pat.count = row["count"]
+        pat.head_count = row["head_count"]
+        for name in ("head", "head_keys", "alts", "orig_words"):
+            _restore_history(getattr(pat, name), row[name])
+        refs = row["refs"][:MAX_REFS]
+        pat.found_refs = dict.fromkeys(refs)
+        pat.refs_sorted = sorted(pat.found_refs)
+        pat.refs_version += 1
+        top = pat.top
+        total, words, counts, errors = row["top"]
+        top.clear()
+        for w, c, e in list(zip(words, counts, errors))[:top.size]:
+            top._move(None, 0, w, c)
+            if e:
+                top.errors[w] = e
+        top.total = total
+        top.floor = min(top.buckets) if top.buckets else 0
+        hll = pat.distinct
+        if hll is not None and row["distinct"] is not None:
+            p, by_ref, regs = row["distinct"]
+            regs = bytearray(base64.b64decode(regs))
+            if p == hll.p and by_ref == hll.by_ref and len(regs) == hll.m:
+                hll.registers = regs
+                hll.zsum = sum(regs.count(r) * _HLL_INV_POW2[r] for r in set(regs))
+                hll.zeros = regs.count(0)
+        # Raten: der Ring läuft auf der monotonen Uhr weiter, als wäre patwatch nur still gewesen
+        ring = pat.rate
+        ring.clear()
+        now = time.monotonic()
+        ring.origin = now - row["rate_age"] - age
+        if row["rate"] is not None:
+            saved = array("I")
+            saved.frombytes(base64.b64decode(row["rate"][0]))
+            size = len(ring.buckets)
+            shift = row["rate"][1] + int(age // ring.width)
+            idx = ring._advance(now)
+            for k in range(min(len(saved), size - shift)):
+                ring.buckets[(idx - shift - k) % size] = saved[-1 - k]
+        ring.seen = pat.count
+
+# ---------- Profiling (--profile) ----------
+PROFILE_STAGES = ("read", "match", "transform", "render", "truncate", "aux", "write")
+
+class StageProfiler:
+    """--profile: Zeit je Verarbeitungsstufe in perf_counter_ns-Akkumulatoren (pro Frame und gesamt).
+
+    Die Stufen sind exklusiv und addieren sich zur eigenen Arbeitszeit: transform (Spalte 5)
+    ist aus match herausgerechnet, truncate (Kürzen der Wortlisten) aus render. Getrennt davon:
+    wait = Zeit, in der die Ereignisschleife auf Eingabe wartete (select), und im iterativen
+    Modus je Lauf die Laufzeit des Kommandos (cmd) und die Zeit bis zum ersten Byte (ttfb).
+    """
+    def __init__(self, ndjson_path: Optional[str] = None):
+        self.frame = dict.fromkeys(PROFILE_STAGES, 0)  # laufender Frame
+        self.last = dict(self.frame)                   # zuletzt abgeschlossener Frame
+        self.total = dict(self.frame)
+        self.frames = 0
+        self.wait_ns = 0          # Warten auf Eingabe seit dem letzten Frame
+        self.wait_total = 0
+        self.last_wait = 0
+        self.runs = 0             # iterativer Modus: Kommandoläufe
+        self.cmd_ns = 0
+        self.cmd_total = 0
+        self.ttfb_ns: Optional[int] = None
+        self.ttfb_total = 0
+        self.ttfb_runs = 0
+        self.ttfb_max = 0
+        self.started = time.perf_counter_ns()
+        self.ndjson = open(ndjson_path, "a", encoding="utf-8") if ndjson_path else None
+
+    def add(self, stage: str, ns: int) -> None:
+        self.frame[stage] += ns
+
+    def timed(self, stage: str, fn: Callable) -> Callable:
+        """Wrapper, der jeden Aufruf von fn auf 'stage' bucht (z. B. PatternRec.alt_fn)."""
+        frame = self.frame
+        clock = time.perf_counter_ns
+        def wrapper(*a, **kw):
+            t0 = clock()
+            try:
+                return fn(*a, **kw)
+            finally:
+                frame[stage] += clock() - t0
+        wrapper.stage = stage
+        return wrapper
+
+    def wrap_transforms(self, patterns: List[PatternRec]) -> None:
+        """Bucht Spalte 5 (PatternRec.alt_fn) auf 'transform' – beim Start und nach jedem Hot Reload;
+           vom Reload übernommene PatternRecs sind schon gewrappt und bleiben, wie sie sind."""
+        for pat in patterns:
+            fn = pat.alt_fn
+            if fn is not None and getattr(fn, "stage", None) != "transform":
+                pat.alt_fn = self.timed("transform", fn)
+
+    def mark(self, inner: str) -> Tuple[int, int]:
+        """Startpunkt für add_exclusive(): (Zeitpunkt, bisheriger Stand der inneren Stufe)."""
+        return time.perf_counter_ns(), self.frame[inner]
+
+    def add_exclusive(self, stage: str, inner: str, mark: Tuple[int, int]) -> None:
+        """Bucht die Zeit seit mark auf 'stage', abzüglich der währenddessen auf 'inner' gebuchten."""
+        t0, inner_before = mark
+        self.frame[stage] += (time.perf_counter_ns() - t0) - (self.frame[inner] - inner_before)
+
+    def add_wait(self, ns: int) -> None:
+        self.wait_ns += ns
+
+    def add_run(self, cmd_ns: int, ttfb_ns: Optional[int]) -> None:
+        """Iterativer Modus: Laufzeit des Kommandos und Zeit bis zum ersten Output-Byte."""
+        self.runs += 1
+        self.cmd_ns = cmd_ns
+        self.cmd_total += cmd_ns
+        self.ttfb_ns = ttfb_ns
+        if ttfb_ns is not None:
+            self.ttfb_runs += 1
+            self.ttfb_total += ttfb_ns
+            self.ttfb_max = max(self.ttfb_max, ttfb_ns)
+
+    def end_frame(self) -> None:
+        """Schließt den Frame ab (nach dem Schreiben): Werte übernehmen, ggf. NDJSON-Zeile."""
+        frame, total = self.frame, self.total
+        self.last = dict(frame)
+        for stage in PROFILE_STAGES:
+            total[stage] += frame[stage]
+            frame[stage] = 0
+        self.frames += 1
+        self.last_wait = self.wait_ns
+        self.wait_total += self.wait_ns
+        self.wait_ns = 0
+        if self.ndjson is not None:
+            rec = {"frame": self.frames, "t": round(time.time(), 3), "ns": self.last, "wait_ns": self.last_wait}
+            if self.runs:
+                rec["cmd_ns"] = self.cmd_ns
+                rec["ttfb_ns"] = self.ttfb_ns
+            try:
+                self.ndjson.write(json.dumps(rec) + "\n")
+                self.ndjson.flush()
+            except OSError:
+                self.ndjson = None
+
+    def status(self) -> str:
+        """Statuszeile mit den Stufen des letzten Frames in ms, z. B.
+           "prof ms: read 0.2 match 3.1 transform 0.4 ... | wait 998 | cmd 812 ttfb 15"."""
+        parts = [f"{stage} {self.last[stage] / 1e6:.1f}" for stage in PROFILE_STAGES]
+        line = "prof ms: " + " ".join(parts) + f" | wait {self.last_wait / 1e6:.0f}"
+        if self.runs:
+            ttfb = "-" if self.ttfb_ns is None else f"{self.ttfb_ns / 1e6:.0f}"
+            line += f" | cmd {self.cmd_ns / 1e6:.0f} ttfb {ttfb}"
+        return line
+
+    def summary(self) -> str:
+        """Mehrzeilige Zusammenfassung für STDERR beim Beenden."""
+        frames = max(self.frames, 1)
+        work = sum(self.total.values()) or 1
+        wall = max(time.perf_counter_ns() - self.started, 1)
+        lines = [f"[PROFILE] {self.frames} Frames, Laufzeit {wall / 1e9:.1f}s "
+                 f"(Arbeit {work / 1e9:.2f}s, Warten {(self.wait_total + self.wait_ns) / 1e9:.2f}s)",
+                 f"  {'Stufe':<10} {'gesamt ms':>11} {'ms/Frame':>9} {'Anteil':>7}"]
+        for stage in PROFILE_STAGES:
+            ns = self.total[stage]
+            lines.append(f"  {stage:<10} {ns / 1e6:>11.1f} {ns / 1e6 / frames:>9.2f} {100.0 * ns / work:>6.1f}%")
+        if self.runs:
+            lines.append(f"  Kommando: {self.runs} Läufe, Ø {self.cmd_total / 1e6 / self.runs:.1f}ms")
+            if self.ttfb_runs:
+                lines.append(f"  Zeit bis zum ersten Byte: Ø {self.ttfb_total / 1e6 / self.ttfb_runs:.1f}ms, "
+                             f"max {self.ttfb_max / 1e6:.1f}ms")
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        if self.ndjson is not None:
+            self.ndjson.close()
+            self.ndjson = None
+
+# ---------- Ereignisschleife ----------
+class EventLoop:
+    """Eine selectors-basierte Hauptschleife (epoll/kqueue/poll) für Kommando-Output,
+       STDIN, Tastatur und Timer.
+
+    select() blockiert bis zum nächsten fälligen Timer oder bis ein Deskriptor lesbar
+    wird – Tasten und neue Daten werden sofort behandelt, ein wartendes patwatch
+    verbraucht praktisch keine CPU. Signale (z. B. SIGWINCH) wecken die Schleife über
+    eine Self-Pipe (signal.set_wakeup_fd) auf; wakeup() ist auch aus Threads nutzbar.
+    on_idle(ns) erhält, falls gesetzt, die in select() verbrachte Zeit (--profile).
+    """
+    def __init__(self):
+        self.sel = selectors.DefaultSelector()
+        self.timers: list = []  # Heap aus [deadline, seq, callback, aktiv]
+        self.seq = 0
+        self.running = False
+        self.signal_callbacks = {}
+        self.pending: deque = deque()  # Callbacks aus anderen Threads
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        os.set_blocking(self.wake_w, False)
+        self.sel.register(self.wake_r, selectors.EVENT_READ, self._drain_wakeup)
+        self.on_idle: Optional[Callable[[int], None]] = None
+
+    def add_reader(self, fd: int, callback: Callable[[], None]) -> None:
+        self.sel.register(fd, selectors.EVENT_READ, callback)
+
+    def remove_reader(self, fd: int) -> None:
+        try:
+            self.sel.unregister(fd)
+        except (KeyError, ValueError):
+            pass
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> list:
+        """Ruft callback nach 'delay' Sekunden auf; liefert ein Handle für cancel()."""
+        self.seq += 1
+        timer = [time.monotonic() + max(0.0, delay), self.seq, callback, True]
+        heapq.heappush(self.timers, timer)
+        return timer
+
+    @staticmethod
+    def cancel(timer: Optional[list]) -> None:
+        if timer is not None:
+            timer[3] = False
+
+    def add_signal(self, signum: int, callback: Callable[[], None]) -> None:
+        """Callback nach Eintreffen des Signals im Schleifen-Kontext (nicht im Handler)."""
+        if not self.signal_callbacks:
+            signal.set_wakeup_fd(self.wake_w, warn_on_full_buffer=False)
+        self.signal_callbacks[signum] = callback
+
+    def call_soon_threadsafe(self, callback: Callable[[], None]) -> None:
+        """Callback aus einem anderen Thread im Schleifen-Kontext ausführen lassen."""
+        self.pending.append(callback)
+        self.wakeup()
+
+    def wakeup(self) -> None:
+        try:
+            os.write(self.wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _drain_wakeup(self) -> None:
+        try:
+            data = os.read(self.wake_r, 512)
+        except BlockingIOError:
+            return
+        for signum in set(data):
+            callback = self.signal_callbacks.get(signum)
+            if callback is not None:
+                callback()
+        while self.pending:
+            self.pending.popleft()()
+
+    def run_once(self) -> None:
+        timers = self.timers
+        while timers and not timers[0][3]:
+            heapq.heappop(timers)
+        timeout = max(0.0, timers[0][0] - time.monotonic()) if timers else None
+        if self.on_idle is not None:
+            t0 = time.perf_counter_ns()
+            try:
+                events = self.sel.select(timeout)
+            finally:
+                self.on_idle(time.perf_counter_ns() - t0)  # auch bei Ctrl+C während des Wartens
+        else:
+            events = self.sel.select(timeout)
+        for key, _ in events:
+            key.data()
+        now = time.monotonic()
+        while timers and timers[0][0] <= now:
+            timer = heapq.heappop(timers)
+            if timer[3]:
+                timer[3] = False
+                timer[2]()
+
+    def run(self) -> None:
+        self.running = True
+        while self.running:
+            self.run_once()
+
+    def stop(self) -> None:
+        self.running = False
+
+    def close(self) -> None:
+        if self.signal_callbacks:
+            signal.set_wakeup_fd(-1)
+        self.sel.close()
+        os.close(self.wake_r)
+        os.close(self.wake_w)
+
 def main():
     global is_pipe_mode
 
@@ -1408,7 +4229,7 @@ def main():
         # Im Pipe-Modus wird sys.stdin für die piped Daten verwendet und darf NICHT
         # für Tastatureingaben gelesen werden, da sonst die 'a' Taste in den piped
         # Daten als Tastatureingabe interpretiert wird und den Alt-Modus aktiviert.
-        is_pipe_mode = not sys.stdin.isatty() and not args.cmd
+        is_pipe_mode = not sys.stdin.isatty() and not args.cmd and not args.follow
 
         # ========================================================================
         # TASTATURBEHANDLUNG SETUP
@@ -1463,12 +4284,38 @@ def main():
         aux_sep = unescape(args.aux_sep)
         flags = re.IGNORECASE if args.ignorecase else 0
 
-        patterns = load_patterns(args.patterns, fs, flags)
+        patterns = load_patterns(args.patterns, fs, flags, bytes_rx=args.bytes or bool(args.file))
         if not patterns:
             sys.stderr.write("[ERROR] Keine gültigen Patterns geladen.\n")
             sys.exit(2)
+        distinct = (hll_precision(args.distinct_error), args.distinct_of == "ref") if args.distinct else None
+        if distinct is not None:
+            enable_distinct(patterns, *distinct)
+
+        if args.file:
+            # Einmaliger Scan ohne Ereignisschleife: Ergebnis ausgeben, Durchsatz melden, fertig
+            t_scan = time.perf_counter()
+            try:
+                n_lines, n_bytes = scan_file(args.file, patterns, args.strip_punct, cg_sep)
+            except OSError as e:
+                sys.stderr.write(f"[ERROR] --file '{args.file}': {e}\n")
+                sys.exit(2)
+            t_scan = time.perf_counter() - t_scan
+            if args.json:
+                JsonEmitter(patterns, args.json_words).emit(n_lines)
+            else:
+                view = render_top_view(patterns, sep, args.color) if args.top_view else render_plain_view(patterns, sep)
+                sys.stdout.write(view)
+                sys.stdout.flush()
+            if not args.no_warn:
+                gbps = n_bytes / t_scan / 1e9 if t_scan > 0 else 0.0
+                sys.stderr.write(f"[INFO] {n_lines} Zeilen, {n_bytes / 1048576:.1f}MB in {t_scan:.2f}s "
+                                 f"({gbps:.3f} GB/s, {format_rate(n_lines / t_scan if t_scan > 0 else 0)} Zeilen/s)\n")
+            sys.exit(0)
 
         alt_mode = args.alt_view  # Start im gewünschten Modus (Normal oder Alt)
+        top_view = args.top_view  # Top-K-Ansicht (Taste 't'), hat Vorrang vor Normal/Alt
+        host_view = args.host_view  # Host-Ansicht (Taste 'h', --hosts), hat Vorrang vor allen anderen
         current_interval = args.interval if args.interval else 0  # Aktuelles Intervall
 
         # Cache für die letzten verarbeiteten Daten
@@ -1547,14 +4394,35 @@ def main():
         # ========================================================================
         content_start_line = 3  # Zeile wo der Content im color-mode beginnt
 
+        # --profile: Stufenzeiten pro Frame (Statuszeile unter dem Header, Summary beim Beenden)
+        profiler = None
+        if args.profile:
+            try:
+                profiler = StageProfiler(args.profile_ndjson)
+            except OSError as e:
+                sys.stderr.write(f"[ERROR] --profile-ndjson: {e}\n")
+                sys.exit(2)
+            profiler.wrap_transforms(patterns)
+            content_start_line += 1  # Profil-Statuszeile unter dem Header
+        if args.pattern_cost:
+            content_start_line += 1  # Statuszeile mit den langsamsten Patterns
+
+        # Differenz-Renderer für --clear; Terminalgröße wird bis SIGWINCH gecacht
+        screen = ScreenRenderer()
+        if args.clear:
+            install_winch_handler()
+
         def get_legend_line(patterns: List[PatternRec], use_color: bool = False) -> str:
-            """Erstellt die Legende-Zeile basierend auf den gefundenen Backreferences"""
+            """Erstellt die Legende-Zeile basierend auf den gefundenen Backreferences.
+               Die Sortierung pflegt ingest_lines() inkrementell (pat.refs_sorted); die fertige
+               Zeile wird nur neu gebaut, wenn sich found_refs eines Patterns geändert hat.
+            """
+            cache_key = (use_color, id(patterns), tuple(pat.refs_version for pat in patterns))
+            if getattr(get_legend_line, "cache_key", None) == cache_key:
+                return get_legend_line.cache_value
             legend_items = []
             for pat in patterns:
-                if pat.found_refs:
-                    # Sortiere die gefundenen Backreferences für konsistente Anzeige
-                    sorted_refs = sorted(pat.found_refs)
-                    legend_items.extend(sorted_refs)
+                legend_items.extend(pat.refs_sorted)
 
             # Entferne Duplikate und behalte die Reihenfolge bei
             seen = set()
@@ -1565,9 +4433,8 @@ def main():
                     unique_items.append(item)
 
             if not unique_items:
-                return ""
-
-            if use_color:
+                legend = ""
+            elif use_color:
                 # ========================================================================
                 # FARBIGE LEGENDE-IMPLEMENTIERUNG
                 # ========================================================================
@@ -1579,9 +4446,12 @@ def main():
                     # Verwende die gleiche Farblogik wie im Content
                     colored_item = _color_chip_key(item, item)  # item als key für konsistente Farben
                     colored_items.append(colored_item)
-                return " ".join(colored_items)
+                legend = " ".join(colored_items)
             else:
-                return " ".join(unique_items)
+                legend = " ".join(unique_items)
+            get_legend_line.cache_key = cache_key
+            get_legend_line.cache_value = legend
+            return legend
 
         # ========================================================================
         # COLOR-DEBUG-MODUS (TASTE 'C') - FARBKOMBINATIONEN-DEBUG
@@ -1612,11 +4482,15 @@ def main():
                 # Bestimme den Modus für die Header-Anzeige
                 if args.iterative is not None:
                     left = f"Every {current_interval:.1f}s (iterative): {args.cmd}"
+                elif fleet is not None:
+                    left = f"Fleet ({len(fleet.hosts)} Hosts): {args.cmd}"
                 elif args.cmd:
                     if current_interval > 0:
                         left = f"Every {current_interval:.1f}s (continuous): {args.cmd}"
                     else:
                         left = f"Continuous: {args.cmd}"
+                elif args.follow:
+                    left = "Follow: " + " ".join(args.follow)
                 elif is_pipe_mode:
                     left = "STDIN"
                 else:
@@ -1670,6 +4544,7 @@ def main():
                 header_frame = "\x1b[H" + header
                 sys.stdout.write(header_frame)
                 sys.stdout.flush()
+                screen.invalidate_rows(0)  # Header wurde am Renderer vorbei geschrieben
 
         def handle_mode_switch():
             """Gemeinsame Funktion für Modus-Wechsel (Taste 'a') - ersetzt alle 3 Code-Pfade"""
@@ -1686,8 +4561,8 @@ def main():
             # Sofortige Status-Anzeige in der Header-Zeile
             show_calculation_status(not alt_mode)
 
-            # Künstliche Verzögerung für sichtbares "[...]"
-            time.sleep(0.1)
+            # Kein künstliches Warten mehr: "[...]" ist bereits geflusht, die neue Ansicht
+            # rendert die Ereignisschleife direkt im Anschluss (handle_key → frame_now).
 
             # Berechnungszeit messen
             calc_start = time.perf_counter()
@@ -1713,17 +4588,22 @@ def main():
                 # Bestimme den Modus für die Header-Anzeige
                 if args.iterative is not None:
                     left = f"Every {current_interval:.1f}s (iterative): {args.cmd}"
+                elif fleet is not None:
+                    left = f"Fleet ({len(fleet.hosts)} Hosts): {args.cmd}"
                 elif args.cmd:
                     if current_interval > 0:
                         left = f"Every {current_interval:.1f}s (continuous): {args.cmd}"
                     else:
                         left = f"Continuous: {args.cmd}"
+                elif args.follow:
+                    left = "Follow: " + " ".join(args.follow)
                 elif is_pipe_mode:
                     left = "Pipe-Modus (STDIN)"
                 else:
                     left = "STDIN"
 
-                mode_tag = " [ALT]" if alt_mode else ""
+                mode_tag = (" [HOSTS]" if host_view and fleet is not None
+                            else " [TOP]" if top_view else (" [ALT]" if alt_mode else ""))
                 ts = now_str(args.utc)
                 right_parts = []
                 if args.header or mode_tag:
@@ -1809,6 +4689,8 @@ def main():
                 sys.stdout.flush()
             except (BrokenPipeError, IOError):
                 sys.exit(0)
+            # Bildschirminhalt ist dem Differenz-Renderer jetzt unbekannt
+            screen.invalidate()
 
             # Globale Berechnungszeit setzen (Anti-Flimmern)
             global_calculation_time_ms = calc_time_ms
@@ -1858,26 +4740,31 @@ def main():
             # - Verhindert unnötige Berechnungen und schwarze Bildschirme
             # - Deutlich schnellere Reaktion bei Taste 'a'
             # ========================================================================
+            prof_mark = profiler.mark("truncate") if profiler is not None else None
             if target_alt_mode:
                 # Alt-Ansicht berechnen
-                content = render_alt_view(patterns, sep, use_color=args.color, no_warn=args.no_warn, content_start_line=content_start_line)
+                content = render_alt_view(patterns, sep, use_color=args.color, no_warn=args.no_warn, content_start_line=content_start_line,
+                                          rates_now=rates_now(), profiler=profiler)
             else:
                 # Normal-Ansicht berechnen
-                content = render_normal_view(patterns, sep, use_color=args.color, color_debug_mode=color_debug_mode, content_start_line=content_start_line)
+                content = render_normal_view(patterns, sep, use_color=args.color, color_debug_mode=color_debug_mode, content_start_line=content_start_line,
+                                             rates_now=rates_now(), profiler=profiler)
 
             # Zwischensumme unserer Laufzeit bis hier
             t_proc = time.perf_counter() - t_start
+            if profiler is not None:
+                profiler.add_exclusive("render", "truncate", prof_mark)
 
-            # --- 2) Aux-Kommando (wird NICHT mitgezählt) ---
+            # --- 2) Aux-Block (Hintergrund-Worker, letzte fertige Ausgabe) ---
             frame_body = content
-            if args.auxcmd:
-                aux_to = args.aux_timeout if args.aux_timeout is not None else args.timeout
-                aux_out, _ = run_cmd(args.auxcmd, args.shell, aux_to, args.no_warn)
+            if aux_worker is not None:
                 t_after_aux = time.perf_counter()
-                sep_line = aux_sep + ("" if aux_sep.endswith("\n") else "\n")
-                aux_block = sep_line + (aux_out if aux_out.endswith("\n") else aux_out + "\n")
+                aux_block = build_aux_block()
                 frame_body = (aux_block + content) if args.aux_before else (content + aux_block)
-                t_proc += (time.perf_counter() - t_after_aux)  # nur das Zusammenbauen addieren
+                t_aux = time.perf_counter() - t_after_aux
+                t_proc += t_aux  # nur das Zusammenbauen addieren
+                if profiler is not None:
+                    profiler.add("aux", int(t_aux * 1e9))
 
             # ========================================================================
             # DURCHSCHNITTLICHE VERARBEITUNGSZEIT BERECHNEN (ANTI-FLIMMERN)
@@ -1915,86 +4802,61 @@ def main():
             # Nur den Content zurückgeben, ohne Header und Screen-Clear
             return frame_body
 
-        def one_frame():
-            nonlocal alt_mode, current_interval, last_text, last_cmd_time, last_proc_time, global_calculation_time_ms, color_debug_mode, content_start_line, use_cache, average_processing_times, max_processing_samples, average_processing_time_ms
-
-            # --- 0) Hauptkommando (nicht in Laufzeitmessung enthalten) ---
-            cmd_time = 0.0
-            try:
-                if args.cmd:
-                    if args.iterative is not None:
-                        # Iterativer Modus: Kommando wird jedes Mal neu ausgeführt
-                        text, cmd_time = run_cmd(args.cmd, args.shell, args.timeout, args.no_warn)
-                    else:
-                        # Kontinuierlicher Modus: Kommando läuft dauerhaft
-                        # Für kontinuierliche Ausgabe: Verwende Popen statt run_cmd
-                        if not hasattr(one_frame, 'cmd_process'):
-                            # Erstelle Prozess beim ersten Aufruf
-                            one_frame.cmd_process = subprocess.Popen(
-                                [args.shell, "-c", args.cmd],
-                                stdout=subprocess.PIPE,
-                                stderr=(subprocess.DEVNULL if args.no_warn else subprocess.PIPE),
-                                text=True,
-                                bufsize=1,  # Line-buffered
-                            )
-                            one_frame.cmd_output = []
-                            one_frame.cmd_start_time = time.perf_counter()
-
-                        # Lese verfügbare Output-Zeilen
-                        text = ""
-                        try:
-                            # Lese alle verfügbaren Zeilen sofort
-                            while select.select([one_frame.cmd_process.stdout], [], [], 0.0)[0]:
-                                line = one_frame.cmd_process.stdout.readline()
-                                if line:
-                                    one_frame.cmd_output.append(line)
-                                    text += line
-                                    # Begrenze die Anzahl der Zeilen um Speicher zu sparen
-                                    if len(one_frame.cmd_output) > 1000:
-                                        one_frame.cmd_output = one_frame.cmd_output[-500:]
-                                else:
-                                    break
-                        except (BrokenPipeError, IOError):
-                            pass
-
-                        # Prüfe ob Prozess noch läuft
-                        if one_frame.cmd_process.poll() is not None:
-                            # Prozess beendet, verwende gesammelten Output
-                            remaining_output, _ = one_frame.cmd_process.communicate()
-                            if remaining_output:
-                                text += remaining_output
-                            cmd_time = time.perf_counter() - one_frame.cmd_start_time
-                            # Reset für nächste Ausführung
-                            delattr(one_frame, 'cmd_process')
-                        else:
-                            # Prozess läuft noch
-                            cmd_time = time.perf_counter() - one_frame.cmd_start_time
-                else:
-                    # STDIN-Pipe-Modus: Lese kontinuierlich
-                    text = ""
-                    try:
-                        # Lese alle verfügbaren Zeilen sofort ohne auf EOF zu warten
-                        if select.select([sys.stdin], [], [], 0.0)[0]:  # Non-blocking check
-                            for line in sys.stdin:
-                                # Filtere Kommentarzeilen und leere Zeilen wenn --no-warn aktiv
-                                if args.no_warn and (line.startswith('#') or line.strip() == ''):
-                                    continue
-                                text += line
-                                # Wenn wir genug Zeilen haben, brechen wir ab
-                                if text.count('\n') >= 20:  # Max 20 Zeilen pro Durchlauf
-                                    break
-                    except (BrokenPipeError, IOError):
-                        # Versorgender Prozess beendet
-                        if not args.no_warn:
-                            sys.stderr.write("[INFO] Versorgender Prozess beendet.\n")
-                        # text bleibt leer oder enthält bereits gelesene Zeilen
-            except KeyboardInterrupt:
-                raise
-            except Exception as e:
-                if not args.no_warn:
-                    sys.stderr.write(f"[ERROR] Fehler beim Lesen der Eingabe: {e}\n")
-                text = ""
-
+        # Zustand der Eingabequellen (wird von der Ereignisschleife gepflegt)
+        cont_process = None     # Kontinuierlicher Modus: dauerhaft laufendes Kommando
+        cont_start = 0.0        # Startzeitpunkt (perf_counter) des laufenden Kommandos
+        pending_proc_time = 0.0  # Auswertungszeit seit dem letzten Frame (zählt zu [Xms])
+        meter = IngestMeter()    # Eingangs- und nachhaltige Rate (Status-Bar, Exit-Summary)
+        # --workers N: Matching im Prozess-Pool (Pool startet seine Prozesse erst bei Bedarf)
+        matcher = None
+        if args.workers > 1:
+            matcher = ShardedMatcher(args.workers, patterns, flags, args.strip_punct, cg_sep,
+                                     distinct=distinct)
+
+        # Aux-Kommando läuft im Hintergrund-Worker; der Frame zeigt die letzte fertige Ausgabe
+        aux_worker = None
+        if args.auxcmd:
+            aux_interval = args.aux_interval or args.iterative or args.interval or 5.0
+            aux_timeout = args.aux_timeout if args.aux_timeout is not None else args.timeout
+            aux_worker = AuxWorker(args.auxcmd, args.shell, aux_interval, aux_timeout, args.no_warn)
+
+        def build_aux_block() -> str:
+            """Trennerzeile mit Alter der Aux-Ausgabe ("### [aux vor 3s]") + letzte Ausgabe."""
+            aux_out, age = aux_worker.snapshot()
+            sep_text = aux_sep[:-1] if aux_sep.endswith("\n") else aux_sep
+            state = "aux läuft..." if aux_out is None else f"aux vor {int(age)}s"
+            sep_line = " ".join(t for t in (sep_text, f"[{state}]") if t) + "\n"
+            if not aux_out:
+                return sep_line
+            return sep_line + (aux_out if aux_out.endswith("\n") else aux_out + "\n")
+
+        # Gleitende Raten je Pattern (10s/1m/5m + Sparkline); im iterativen Modus ersetzt jeder
+        # Lauf die Ausgabe, dort gibt es keinen Strom, dessen Rate sich messen ließe
+        show_rates = not args.no_rates and args.iterative is None and not args.json
+        # --json: NDJSON-Datensätze statt Frames (kein Rendering)
+        json_out = JsonEmitter(patterns, args.json_words) if args.json else None
+
+        # --state: Snapshots der Aggregate; --resume übernimmt den letzten vor dem ersten Frame
+        state_store = StateStore(args.state, args.no_warn) if args.state else None
+        if state_store is not None and args.resume:
+            restored, dropped, age = state_store.load(patterns)
+            if json_out is not None:
+                json_out.last_count = [pat.count for pat in patterns]  # "delta" zählt erst ab jetzt
+            if not args.no_warn and (restored or dropped):
+                sys.stderr.write(f"[INFO] --resume: {restored} Patterns aus '{args.state}' übernommen "
+                                 f"(Stand vor {age:.0f}s)"
+                                 + (f", {dropped} verworfen (Zeile geändert oder entfernt)" if dropped else "")
+                                 + ".\n")
+
+        def rates_now() -> Optional[float]:
+            return time.monotonic() if show_rates else None
+
+        budget_ns = int(args.pattern_budget * 1e6) if args.pattern_budget else 0
+
+        def feed_text(text) -> None:
+            """Wertet neu eingetroffene Eingabe sofort aus (aufgerufen von der Ereignisschleife).
+               text ist str oder mit --bytes bytes (rohe, zeilenbündige Blöcke)."""
+            nonlocal pending_proc_time
             # ========================================================================
             # AKTUELLE DATEN FÜR HINTERGRUND-BERECHNUNG SPEICHERN
             # ========================================================================
@@ -2015,93 +4877,83 @@ def main():
             if use_cache and text.strip():  # Nur speichern wenn Cache aktiviert und Daten vorhanden sind
                 one_frame.current_text = text
 
-            # --- 1) Unsere Verarbeitungszeit starten ---
             t_start = time.perf_counter()
 
             # ========================================================================
-            # PATTERN-DATEN NICHT ZURÜCKSETZEN IM COLOR-MODUS
+            # INKREMENTELLE AGGREGATION (COLOR- UND NOCOLOR-MODUS IDENTISCH)
             # ========================================================================
-            # WICHTIG: Im Color-Modus verwenden wir die Rendering-Funktionen, die die
-            # Pattern-Daten direkt verwenden. Daher dürfen wir die Pattern-Daten NICHT
-            # zurücksetzen, da sonst die Rendering-Funktionen leere Daten verwenden.
-            # Das verhindert das Problem mit 0-Werten nach dem Drücken von 'a'.
+            # WICHTIG: Zählerstände hängen nur von den Daten ab, nicht vom Code-Pfad.
+            # - Kontinuierlicher CMD-Modus und STDIN-Pipe-Modus: Es werden nur die neu
+            #   eingetroffenen Zeilen ausgewertet; count/head/alts/found_refs wachsen in place.
+            #   Die Kosten sind proportional zum neuen Input, nicht zur Historie.
+            # - Iterativer Modus: Jeder Lauf ersetzt die Ausgabe → Reset, dann Auswertung.
+            #
+            # PATTERN-DATEN ZURÜCKSETZEN (NUR WENN CACHE AKTIVIERT)
+            # Mit use_cache = False werden die Pattern-Daten nicht zurückgesetzt,
+            # um das Problem mit 0-Werten beim Modus-Wechsel zu vermeiden.
+            # NIEMALS ENTFERNEN ODER ÄNDERN, OHNE DAS PROBLEM ZU VERSTEHEEN!
             # ========================================================================
-            if args.color:
-                # ========================================================================
-                # COLOR-MODUS: PATTERN-DATEN ZURÜCKSETZEN UND VERARBEITEN
-                # ========================================================================
-                # WICHTIG: Im Color-Modus müssen wir die Pattern-Daten zurücksetzen,
-                # aber dann direkt verarbeiten, ohne process_text() zu verwenden.
-                # Das verhindert das Problem mit 0-Werten nach dem Drücken von 'a'.
-                # ========================================================================
-                # ========================================================================
-                # PATTERN-DATEN ZURÜCKSETZEN (NUR WENN CACHE AKTIVIERT)
-                # ========================================================================
-                # WICHTIG: Pattern-Daten werden nur zurückgesetzt wenn use_cache = True.
-                # Mit use_cache = False werden die Pattern-Daten nicht zurückgesetzt,
-                # um das Problem mit 0-Werten beim Modus-Wechsel zu vermeiden.
-                #
-                # PROBLEM-LÖSUNG:
-                # - Ohne diese Bedingung: Pattern-Daten werden immer zurückgesetzt, 0-Werte
-                # - Mit dieser Bedingung: Pattern-Daten werden nur zurückgesetzt wenn Cache aktiviert
-                #
-                # NIEMALS ENTFERNEN ODER ÄNDERN, OHNE DAS PROBLEM ZU VERSTEHEEN!
-                # ========================================================================
-                if use_cache:
-                    # Reset Pattern-Daten (wie in process_text())
-                    for pat in patterns:
-                        pat.count = 0
-                        pat.head.clear()
-                        pat.head_keys.clear()
-                        pat.head_count = 0
-                        pat.alts.clear()
-                        pat.orig_words.clear()  # Reset ursprüngliche Wörter
-                        pat.found_refs.clear()  # Reset gefundene Backreferences
+            if use_cache or args.iterative is not None:
+                reset_patterns(patterns)
+            prof_mark = profiler.mark("transform") if profiler is not None else None
+            if isinstance(text, bytes):
+                n_lines = ingest_buffer(text, 0, len(text), patterns, args.strip_punct, cg_sep)
+            elif matcher is not None:
+                matcher.ingest(text, patterns)
+                n_lines = text.count("\n") + (1 if text and not text.endswith("\n") else 0)
+            elif args.pattern_cost:
+                lines = text.splitlines()
+                for pat in ingest_lines_costed(lines, patterns, args.strip_punct, cg_sep, budget_ns):
+                    if not args.no_warn and not args.clear:  # mit --clear steht es in der Statuszeile
+                        sys.stderr.write(f"[WARN] Pattern '{pat.pid}' abgeschaltet: Zeitbudget "
+                                         f"{args.pattern_budget:g}ms pro Eingabeblock überschritten.\n")
+                n_lines = len(lines)
+            else:
+                lines = text.splitlines()
+                ingest_lines(lines, patterns, args.strip_punct, cg_sep)
+                n_lines = len(lines)
+            if profiler is not None:
+                profiler.add_exclusive("match", "transform", prof_mark)
+            if show_rates:
+                record_rates(patterns, time.monotonic())
+            seconds = time.perf_counter() - t_start
+            pending_proc_time += seconds
+            meter.add(lines=n_lines, seconds=seconds)
 
-                # ========================================================================
-                # PATTERN-DATEN IMMER VERARBEITEN (FÜR ANZEIGE ERFORDERLICH)
-                # ========================================================================
-                # WICHTIG: Pattern-Daten müssen IMMER verarbeitet werden, um überhaupt
-                # etwas anzuzeigen. Das Problem mit 0-Werten wird durch die Cache-Deaktivierung gelöst.
-                #
-                # PROBLEM-LÖSUNG:
-                # - Ohne Verarbeitung: Schwarzer Bildschirm, nichts wird angezeigt
-                # - Mit Verarbeitung: Normale Anzeige, aber keine 0-Werte beim Modus-Wechsel
-                #
-                # NIEMALS ENTFERNEN ODER ÄNDERN, OHNE DAS PROBLEM ZU VERSTEHEEN!
-                # ========================================================================
-                # Verarbeite die Daten direkt
-                for line in text.splitlines():
-                    for pat in patterns:
-                        if pat.line_re.search(line):
-                            pat.count += 1
-                            w, m = extract_word_and_match(line, pat, cg_sep)
-                            if args.strip_punct and w: w = strip_punct(w)
-                            # Speichere ursprüngliches Wort für Legende
-                            pat.orig_words.append(w)
-                            # Speichere die evaluierte \1 Backreference für die Legende
-                            if m and m.groups() and len(m.groups()) >= 1:
-                                pat.found_refs.add(m.group(1))  # \1 Backreference
-                            # Transformiertes Alternativwort (Spalte 5; darf Backrefs als Quelle nutzen)
-                            alt = apply_pipeline(w, pat.transforms, m) if pat.transforms else w
-                            pat.alts.append(alt)
-                            # Normal-Head
-                            if w:
-                                pat.head.append(w)
-                                pat.head_keys.append(alt if alt else w)  # Farb-Key: Altwort dominiert
-                                pat.head_count += 1
-                # Im Color-Modus wird normal_out_plain nicht benötigt, aber für Konsistenz definieren
-                normal_out_plain = ""
+        def one_frame():
+            nonlocal alt_mode, current_interval, last_text, last_cmd_time, last_proc_time, global_calculation_time_ms, color_debug_mode, content_start_line, use_cache, average_processing_times, max_processing_samples, average_processing_time_ms, pending_proc_time
+
+            # --- 0) Eingabe ---
+            # Kommando-Output und STDIN liest die Ereignisschleife, sobald Daten anliegen,
+            # und wertet sie sofort über feed_text() aus; one_frame() rendert nur noch.
+            if cont_process is not None:
+                cmd_time = time.perf_counter() - cont_start
             else:
-                # Im NoColor-Modus: Pattern-Daten zurücksetzen und verarbeiten
-                normal_out_plain = process_text(text, patterns, sep, args.strip_punct, cg_sep)
+                cmd_time = last_cmd_time
+
+            if json_out is not None:
+                # Headless (--json): ein NDJSON-Datensatz statt Rendering und Header
+                pending_proc_time = 0.0
+                t_write = time.perf_counter_ns()
+                try:
+                    json_out.emit(meter.lines)
+                except (BrokenPipeError, IOError):
+                    sys.exit(0)
+                if profiler is not None:
+                    profiler.add("write", time.perf_counter_ns() - t_write)
+                    profiler.end_frame()
+                return
+
+            # --- 1) Unsere Verarbeitungszeit starten (inkl. Auswertung seit dem letzten Frame) ---
+            t_start = time.perf_counter() - pending_proc_time
+            pending_proc_time = 0.0
 
             # CODE-PFAD DOKUMENTATION:
             # DIESER CODE-PFAD wird verwendet für:
             # - Kontinuierlicher CMD-Modus (--cmd mit -t > 0)
             # - Iterativer Modus (--iterative)
             # - COLOR-Modus (--color) verwendet render_normal_view/render_alt_view
-            # - NOCOLOR-Modus (ohne --color) verwendet process_text (Zeile 1141 oben)
+            # - NOCOLOR-Modus (ohne --color) verwendet render_plain_view
 
             # ========================================================================
             # OPTIMIERTE ANSICHTS-BERECHNUNG (COLOR-MODUS PERFORMANCE)
@@ -2126,31 +4978,42 @@ def main():
             #
             # NIEMALS ENTFERNEN ODER ÄNDERN, OHNE DAS PROBLEM ZU VERSTEHEEN!
             # ========================================================================
-            if alt_mode:
+            prof_mark = profiler.mark("truncate") if profiler is not None else None
+            if host_view and fleet is not None:
+                # Host-Ansicht: Zustand, Fan-out-Latenz und Treffer je Host
+                content = render_host_view(fleet, patterns)
+            elif top_view:
+                # Top-K-Ansicht: häufigste Wörter je Pattern aus dem Sketch
+                content = render_top_view(patterns, sep, use_color=args.color, rates_now=rates_now())
+            elif alt_mode:
                 # Alt-Ansicht berechnen
-                content = render_alt_view(patterns, sep, use_color=args.color, no_warn=args.no_warn, content_start_line=content_start_line)
+                content = render_alt_view(patterns, sep, use_color=args.color, no_warn=args.no_warn, content_start_line=content_start_line,
+                                          rates_now=rates_now(), profiler=profiler)
             else:
                 # Normal-Ansicht berechnen
                 if args.color:
                     # Color-Modus: Verwende render_normal_view
-                    content = render_normal_view(patterns, sep, use_color=args.color, color_debug_mode=color_debug_mode, content_start_line=content_start_line)
+                    content = render_normal_view(patterns, sep, use_color=args.color, color_debug_mode=color_debug_mode, content_start_line=content_start_line,
+                                             rates_now=rates_now(), profiler=profiler)
                 else:
-                    # NoColor-Modus: Verwende die bereits verarbeiteten Daten
-                    content = normal_out_plain
+                    # NoColor-Modus: Plain-Ansicht aus den aggregierten Daten
+                    content = render_plain_view(patterns, sep, rates_now=rates_now(), profiler=profiler)
 
             # Zwischensumme unserer Laufzeit bis hier
             t_proc = time.perf_counter() - t_start
+            if profiler is not None:
+                profiler.add_exclusive("render", "truncate", prof_mark)
 
-            # --- 2) Aux-Kommando (wird NICHT mitgezählt) ---
+            # --- 2) Aux-Block (Hintergrund-Worker, letzte fertige Ausgabe) ---
             frame_body = content
-            if args.auxcmd:
-                aux_to = args.aux_timeout if args.aux_timeout is not None else args.timeout
-                aux_out, _ = run_cmd(args.auxcmd, args.shell, aux_to, args.no_warn)
+            if aux_worker is not None:
                 t_after_aux = time.perf_counter()
-                sep_line = aux_sep + ("" if aux_sep.endswith("\n") else "\n")
-                aux_block = sep_line + (aux_out if aux_out.endswith("\n") else aux_out + "\n")
+                aux_block = build_aux_block()
                 frame_body = (aux_block + content) if args.aux_before else (content + aux_block)
-                t_proc += (time.perf_counter() - t_after_aux)  # nur das Zusammenbauen addieren
+                t_aux = time.perf_counter() - t_after_aux
+                t_proc += t_aux  # nur das Zusammenbauen addieren
+                if profiler is not None:
+                    profiler.add("aux", int(t_aux * 1e9))
 
             # ========================================================================
             # CACHE MIT VERARBEITETEM CONTENT BEFÜLLEN (KRITISCH!)
@@ -2235,22 +5098,45 @@ def main():
                 # Bestimme den Modus für die Header-Anzeige
                 if args.iterative is not None:
                     left = f"Every {current_interval:.1f}s (iterative): {args.cmd}"
+                elif fleet is not None:
+                    left = f"Fleet ({len(fleet.hosts)} Hosts): {args.cmd}"
                 elif args.cmd:
                     # Wenn --cmd verwendet wird, zeige das Kommando an
                     if current_interval > 0:
                         left = f"Every {current_interval:.1f}s (continuous): {args.cmd}"
                     else:
                         left = f"Continuous: {args.cmd}"
+                elif args.follow:
+                    left = "Follow: " + " ".join(args.follow)
                 elif is_pipe_mode:
                     left = "Pipe-Modus (STDIN)"
                 else:
                     left = "STDIN"
 
-                mode_tag = " [ALT]" if alt_mode else ""
+                mode_tag = (" [HOSTS]" if host_view and fleet is not None
+                            else " [TOP]" if top_view else (" [ALT]" if alt_mode else ""))
                 ts = now_str(args.utc)
                 right_parts = []
                 if args.header or mode_tag:
                     right_parts.append((args.header + mode_tag).strip())
+                if color_debug_mode and args.color:
+                    # Color-Debug-Modus: Trefferquote und Füllstand des Chip-Caches anzeigen
+                    right_parts.append(f"[{_CHIP_CACHE.stats()}]")
+                if args.iterative is None and meter.lines:
+                    # Stream-Modi: Eingangsrate und nachhaltige Rate (Zeilen/s)
+                    right_parts.append(f"[{meter.status()}]")
+                if current_interval <= 0 and args.iterative is None:
+                    # -t 0: zusammengefasste Frames (--max-fps) und ungelesener Rückstand der Eingabe
+                    backlog = input_backlog()
+                    if frames_dropped or backlog:
+                        right_parts.append(f"[≤{1.0 / MIN_FRAME_GAP:g}fps, {format_rate(frames_dropped)} ausgelassen, "
+                                           f"Rückstand {format_bytes(backlog)}]")
+                if fleet is not None:
+                    # Fleet: aktive/wartende/fehlgeschlagene Hosts, Fan-out-Latenz (Median/Max)
+                    right_parts.append(f"[{fleet.status()}]")
+                if reload_status and time.monotonic() < reload_status_until:
+                    # Hot Reload: Ergebnis bzw. Kompilierfehler der Pattern-Datei
+                    right_parts.append(f"[{reload_status}]")
                 # ========================================================================
                 # STATUS-BAR ZEIT- UND SPEICHER-ANZEIGE (ANTI-FLIMMERN-SYSTEM)
                 # ========================================================================
@@ -2289,258 +5175,548 @@ def main():
                 # WICHTIG: Die Legende wird in Zeile 2 positioniert (nach dem Header).
                 # Der Content beginnt dann auf content_start_line.
                 # ========================================================================
-                legend_line = ""
-                if args.color:
-                    legend_text = get_legend_line(patterns, use_color=args.color)
-                    if legend_text:
-                        legend_line = f"\x1b[2;1H{legend_text}\n"  # Legende in Zeile 2
+                legend_text = get_legend_line(patterns, use_color=args.color) if args.color else ""
 
-                # Beim ersten Mal: Komplettes Löschen, danach nur Cursor-Positionierung
-                if not hasattr(one_frame, 'first_clear'):
-                    # ========================================================================
-                    # CONTENT-POSITIONIERUNG MIT GLOBALER CONTENT_START_LINE
-                    # ========================================================================
-                    # WICHTIG: Der Content beginnt auf der durch content_start_line definierten Zeile.
-                    # Das verhindert Überschreibung der Legende und stellt korrekte Positionierung sicher.
-                    # ========================================================================
-                    content_positioning = f"\x1b[{content_start_line};1H"  # Cursor auf content_start_line setzen
-                    frame = "\x1b[H\x1b[2J" + header + "\n" + legend_line + content_positioning + frame_body
-                    one_frame.first_clear = True
-                else:
-                    # ========================================================================
-                    # CONTENT-POSITIONIERUNG MIT GLOBALER CONTENT_START_LINE (OHNE CLEAR)
-                    # ========================================================================
-                    # WICHTIG: Der Content beginnt auf der durch content_start_line definierten Zeile.
-                    # Das verhindert Überschreibung der Legende und stellt korrekte Positionierung sicher.
-                    # ========================================================================
-                    content_positioning = f"\x1b[{content_start_line};1H"  # Cursor auf content_start_line setzen
-                    frame = "\x1b[H" + header + "\n" + legend_line + content_positioning + frame_body
+                # ========================================================================
+                # DIFFERENZ-RENDERER STATT KOMPLETTEM NEUZEICHNEN
+                # ========================================================================
+                # WICHTIG: Der Bildschirm wird als Zeilenliste an screen übergeben.
+                # Zeile 1: Header, Zeile 2: Legende, ab content_start_line: Content.
+                # Der erste Frame (und jeder nach Größenänderung/invalidate()) löscht den
+                # Screen komplett, danach werden nur geänderte Zeilen(-enden) geschrieben.
+                # ========================================================================
+                screen_rows = [header]
+                if profiler is not None:
+                    screen_rows.append(profiler.status())
+                if args.pattern_cost:
+                    screen_rows.append(format_cost_status(patterns))
+                screen_rows.append(legend_text)
+                screen_rows.extend([""] * (content_start_line - 1 - len(screen_rows)))
+                screen_rows.extend(frame_body.splitlines())
 
             # Aktualisiere die letzten Zeiten für update_display
             last_cmd_time = cmd_time
             last_proc_time = ms
 
+            t_write = time.perf_counter_ns()
             try:
-                sys.stdout.write(frame)
-                sys.stdout.flush()
+                if args.clear:
+                    screen.draw(screen_rows)
+                else:
+                    sys.stdout.write(frame)
+                    sys.stdout.flush()
             except (BrokenPipeError, IOError):
                 # Handle broken pipe gracefully
                 sys.exit(0)
+            if profiler is not None:
+                profiler.add("write", time.perf_counter_ns() - t_write)
+                profiler.end_frame()
 
-        # SOFORT erste Ausführung beim Start
-        one_frame()
-
-        # Zeige Hinweis für Pipe-Modus
-        if is_pipe_mode:
-            sys.stderr.write("[INFO] Pipe-Modus: Tastatursteuerung nicht verfügbar.\n")
-            sys.stderr.write("[INFO] Für Tastatursteuerung verwenden Sie: --cmd 'generator | patwatch'\n")
-            sys.stderr.write("[INFO] Zum Beenden: Ctrl+C oder warten Sie bis der Generator beendet ist\n")
+        # ========================================================================
+        # EREIGNISSCHLEIFE FÜR ALLE MODI (selectors)
+        # ========================================================================
+        # WICHTIG: Eine einzige Schleife multiplexed Kommando-Output, STDIN, Tastatur
+        # und Timer. Es gibt kein 0.1s-Polling mehr: select() schläft bis zum nächsten
+        # Ereignis, Tasten und neue Daten werden sofort behandelt.
+        #
+        # Modi:
+        # - Iterativ (--iterative X): Das Kommando läuft als CommandRun in der Schleife;
+        #   nach dem Ende Auswertung + Frame, der nächste Lauf startet X Sekunden später.
+        # - Kontinuierlich (--cmd, -t X > 0): Das Kommando läuft dauerhaft, Zeilen werden
+        #   beim Eintreffen ausgewertet, Frame alle X Sekunden. Ein beendetes Kommando
+        #   wird beim nächsten Tick neu gestartet.
+        # - STDIN/Pipe: Zeilen werden beim Eintreffen ausgewertet; mit -t X Frame alle
+        #   X Sekunden, mit -t 0 direkt nach neuen Daten (höchstens alle MIN_FRAME_GAP s, --max-fps).
+        #
+        # Tasten-Funktionalität (in allen Modi identisch):
+        # - 'a': Wechsel zwischen Normal- und Alt-Ansicht
+        # - 'c': Color-Debug-Modus (nur mit --color)
+        # - 'q': Programm beenden
+        # - '+'/'-': Intervall um 5 Sekunden erhöhen/verringern (Minimum 1s, nur mit Intervall)
+        # ========================================================================
+        MIN_FRAME_GAP = 1.0 / (args.max_fps or 10.0)  # Mindestabstand datengetriebener Frames ohne Intervall
+        IDLE_REFRESH = 1.0    # Uhr im Header ohne Intervall (nur --clear)
+        RELOAD_CHECK = 1.0    # Takt der mtime-Prüfung der Pattern-Datei (Hot Reload)
+        RELOAD_NOTE = 10.0    # so lange steht eine erfolgreiche Neuladen-Meldung in der Status-Bar
+
+        loop = EventLoop()
+        if profiler is not None:
+            loop.on_idle = profiler.add_wait
+        tick_timer = None     # Nächster Intervall-Tick bzw. nächster iterativer Lauf
+        frame_timer = None    # Ausstehender datengetriebener Frame
+        run_timer = None      # Timeout des laufenden iterativen Kommandos
+        last_frame_at = 0.0
+        frames_dropped = 0    # in einen ausstehenden Frame zusammengefasste Daten-Updates (--max-fps)
+        iter_run = None       # Laufendes Kommando im iterativen Modus
+
+        def frame_now() -> None:
+            nonlocal frame_timer, last_frame_at
+            loop.cancel(frame_timer)
+            frame_timer = None
+            last_frame_at = time.monotonic()
+            one_frame()
+
+        def frame_soon() -> None:
+            """Frame nach neuen Daten; ohne Intervall zusammengefasst auf MIN_FRAME_GAP."""
+            nonlocal frame_timer, frames_dropped
+            if current_interval > 0:
+                return  # Mit Intervall rendert der Tick
+            if frame_timer is not None:
+                frames_dropped += 1  # ungebremst hätte dieses Update einen eigenen Frame bekommen
+                return
+            frame_timer = loop.call_later(last_frame_at + MIN_FRAME_GAP - time.monotonic(), frame_now)
+
+        readers = {}          # fd → LineReader (STDIN bzw. Kommando-Output)
+
+        def input_backlog() -> int:
+            """Bytes, die in den Eingabe-Pipes auf die Auswertung warten (Rückstand in der Status-Bar)."""
+            fds = list(readers) + (list(fleet.by_fd) if fleet is not None else [])
+            return sum(pending_bytes(fd) for fd in fds)
+
+        def read_available_lines(fd: int) -> Tuple[str, bool]:
+            """Leert den lesbaren Deskriptor; liefert (vollständige Zeilen als Text, EOF).
+               Mit --bytes bleiben die Zeilen undekodiert (bytes, für ingest_buffer())."""
+            reader = readers.get(fd)
+            if reader is None:
+                reader = readers[fd] = LineReader(fd)
+            t_read = time.perf_counter()
+            block = reader.read_block()
+            text = block if args.bytes else block.decode("utf-8", "replace")
+            t_read = time.perf_counter() - t_read
+            meter.add(nbytes=len(block), seconds=t_read)
+            if profiler is not None:
+                profiler.add("read", int(t_read * 1e9))
+            if reader.eof:
+                readers.pop(fd).close()
+            return text, reader.eof
+
+        # --- Iterativer Modus ---
+        def start_iteration() -> None:
+            nonlocal iter_run, run_timer
+            if iter_run is not None:
+                return
+            iter_run = CommandRun(args.cmd, args.shell, args.no_warn)
+            for fd in iter_run.fds():
+                loop.add_reader(fd, lambda fd=fd: on_iteration_data(fd))
+            if args.timeout:
+                run_timer = loop.call_later(args.timeout, finish_iteration)
+
+        def on_iteration_data(fd: int) -> None:
+            if profiler is not None:
+                t_read = time.perf_counter_ns()
+                more = iter_run.read(fd)
+                profiler.add("read", time.perf_counter_ns() - t_read)
+            else:
+                more = iter_run.read(fd)
+            if not more:
+                loop.remove_reader(fd)
+                if iter_run.done:
+                    finish_iteration()
+
+        def finish_iteration() -> None:
+            nonlocal iter_run, last_cmd_time, tick_timer
+            run = iter_run
+            iter_run = None
+            loop.cancel(run_timer)
+            for fd in run.fds():
+                loop.remove_reader(fd)
+            if not run.done:
+                run.terminate()  # Timeout
+            text, last_cmd_time = run.finish(decode=not args.bytes)
+            if profiler is not None:
+                ttfb = run.first_byte - run.start if run.first_byte is not None else None
+                profiler.add_run(int(last_cmd_time * 1e9), None if ttfb is None else int(ttfb * 1e9))
+            feed_text(text)
+            frame_now()
+            tick_timer = loop.call_later(current_interval, start_iteration)
+
+        # --- Kontinuierlicher Modus ---
+        def start_continuous() -> None:
+            nonlocal cont_process, cont_start
+            cont_process = subprocess.Popen(
+                [args.shell, "-c", args.cmd],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            cont_start = time.perf_counter()
+            loop.add_reader(cont_process.stdout.fileno(), on_continuous_data)
+
+        def on_continuous_data() -> None:
+            nonlocal cont_process, last_cmd_time
+            fd = cont_process.stdout.fileno()
+            try:
+                text, eof = read_available_lines(fd)
+            except OSError:
+                text, eof = "", True
+            if text:
+                feed_text(text)
+                frame_soon()
+            if eof:
+                # Prozess beendet: Neustart beim nächsten Tick
+                loop.remove_reader(fd)
+                cont_process.stdout.close()
+                cont_process.wait()
+                last_cmd_time = time.perf_counter() - cont_start
+                cont_process = None
+                frame_soon()
+
+        # --- STDIN-Pipe-Modus ---
+        def on_stdin_data() -> bool:
+            """Liest anliegende STDIN-Daten; True am Ende der Eingabe."""
+            try:
+                text, eof = read_available_lines(sys.stdin.fileno())
+            except OSError:
+                # Versorgender Prozess beendet
+                if not args.no_warn:
+                    sys.stderr.write("[INFO] Versorgender Prozess beendet.\n")
+                text, eof = "", True
+            if args.no_warn and text:
+                # Filtere Kommentarzeilen und leere Zeilen wenn --no-warn aktiv
+                # (str bzw. mit --bytes bytes: text[:0] ist der passende Leerwert)
+                comment = b"#" if isinstance(text, bytes) else "#"
+                text = text[:0].join(line for line in text.splitlines(True)
+                                     if not (line.startswith(comment) or not line.strip()))
+            if text:
+                feed_text(text)
+                frame_soon()
+            if eof:
+                # Anzeige bleibt stehen, die Schleife wartet nur noch auf Timer/Signale
+                loop.remove_reader(sys.stdin.fileno())
+                if json_out is not None:
+                    # Headless: letzter Datensatz mit dem Endstand, dann beenden
+                    frame_now()
+                    loop.stop()
+            return eof
+
+        def on_stdin_file() -> None:
+            """STDIN als reguläre Datei bzw. /dev/null (epoll nimmt sie nicht): liest nie blockierend,
+               daher blockweise über Timer-Callbacks, damit Tasten/Timer dazwischen drankommen."""
+            if not on_stdin_data():
+                loop.call_later(0, on_stdin_file)
+
+        # --- Dateien verfolgen (--follow) ---
+        follower = None
+        if args.follow:
+            follower = FileFollower(args.follow, tag_format=args.follow_tag,
+                                    from_start=args.follow_from == "start",
+                                    checkpoint_path=args.follow_checkpoint, no_warn=args.no_warn)
+
+        def feed_follow(text: str) -> None:
+            if text:
+                feed_text(text)
+                frame_soon()
+            follower.save_checkpoint()
+            if follower.pending:
+                loop.call_later(0, on_follow_poll)  # Rest großer Schübe im nächsten Durchgang
+
+        def on_follow_events() -> None:
+            feed_follow(follower.read_events())
+
+        def on_follow_poll() -> None:
+            feed_follow(follower.poll())
+
+        def on_follow_timer() -> None:
+            on_follow_poll()
+            loop.call_later(follower.poll_interval, on_follow_timer)
+
+        # --- Fleet-Modus (--hosts) ---
+        fleet = None
+        if args.hosts:
+            try:
+                fleet = FleetRunner(load_hosts(args.hosts), args.cmd, args.host_cmd, args.host_concurrency,
+                                    tag_format=args.host_tag, no_warn=args.no_warn)
+            except (OSError, ValueError, KeyError) as e:
+                sys.stderr.write(f"[ERROR] --hosts '{args.hosts}': {e}\n")
+                sys.exit(2)
+            if json_out is not None:
+                json_out.extra = lambda: {"hosts": fleet.summary()}
+
+        def start_fleet() -> None:
+            for host in fleet.start_ready():
+                loop.add_reader(host.reader.fd, lambda host=host: on_fleet_data(host))
+
+        def on_fleet_data(host: FleetHost) -> None:
+            t_read = time.perf_counter()
+            try:
+                text, eof = fleet.read(host, decode=not args.bytes)
+            except OSError:
+                text, eof = "", True
+            meter.add(nbytes=len(text), seconds=time.perf_counter() - t_read)
+            if text:
+                # Treffer je Host: Zählerstände vor/nach der Auswertung dieses Blocks
+                before = [pat.count for pat in patterns]
+                feed_text(text)
+                counts = host.counts
+                for pat, n in zip(patterns, before):
+                    if pat.count != n:
+                        counts[pat.pid] = counts.get(pat.pid, 0) + pat.count - n
+                frame_soon()
+            if eof:
+                loop.remove_reader(host.reader.fd)
+                fleet.finish(host)
+                start_fleet()  # nächster wartender Host rückt nach
+                if fleet.done and current_interval <= 0 and json_out is not None:
+                    # Headless ohne Intervall: Endstand aller Hosts ausgeben, dann beenden
+                    frame_now()
+                    loop.stop()
+                    return
+                frame_soon()
+
+        # --- Pattern-Datei neu laden (Hot Reload) ---
+        def pattern_file_stamp() -> Optional[tuple]:
+            try:
+                st = os.stat(args.patterns)
+            except OSError:
+                return None
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+        pattern_stamp = pattern_file_stamp()
+        reload_status = ""        # Ergebnis bzw. Fehler des letzten Neuladens (Status-Bar)
+        reload_status_until = 0.0  # monotonic; Fehler bleiben bis zum nächsten Neuladen stehen
+
+        def reload_patterns() -> None:
+            """Lädt die Pattern-Datei neu und tauscht die Liste zwischen zwei Frames aus.
+               Unveränderte IDs behalten ihre Aggregate, Fehler landen in der Status-Bar."""
+            nonlocal patterns, matcher, reload_status, reload_status_until
+            problems: List[str] = []
+            fresh = load_patterns(args.patterns, fs, flags, bytes_rx=args.bytes, reuse=patterns,
+                                  warn=problems.append)
+            # Status-Bar: erste Meldung ohne "[WARN] "-Präfix, gekürzt auf eine Header-Breite
+            first = problems[0].strip().split("] ", 1)[-1] if problems else ""
+            if len(first) > 60:
+                first = first[:59] + "…"
+            if len(problems) > 1:
+                first += f" (+{len(problems) - 1})"
+            if not fresh:
+                reload_status = f"Patterns unverändert: {first or 'keine gültigen Zeilen'}"
+                reload_status_until = float("inf")
+            else:
+                if distinct is not None:
+                    for pat in fresh:
+                        if pat.distinct is None:
+                            pat.distinct = HyperLogLog(*distinct)
+                if profiler is not None:
+                    profiler.wrap_transforms(fresh)
+                old_ids = {p.pid for p in patterns}
+                new_ids = {p.pid for p in fresh}
+                kept = len({id(p) for p in patterns} & {id(p) for p in fresh})
+                added = len(new_ids - old_ids)
+                changed = len(fresh) - kept - added
+                removed = len(old_ids - new_ids)
+                if json_out is not None:
+                    json_out.set_patterns(fresh)
+                if matcher is not None:
+                    # Worker kennen nur die Specs ihres Starts: Pool mit der neuen Liste neu starten
+                    matcher.close()
+                    matcher = ShardedMatcher(args.workers, fresh, flags, args.strip_punct, cg_sep,
+                                             distinct=distinct)
+                patterns = fresh
+                if problems:
+                    reload_status = f"Patterns: {first}"
+                    reload_status_until = float("inf")
+                else:
+                    reload_status = f"Patterns neu: {kept} gleich, {changed} geändert, {added} neu, {removed} entfernt"
+                    reload_status_until = time.monotonic() + RELOAD_NOTE
+            if not args.clear and not args.no_warn:
+                for problem in problems:
+                    sys.stderr.write(problem)
+                if fresh and not problems:
+                    sys.stderr.write(f"[INFO] {reload_status}\n")
+
+        def on_reload_check() -> None:
+            nonlocal pattern_stamp
+            loop.call_later(RELOAD_CHECK, on_reload_check)
+            stamp = pattern_file_stamp()
+            if stamp is None or stamp == pattern_stamp:
+                return  # Datei (noch) nicht da, z. B. während ein Editor sie ersetzt
+            pattern_stamp = stamp
+            reload_patterns()
+            frame_soon()
+
+        # --- Zustands-Snapshots (--state) ---
+        def on_state_tick() -> None:
+            loop.call_later(args.state_interval, on_state_tick)
+            if state_store.save_async(patterns):
+                on_state_step()
+
+        def on_state_step() -> None:
+            # Kodieren in Scheiben zwischen anderen Ereignissen; das Schreiben übernimmt der Writer-Thread
+            if not state_store.step(patterns):
+                loop.call_later(0, on_state_step)
+
+        # --- Intervall-Tick (kontinuierlich/STDIN) ---
+        def tick_interval() -> float:
+            if current_interval > 0:
+                return current_interval
+            return IDLE_REFRESH if args.clear else 0.0
+
+        def on_tick() -> None:
+            nonlocal tick_timer
+            if fleet is not None:
+                if current_interval > 0:
+                    fleet.requeue()  # beendete Hosts im Takt neu starten (wie --cmd)
+                    start_fleet()
+            elif args.cmd and cont_process is None and current_interval > 0:
+                start_continuous()
+            frame_now()
+            interval = tick_interval()
+            tick_timer = loop.call_later(interval, on_tick) if interval > 0 else None
+
+        def reschedule() -> None:
+            """Nach '+'/'-': nächster Tick bzw. Lauf im neuen Intervall."""
+            nonlocal tick_timer
+            if tick_timer is None or iter_run is not None:
+                return  # Läuft gerade ein iterativer Lauf, plant finish_iteration() neu
+            loop.cancel(tick_timer)
+            if args.iterative is not None:
+                tick_timer = loop.call_later(current_interval, start_iteration)
+            else:
+                tick_timer = loop.call_later(current_interval, on_tick)
+
+        # --- Tastatur ---
+        def handle_key(key: str) -> None:
+            nonlocal current_interval, color_debug_mode, top_view, host_view
+            if json_out is not None and key in ('a', 'c', 't', 'h'):
+                return  # Headless: keine Ansicht, die umgeschaltet werden könnte
+            if key == 'a':
+                # ========================================================================
+                # MODUS-WECHSEL - GEMEINSAME FUNKTION
+                # ========================================================================
+                # WICHTIG: Verwendet die gemeinsame handle_mode_switch() Funktion
+                # um Code-Duplikation zu vermeiden und Wartungsfehler zu verhindern.
+                # Danach wird die neue Ansicht sofort aus den aktuellen Zählern gerendert.
+                # ========================================================================
+                handle_mode_switch()
+                frame_now()
+            elif key in ('+', '-') and current_interval > 0:
+                new_interval = current_interval + (5.0 if key == '+' else -5.0)
+                if new_interval >= 1.0:
+                    current_interval = new_interval
+                    if args.iterative is not None:
+                        args.iterative = current_interval
+                    else:
+                        args.interval = current_interval
+                    reschedule()
+                    frame_now()
+            elif key == 't':
+                # Top-K-Ansicht ein/aus; sofort aus den aktuellen Sketches rendern
+                top_view = not top_view
+                frame_now()
+            elif key == 'h' and fleet is not None:
+                # Host-Ansicht ein/aus (Treffer je Host statt Summe)
+                host_view = not host_view
+                frame_now()
+            elif key == 'c' and args.color:
+                # ========================================================================
+                # COLOR-DEBUG-MODUS TOGGLE (TASTE 'C')
+                # ========================================================================
+                # WICHTIG: Im Color-Modus zeigt Taste 'c' die Farbcodes anstelle der ID/Hostname an.
+                # Das ist nützlich für die Fehlerbehebung von schlechten Farbkombinationen.
+                # ========================================================================
+                color_debug_mode = not color_debug_mode
+                frame_now()  # Sofortige Aktualisierung der Anzeige
+            elif key == ' ':
+                frame_now()  # Sofort neu zeichnen, auch zwischen zwei --max-fps-Frames
+            elif key == 'q':
+                sys.exit(0)
 
-        # Programmstart-Zeit für Timeout-Prüfung
-        program_start_time = time.time()
+        def on_key_input() -> None:
+            fd = sys.stdin.fileno()
+            try:
+                data = os.read(fd, 64)
+            except OSError:
+                data = b""
+            if not data:
+                loop.remove_reader(fd)  # Kein Terminal (mehr) an STDIN
+                return
+            for key in data.decode("utf-8", "ignore"):
+                handle_key(key)
+
+        def on_program_timeout() -> None:
+            if not args.no_warn:
+                sys.stderr.write(f"[INFO] Timeout nach {args.timeout} Sekunden erreicht. Programm wird beendet.\n")
+            sys.exit(0)
 
-        # Hauptschleife für alle Modi
         try:
-            # Einfache Tastaturbehandlung ohne KeyPoller
-                while True:
-                    # Globale Timeout-Prüfung
-                    if args.timeout and (time.time() - program_start_time) >= args.timeout:
-                        if not args.no_warn:
-                            sys.stderr.write(f"[INFO] Timeout nach {args.timeout} Sekunden erreicht. Programm wird beendet.\n")
-                        sys.exit(0)
-                    if args.iterative is not None:
-                        # Iterativer Modus: Kommando wird alle X Sekunden neu ausgeführt
-                        current_interval = args.iterative
-
-                        # Kontinuierliche Tastaturbehandlung während des Wartens
-                        start_time = time.time()
-                        while time.time() - start_time < current_interval:
-                            # ========================================================================
-                            # TASTATURBEHANDLUNG IM ITERATIVEN MODUS
-                            # ========================================================================
-                            # WICHTIG: Diese Tastaturbehandlung ist ESSENTIELL für die Benutzerinteraktion!
-                            #
-                            # Funktionsweise:
-                            # - Prüft alle 100ms auf Tastatureingaben
-                            # - Verarbeitet Tasten sofort ohne Warten auf Intervall-Ende
-                            # - Aktualisiert die Anzeige sofort bei Tastendruck
-                            #
-                            # Tasten-Funktionalität:
-                            # - 'a': Wechsel zwischen Normal- und Alt-Ansicht
-                            # - 'q': Programm beenden
-                            # - '+': Intervall um 5 Sekunden erhöhen
-                            # - '-': Intervall um 5 Sekunden verringern (Minimum 1s)
-                            # ========================================================================
-                            # Einfache Tastaturbehandlung ohne Terminal-Konfiguration
-                            # WICHTIG: Im Pipe-Modus wird sys.stdin für piped Daten verwendet
-                            # und darf NICHT für Tastatureingaben gelesen werden
-                            if not is_pipe_mode:
-                                try:
-                                    if select.select([sys.stdin], [], [], 0.1)[0]:
-                                        key = sys.stdin.read(1)
-                                    if key == 'a':
-                                        # ========================================================================
-                                        # MODUS-WECHSEL - GEMEINSAME FUNKTION
-                                        # ========================================================================
-                                        # WICHTIG: Verwendet die gemeinsame handle_mode_switch() Funktion
-                                        # um Code-Duplikation zu vermeiden und Wartungsfehler zu verhindern.
-                                        # ========================================================================
-                                        handle_mode_switch()
-                                    elif key == '+':
-                                        current_interval += 5.0
-                                        args.iterative = current_interval
-                                        one_frame()
-                                    elif key == '-':
-                                        new_interval = current_interval - 5.0
-                                        if new_interval >= 1.0:
-                                            current_interval = new_interval
-                                            args.iterative = current_interval
-                                            one_frame()
-                                    elif key == 'c' and args.color:
-                                        # ========================================================================
-                                        # COLOR-DEBUG-MODUS TOGGLE (TASTE 'C') - ITERATIVER MODUS
-                                        # ========================================================================
-                                        # WICHTIG: Im Color-Modus zeigt Taste 'c' die Farbcodes anstelle der ID/Hostname an.
-                                        # Das ist nützlich für die Fehlerbehebung von schlechten Farbkombinationen.
-                                        # ========================================================================
-                                        color_debug_mode = not color_debug_mode
-                                        one_frame()  # Sofortige Aktualisierung der Anzeige
-                                    elif key == 'q':
-                                        sys.exit(0)
-                                        break
-                                except Exception as e:
-                                    # Stille Fehlerbehandlung für Tastaturbehandlung
-                                    pass
-
-                        # Wenn keine Tasten gedrückt wurden, normales Update
-                        if time.time() - start_time >= current_interval:
-                            one_frame()
-                    elif args.interval and args.interval > 0:
-                        # Kontinuierlicher Modus: Kommando läuft dauerhaft, Display wird alle X Sekunden aktualisiert
-                        current_interval = args.interval
-
-                        # Kontinuierliche Tastaturbehandlung während des Wartens
-                        start_time = time.time()
-                        while time.time() - start_time < current_interval:
-                            # ========================================================================
-                            # TASTATURBEHANDLUNG IM KONTINUIERLICHEN MODUS
-                            # ========================================================================
-                            # WICHTIG: Diese Tastaturbehandlung ist ESSENTIELL für die Benutzerinteraktion!
-                            #
-                            # Funktionsweise:
-                            # - Prüft alle 100ms auf Tastatureingaben
-                            # - Verarbeitet Tasten sofort ohne Warten auf Intervall-Ende
-                            # - Aktualisiert die Anzeige sofort bei Tastendruck
-                            #
-                            # Tasten-Funktionalität:
-                            # - 'a': Wechsel zwischen Normal- und Alt-Ansicht
-                            # - 'q': Programm beenden
-                            # - '+': Intervall um 5 Sekunden erhöhen
-                            # - '-': Intervall um 5 Sekunden verringern (Minimum 1s)
-                            # ========================================================================
-                            # Einfache Tastaturbehandlung ohne Terminal-Konfiguration
-                            # WICHTIG: Im Pipe-Modus wird sys.stdin für piped Daten verwendet
-                            # und darf NICHT für Tastatureingaben gelesen werden
-                            if not is_pipe_mode:
-                                try:
-                                    if select.select([sys.stdin], [], [], 0.1)[0]:
-                                        key = sys.stdin.read(1)
-                                    if key == 'a':
-                                        # ========================================================================
-                                        # MODUS-WECHSEL - GEMEINSAME FUNKTION
-                                        # ========================================================================
-                                        # WICHTIG: Verwendet die gemeinsame handle_mode_switch() Funktion
-                                        # um Code-Duplikation zu vermeiden und Wartungsfehler zu verhindern.
-                                        # ========================================================================
-                                        handle_mode_switch()
-                                    elif key == '+':
-                                        current_interval += 5.0
-                                        args.interval = current_interval
-                                        one_frame()
-                                    elif key == '-':
-                                        new_interval = current_interval - 5.0
-                                        if new_interval >= 1.0:
-                                            current_interval = new_interval
-                                            args.interval = current_interval
-                                            one_frame()
-                                    elif key == 'c' and args.color:
-                                        # ========================================================================
-                                        # COLOR-DEBUG-MODUS TOGGLE (TASTE 'C') - KONTINUIERLICHER MODUS
-                                        # ========================================================================
-                                        # WICHTIG: Im Color-Modus zeigt Taste 'c' die Farbcodes anstelle der ID/Hostname an.
-                                        # Das ist nützlich für die Fehlerbehebung von schlechten Farbkombinationen.
-                                        # ========================================================================
-                                        color_debug_mode = not color_debug_mode
-                                        one_frame()  # Sofortige Aktualisierung der Anzeige
-                                    elif key == 'q':
-                                        sys.exit(0)
-                                    break
-                                except Exception as e:
-                                    # Stille Fehlerbehandlung für Tastaturbehandlung
-                                    pass
-
-                        # Wenn keine Tasten gedrückt wurden, normales Update
-                        if time.time() - start_time >= current_interval:
-                            one_frame()
-                    else:
-                        # ========================================================================
-                        # STDIN-MODUS: Kontinuierlich lesen und anzeigen
-                        # ========================================================================
-                        # WICHTIG: Auch im STDIN-Modus muss Tastaturbehandlung funktionieren!
-                        #
-                        # Funktionsweise:
-                        # - Führt one_frame() aus (liest STDIN-Daten und aktualisiert Anzeige)
-                        # - Prüft dann auf Tastatureingaben mit kurzem Timeout
-                        # - Verarbeitet Tasten 'a', 'q', '+', '-' sofort
-                        # - Wiederholt den Zyklus kontinuierlich
-                        #
-                        # Tasten-Funktionalität (identisch zu anderen Modi):
-                        # - 'a': Wechsel zwischen Normal- und Alt-Ansicht
-                        # - 'q': Programm beenden
-                        # - '+': Intervall um 5 Sekunden erhöhen (nicht relevant im STDIN-Modus)
-                        # - '-': Intervall um 5 Sekunden verringern (nicht relevant im STDIN-Modus)
-                        # ========================================================================
-
-                        # Normales Update mit STDIN-Daten
-                        one_frame()
-
-                        # Tastaturbehandlung im STDIN-Modus
-                        # WICHTIG: Im Pipe-Modus wird sys.stdin für piped Daten verwendet
-                        # und darf NICHT für Tastatureingaben gelesen werden
-                        if not is_pipe_mode:
-                            try:
-                                # Prüfe auf Tastatureingaben mit kurzem Timeout (100ms)
-                                if select.select([sys.stdin], [], [], 0.1)[0]:
-                                        key = sys.stdin.read(1)
-                                        if key == 'a':
-                                            # ========================================================================
-                                            # MODUS-WECHSEL - GEMEINSAME FUNKTION
-                                            # ========================================================================
-                                            # WICHTIG: Verwendet die gemeinsame handle_mode_switch() Funktion
-                                            # um Code-Duplikation zu vermeiden und Wartungsfehler zu verhindern.
-                                            # ========================================================================
-                                            handle_mode_switch()
-                                        elif key == 'c' and args.color:
-                                            # ========================================================================
-                                            # COLOR-DEBUG-MODUS TOGGLE (TASTE 'C') - STDIN-MODUS
-                                            # ========================================================================
-                                            # WICHTIG: Im Color-Modus zeigt Taste 'c' die Farbcodes anstelle der ID/Hostname an.
-                                            # Das ist nützlich für die Fehlerbehebung von schlechten Farbkombinationen.
-                                            # ========================================================================
-                                            color_debug_mode = not color_debug_mode
-                                            one_frame()  # Sofortige Aktualisierung der Anzeige
-                                        elif key == 'q':
-                                            sys.exit(0)
-                                        # '+', '-' sind im STDIN-Modus nicht relevant
-                            except (KeyboardInterrupt, SystemExit):
-                                sys.exit(0)
-                            except Exception as e:
-                                # Stille Fehlerbehandlung für Tastaturbehandlung
-                                pass
+            # WICHTIG: Im Pipe-Modus wird sys.stdin für piped Daten verwendet
+            # und darf NICHT für Tastatureingaben gelesen werden
+            if is_pipe_mode:
+                try:
+                    loop.add_reader(sys.stdin.fileno(), on_stdin_data)
+                except PermissionError:
+                    # "< log.txt" bzw. "< /dev/null": epoll lehnt reguläre Dateien/Geräte ab
+                    loop.call_later(0, on_stdin_file)
+            elif sys.stdin.isatty():
+                # Tasten nur von einem Terminal; cron/systemd/CI starten mit STDIN=/dev/null o. ä.
+                loop.add_reader(sys.stdin.fileno(), on_key_input)
+            if follower is not None:
+                if follower.fd >= 0:
+                    loop.add_reader(follower.fd, on_follow_events)
+                on_follow_timer()  # Erster Durchgang (--follow-from start/Checkpoint), dann Poll-Takt
+            if args.clear and hasattr(signal, "SIGWINCH"):
+                loop.add_signal(signal.SIGWINCH, frame_now)  # Sofort in neuer Größe zeichnen
+            if args.timeout:
+                # Globale Timeout-Prüfung
+                loop.call_later(args.timeout, on_program_timeout)
+            loop.call_later(RELOAD_CHECK, on_reload_check)  # Pattern-Datei auf Änderungen prüfen
+            if state_store is not None:
+                loop.call_later(args.state_interval, on_state_tick)
+            if aux_worker is not None:
+                # Neue Aux-Ausgabe: mit --clear sofort zeigen (Differenz-Renderer, billig),
+                # sonst mit dem nächsten regulären Frame
+                if args.clear:
+                    aux_worker.on_update = lambda: loop.call_soon_threadsafe(frame_now)
+                aux_worker.start()
+
+            # SOFORT erste Ausführung beim Start
+            if args.iterative is not None:
+                current_interval = args.iterative
+                start_iteration()
+            else:
+                current_interval = args.interval if args.interval and args.interval > 0 else 0
+                if fleet is not None:
+                    start_fleet()
+                elif args.cmd:
+                    start_continuous()
+                on_tick()
+
+            # Zeige Hinweis für Pipe-Modus
+            if is_pipe_mode:
+                sys.stderr.write("[INFO] Pipe-Modus: Tastatursteuerung nicht verfügbar.\n")
+                sys.stderr.write("[INFO] Für Tastatursteuerung verwenden Sie: --cmd 'generator | patwatch'\n")
+                sys.stderr.write("[INFO] Zum Beenden: Ctrl+C oder warten Sie bis der Generator beendet ist\n")
+
+            loop.run()
         except Exception as e:
             if not args.no_warn:
                 sys.stderr.write(f"[ERROR] Unerwarteter Fehler im kontinuierlichen Modus: {e}\n")
             sys.exit(1)
+        finally:
+            # Laufende Kommandos nicht verwaisen lassen
+            if aux_worker is not None:
+                aux_worker.stop()
+            if matcher is not None:
+                matcher.close()
+            if follower is not None:
+                follower.close()
+            if fleet is not None:
+                fleet.close()
+            if state_store is not None:
+                state_store.save(patterns)  # zusammen mit dem Follow-Checkpoint: Stand bei Ende
+            for proc in (cont_process, iter_run.process if iter_run is not None else None):
+                if proc is not None and proc.poll() is None:
+                    proc.terminate()
+            loop.close()
+            for reader in readers.values():
+                reader.close()
+            if args.iterative is None and meter.lines and not args.no_warn:
+                dropped = f"; {frames_dropped} Frames ausgelassen (≤{1.0 / MIN_FRAME_GAP:g}fps)" if frames_dropped else ""
+                sys.stderr.write(f"[INFO] {meter.summary()}{dropped}\n")
+            if profiler is not None:
+                profiler.close()
+                sys.stderr.write(profiler.summary() + "\n")
+            if args.pattern_cost:
+                sys.stderr.write(format_cost_summary(patterns) + "\n")
 
     except Exception as e:
         sys.stderr.write(f"[ERROR] Kritischer Fehler: {e}\n")
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+patwatch_bench.py — Benchmarks für die Stufen von patwatch (Ingest/Match, Transform-Pipeline,
+Rendering) mit synthetischem Log-Generator und Pattern-TSVs von 5 bis 5000 IDs.
+
+Aufrufe:
+  patwatch_bench.py run [--sizes 5,50,500,5000] [--lines N] [--out run.json]
+      Misst und schreibt JSON (Default: STDOUT). Gemessen werden
+      - process_text():  Zeilen/s je Pattern-Anzahl (Reset + Aggregation + Plain-Ansicht)
+      - apply_pipeline(): ns pro Aufruf, interpretiert und vorkompiliert (PatternRec.alt_fn)
+      - render_normal_view()/render_alt_view()/render_plain_view(): ms pro Frame, mit und ohne --color
+      - StateStore (--state): längster Kodier-Tick eines periodischen Snapshots (Budget STATE_SLICE),
+        alle Zeilen in einem Zug (save() beim Beenden) und ein Snapshot ohne neue Treffer
+  patwatch_bench.py compare ALT.json NEU.json
+      Vergleicht zwei Läufe Messung für Messung (Verhältnis, ">" = schneller).
+  patwatch_bench.py gen-log [--lines N] [--rate R] [--cardinality C] [--match-ratio M] [--patterns K]
+      Schreibt synthetische Logzeilen nach STDOUT, mit --rate gedrosselt (z. B. als Live-Quelle:
+      patwatch_bench.py gen-log --rate 5000 --lines 0 | patwatch.py -p p500.tsv).
+  patwatch_bench.py gen-patterns K
+      Schreibt eine Pattern-TSV mit K IDs nach STDOUT.
+
+Die Logzeilen tragen ein Ereignis-Token (evt=eK); Pattern K trifft genau die Zeilen mit evt=eK.
+--match-ratio steuert den Anteil der Zeilen mit Treffer, --cardinality die Anzahl verschiedener
+Werte in den gesammelten Feldern (host/user/req) und damit Farbchips und Legende.
+
+Alle Zeiten sind Wandzeit (perf_counter) auf einem Kern; gemeldet wird der Median über --repeat
+Läufe. Die Terminalbreite ist für reproduzierbare Renderzeiten fest (--columns, Default 160).
+"""
+
+import sys, os, re, json, time, random, argparse, platform, subprocess, tempfile, statistics
+from typing import Callable, List, Tuple
+
+PATTERN_SIZES = (5, 50, 500, 5000)
+
+# Pattern-Vorlagen (zyklisch je ID): decken die Spalten 3-5 und typische Pipelines ab
+_PATTERN_KINDS = (
+    "{pid}\tevt=e{k}\\b\thost=(\\S+)\t\t\\1|upper",
+    "{pid}\tevt=e{k}\\b\tuser=(\\w+)\tu:\\1\tlower|prepend('<')|append('>')",
+    "{pid}\tevt=e{k}\\b\tlat=(\\d+)ms\t\\1ms\t",
+    "{pid}\tevt=e{k}\\b",
+    "{pid}\tevt=e{k}\\b\treq=([0-9a-f]+)\t\tfirst(6)",
+)
+
+# Pipelines für den apply_pipeline()-Benchmark: (Name, Pipeline, Wort)
+_PIPELINES = (
+    ("upper", "upper", "web-042"),
+    ("backref_upper", "\\1|upper", "web-042"),
+    ("chain3", "lower|prepend('<')|append('>')", "User42"),
+    ("replace_rx", "replace('[0-9]+','#')|collapse_ws", "req 1234 took 56 ms"),
+    ("split_pad", "split('.',0)|padleft(12,'.')", "web-042.example.com"),
+)
+
+# ---------- Generator ----------
+def gen_patterns(count: int) -> str:
+    """Pattern-TSV mit 'count' IDs (P00000...), Vorlagen zyklisch aus _PATTERN_KINDS."""
+    lines = ["# patwatch_bench: %d Patterns" % count]
+    for k in range(count):
+        tmpl = _PATTERN_KINDS[k % len(_PATTERN_KINDS)]
+        lines.append(tmpl.format(pid="P%05d" % k, k=k))
+    return "\n".join(lines) + "\n"
+
+class LogGenerator:
+    """Synthetische Logzeilen, deterministisch über 'seed'.
+
+    patterns:    Anzahl der Ereignis-IDs, die Treffer erzeugen (evt=e0 ... evt=e{patterns-1})
+    match_ratio: Anteil der Zeilen mit Treffer (Rest: evt=xK, trifft kein Pattern)
+    cardinality: verschiedene Werte je Feld (host/user/req)
+    """
+    def __init__(self, patterns: int, match_ratio: float = 0.5, cardinality: int = 100, seed: int = 1):
+        self.patterns = max(1, patterns)
+        self.match_ratio = match_ratio
+        self.cardinality = max(1, cardinality)
+        self.rng = random.Random(seed)
+        self.seq = 0
+
+    def line(self) -> str:
+        rng = self.rng
+        self.seq += 1
+        if rng.random() < self.match_ratio:
+            evt = "e%d" % rng.randrange(self.patterns)
+        else:
+            evt = "x%d" % rng.randrange(self.patterns)
+        c = rng.randrange(self.cardinality)
+        return ("2026-01-01T00:00:%06.3f INFO evt=%s host=web-%03d user=User%d lat=%dms req=%08x msg=request handled"
+                % (self.seq % 60000 / 1000.0, evt, c, c, rng.randrange(1, 999), c * 2654435761 & 0xFFFFFFFF))
+
+    def text(self, lines: int) -> str:
+        return "\n".join(self.line() for _ in range(lines)) + "\n"
+
+def write_rate_limited(gen: LogGenerator, lines: int, rate: float, out) -> None:
+    """Schreibt 'lines' Zeilen (0 = endlos) mit 'rate' Zeilen/s (0 = ungebremst) in Schüben von 50ms."""
+    batch = max(1, int(rate / 20)) if rate > 0 else 1000
+    written = 0
+    start = time.monotonic()
+    while lines <= 0 or written < lines:
+        n = batch if lines <= 0 else min(batch, lines - written)
+        out.write(gen.text(n))
+        out.flush()
+        written += n
+        if rate > 0:
+            delay = start + written / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+# ---------- Messung ----------
+def _timings(fn: Callable[[], object], repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+def _result(name: str, unit: str, value: float, higher_is_better: bool, **extra) -> dict:
+    res = {"name": name, "unit": unit, "value": round(value, 3), "higher_is_better": higher_is_better}
+    res.update(extra)
+    return res
+
+def bench_process_text(pw, tsv_path: str, size: int, text: str, repeat: int) -> Tuple[List[dict], list]:
+    t0 = time.perf_counter()
+    patterns = pw.load_patterns(tsv_path, "\t", 0)
+    load_s = time.perf_counter() - t0
+    n_lines = text.count("\n")
+    times = _timings(lambda: pw.process_text(text, patterns, " ", False, ""), repeat)
+    med = statistics.median(times)
+    return [
+        _result("process_text/patterns=%d" % size, "lines/s", n_lines / med, True,
+                lines=n_lines, seconds=round(med, 4), best_seconds=round(min(times), 4)),
+        _result("load_patterns/patterns=%d" % size, "ms", load_s * 1e3, False),
+    ], patterns
+
+def bench_pipelines(pw, calls: int, repeat: int) -> List[dict]:
+    out = []
+    m = re.search(r"host=(\S+)", "host=web-042.example.com")
+    for name, pipeline, word in _PIPELINES:
+        compiled = pw.compile_pipeline(pipeline)
+        interp = _timings(lambda: [pw.apply_pipeline(word, pipeline, m) for _ in range(calls)], repeat)
+        comp = _timings(lambda: [compiled(word, m) for _ in range(calls)], repeat)
+        out.append(_result("apply_pipeline/%s" % name, "ns/call", statistics.median(interp) / calls * 1e9, False,
+                           pipeline=pipeline))
+        out.append(_result("compiled_pipeline/%s" % name, "ns/call", statistics.median(comp) / calls * 1e9, False,
+                           pipeline=pipeline))
+    return out
+
+def bench_render(pw, patterns, size: int, repeat: int) -> List[dict]:
+    out = []
+    now = time.monotonic()
+    pw.record_rates(patterns, now)  # Rate-Spalte wie im Stream-Modus (Default der Ansicht)
+    views = (
+        ("render_plain_view", False, lambda color: pw.render_plain_view(patterns, " ", rates_now=now)),
+        ("render_normal_view", True, lambda color: pw.render_normal_view(patterns, " ", color, rates_now=now)),
+        ("render_alt_view", True, lambda color: pw.render_alt_view(patterns, " ", color, rates_now=now)),
+    )
+    for name, has_color, fn in views:
+        for color in ((False, True) if has_color else (False,)):
+            # Erster Frame separat: enthält u. a. den Aufbau des Farbchip-Caches
+            t0 = time.perf_counter()
+            fn(color)
+            first = time.perf_counter() - t0
+            times = _timings(lambda: fn(color), repeat)
+            label = "%s/patterns=%d/%s" % (name, size, "color" if color else "nocolor")
+            out.append(_result(label, "ms", statistics.median(times) * 1e3, False,
+                               first_ms=round(first * 1e3, 3)))
+    return out
+
+def bench_state(pw, patterns, size: int, repeat: int, tmp: str) -> List[dict]:
+    """--state: Kodierarbeit im Hauptthread. Ein frischer StateStore je Lauf kennt keine früheren
+       Zeilen – das entspricht einem Snapshot, in dem jedes Pattern neue Treffer hat."""
+    path = os.path.join(tmp, "state%d.ndjson" % size)
+    max_tick, ticks, full, idle = [], [], [], []
+    for _ in range(repeat):
+        store = pw.StateStore(path, True)
+        store.save_async(patterns)
+        longest = 0.0
+        n = 0
+        done = False
+        while not done:
+            t0 = time.perf_counter()
+            done = store.step(patterns)
+            longest = max(longest, time.perf_counter() - t0)
+            n += 1
+        store.thread.join()  # der Writer-Thread soll die nächste Messung nicht ausbremsen
+        max_tick.append(longest)
+        ticks.append(n)
+        full.extend(_timings(lambda: pw.StateStore(path, True).capture(patterns), 1))
+        idle.extend(_timings(lambda: store.capture(patterns), 1))
+    return [
+        _result("state_tick_max/patterns=%d" % size, "ms", statistics.median(max_tick) * 1e3, False,
+                ticks=statistics.median(ticks), budget_ms=pw.STATE_SLICE * 1e3),
+        _result("state_capture_full/patterns=%d" % size, "ms", statistics.median(full) * 1e3, False),
+        _result("state_capture_idle/patterns=%d" % size, "ms", statistics.median(idle) * 1e3, False),
+    ]
+
+def _git_rev(path: str) -> str:
+    try:
+        return subprocess.run(["git", "-C", path, "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+def cmd_run(args) -> int:
+    # Feste Breite vor dem Import: terminal_size() liest COLUMNS (shutil.get_terminal_size)
+    os.environ["COLUMNS"] = str(args.columns)
+    os.environ["LINES"] = "50"
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    import patwatch as pw
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results: List[dict] = []
+    with tempfile.TemporaryDirectory(prefix="patwatch_bench.") as tmp:
+        for size in sizes:
+            tsv = os.path.join(tmp, "p%d.tsv" % size)
+            with open(tsv, "w", encoding="utf-8") as f:
+                f.write(gen_patterns(size))
+            text = LogGenerator(size, args.match_ratio, args.cardinality, args.seed).text(args.lines)
+            res, patterns = bench_process_text(pw, tsv, size, text, args.repeat)
+            results.extend(res)
+            results.extend(bench_render(pw, patterns, size, args.repeat))
+            results.extend(bench_state(pw, patterns, size, args.repeat, tmp))
+            sys.stderr.write("[bench] %5d Patterns: %s %s\n" % (size, res[0]["value"], res[0]["unit"]))
+    results.extend(bench_pipelines(pw, args.pipeline_calls, args.repeat))
+
+    report = {
+        "schema": 1,
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_rev": _git_rev(here),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": {"sizes": sizes, "lines": args.lines, "match_ratio": args.match_ratio,
+                       "cardinality": args.cardinality, "seed": args.seed, "repeat": args.repeat,
+                       "columns": args.columns, "pipeline_calls": args.pipeline_calls},
+        },
+        "results": results,
+    }
+    data = json.dumps(report, indent=1, ensure_ascii=False) + "\n"
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(data)
+    else:
+        sys.stdout.write(data)
+    return 0
+
+def cmd_compare(args) -> int:
+    with open(args.old, encoding="utf-8") as f:
+        old = {r["name"]: r for r in json.load(f)["results"]}
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+    width = max((len(r["name"]) for r in new), default=10)
+    worse = 0
+    for r in new:
+        o = old.get(r["name"])
+        if o is None or not o["value"] or not r["value"]:
+            print("%-*s %12s %12s %8s" % (width, r["name"], "-", r["value"], "neu"))
+            continue
+        # Faktor > 1 bedeutet immer "besser", unabhängig von der Einheit
+        factor = (r["value"] / o["value"]) if r["higher_is_better"] else (o["value"] / r["value"])
+        mark = ">" if factor >= 1 + args.threshold else ("<" if factor <= 1 - args.threshold else "=")
+        worse += mark == "<"
+        print("%-*s %12s %12s %7.2fx %s %s" % (width, r["name"], o["value"], r["value"], factor, mark, r["unit"]))
+    return 1 if (worse and args.fail_on_regression) else 0
+
+def cmd_gen_log(args) -> int:
+    gen = LogGenerator(args.patterns, args.match_ratio, args.cardinality, args.seed)
+    try:
+        write_rate_limited(gen, args.lines, args.rate, sys.stdout)
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    return 0
+
+def cmd_gen_patterns(args) -> int:
+    sys.stdout.write(gen_patterns(args.count))
+    return 0
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Benchmarks für patwatch (Ingest/Match, Pipelines, Rendering).")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    def add_gen_opts(sp):
+        sp.add_argument("--match-ratio", type=float, default=0.5, help="Anteil Zeilen mit Treffer (Default: 0.5)")
+        sp.add_argument("--cardinality", type=int, default=100, help="Verschiedene Werte je Feld (Default: 100)")
+        sp.add_argument("--seed", type=int, default=1, help="Zufalls-Seed (Default: 1)")
+
+    r = sub.add_parser("run", help="Benchmarks ausführen und JSON schreiben")
+    r.add_argument("--sizes", default=",".join(map(str, PATTERN_SIZES)), help="Pattern-Anzahlen (Default: 5,50,500,5000)")
+    r.add_argument("--lines", type=int, default=20000, help="Logzeilen je Pattern-Anzahl (Default: 20000)")
+    r.add_argument("--repeat", type=int, default=5, help="Wiederholungen je Messung, gemeldet wird der Median (Default: 5)")
+    r.add_argument("--pipeline-calls", type=int, default=20000, help="Aufrufe je Pipeline-Messung (Default: 20000)")
+    r.add_argument("--columns", type=int, default=160, help="Feste Terminalbreite fürs Rendering (Default: 160)")
+    r.add_argument("-o", "--out", help="JSON-Datei (Default: STDOUT)")
+    add_gen_opts(r)
+    r.set_defaults(func=cmd_run)
+
+    c = sub.add_parser("compare", help="Zwei JSON-Läufe vergleichen")
+    c.add_argument("old")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=0.05, help="Toleranz für '=' (Default: 0.05 = 5%%)")
+    c.add_argument("--fail-on-regression", action="store_true", help="Exit 1, wenn eine Messung schlechter ist")
+    c.set_defaults(func=cmd_compare)
+
+    g = sub.add_parser("gen-log", help="Synthetische Logzeilen nach STDOUT")
+    g.add_argument("--lines", type=int, default=100000, help="Anzahl Zeilen, 0 = endlos (Default: 100000)")
+    g.add_argument("--rate", type=float, default=0.0, help="Zeilen pro Sekunde, 0 = ungebremst (Default: 0)")
+    g.add_argument("--patterns", type=int, default=500, help="Anzahl Ereignis-IDs (passend zu gen-patterns)")
+    add_gen_opts(g)
+    g.set_defaults(func=cmd_gen_log)
+
+    t = sub.add_parser("gen-patterns", help="Pattern-TSV nach STDOUT")
+    t.add_argument("count", type=int)
+    t.set_defaults(func=cmd_gen_patterns)
+
+    args = p.parse_args()
+    if getattr(args, "repeat", 1) < 1:
+        sys.stderr.write("[ERROR] --repeat muss mindestens 1 sein.\n")
+        sys.exit(2)
+    return args
+
+def main():
+    args = parse_args()
+    sys.exit(args.func(args))
+
+if __name__ == "__main__":
+    main()